@@ -1,15 +1,21 @@
 import asyncio
+import base64
+import bisect
+import contextlib
+import hashlib
 import json
 import os
+import resource
+import time
 import uuid
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import re
-from collections import deque
+from collections import OrderedDict
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
@@ -17,7 +23,18 @@ from sse_starlette.sse import EventSourceResponse
 from dotenv import load_dotenv
 
 # Import Supabase Storage Service
-from supabase_storage import SupabaseStorageService
+from supabase_storage import SupabaseStorageService, extract_title
+from content_cache import ContentCache
+from search_index import SearchIndex, read_snapshot, write_snapshot
+from dedupe import DuplicateEntry, DuplicateIndex
+from job_registry import JobRegistry
+from job_archive import JobArchive
+from job_store import JobStore
+from scheduler import FairScheduler
+from concurrency import AdaptiveLimiter, DispatchThrottle, is_rate_limited
+from process_pool import ProcessPool, kill_process_group
+from event_bus import RESYNC, DocumentFeed, EventBus, Subscription
+from log_channel import LogChannel, LogSink, read_log, read_log_before
 
 # Load environment variables
 load_dotenv()
@@ -71,10 +88,126 @@ TEMP_DIFFS_DIR = BASE_DIR / "temp-diffs"
 for directory in [BRAND_DATA_DIR, BRIEF_OUTPUTS_DIR, DRAFT_OUTPUTS_DIR, INSTRUCTIONS_DIR, LOGS_DIR, TEMP_DIFFS_DIR]:
     directory.mkdir(exist_ok=True)
 
-# Job storage
-jobs: Dict[str, dict] = {}
-job_queue: deque = deque()  # Queue for jobs waiting to be executed
-MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "5"))
+# Job storage, persisted so queued and interrupted jobs survive restarts
+JOB_STORE_PATH = Path(os.getenv("JOB_STORE_PATH", str(BASE_DIR / "jobs.db")))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))  # Runs allowed before an interrupted job is failed
+jobs = JobRegistry(JobStore(JOB_STORE_PATH))
+# "local" runs jobs inside the API process; "remote" only enqueues them for worker.py
+JOB_EXECUTION = os.getenv("JOB_EXECUTION", "local")
+JOB_SYNC_INTERVAL = float(os.getenv("JOB_SYNC_INTERVAL", "1"))  # Seconds between polls for worker updates
+job_queue = FairScheduler()  # Jobs waiting to be executed, by priority class, brand and batch
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "5"))  # Starting number of job slots
+
+# Adaptive concurrency: job slots grow while jobs run healthily and shrink on rate limits,
+# failures, slow jobs and host memory/CPU pressure
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+CONCURRENCY_MIN = int(os.getenv("CONCURRENCY_MIN", "1"))
+CONCURRENCY_MAX = int(os.getenv("CONCURRENCY_MAX", str(MAX_CONCURRENT_JOBS * 2)))
+CONCURRENCY_SAMPLE_INTERVAL = float(os.getenv("CONCURRENCY_SAMPLE_INTERVAL", "10"))
+CONCURRENCY_MIN_MEMORY_AVAILABLE = float(os.getenv("CONCURRENCY_MIN_MEMORY_AVAILABLE", "0.15"))  # Fraction of RAM
+CONCURRENCY_MAX_LOAD_PER_CPU = float(os.getenv("CONCURRENCY_MAX_LOAD_PER_CPU", "1.5"))
+
+# Pacing of Claude runs, and backoff while the upstream API reports rate limits or overload
+DISPATCH_RATE = float(os.getenv("DISPATCH_RATE", "1"))  # Runs started per second; 0 for no pacing
+DISPATCH_BURST = int(os.getenv("DISPATCH_BURST", str(MAX_CONCURRENT_JOBS)))
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "5"))  # Seconds
+RATE_LIMIT_BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "300"))
+JOB_RATE_LIMIT_RETRIES = int(os.getenv("JOB_RATE_LIMIT_RETRIES", "5"))  # Requeues of a throttled job before it fails
+
+# Claude CLI invocation, and the pool of idle processes started ahead of jobs to skip CLI startup
+CLAUDE_COMMAND = ["claude", "--print", "--verbose", "--dangerously-skip-permissions", "--output-format", "stream-json"]
+CLAUDE_POOL_SIZE = int(os.getenv("CLAUDE_POOL_SIZE", "2"))  # 0 disables pre-spawning
+CLAUDE_POOL_MAX_IDLE_BYTES = int(os.getenv("CLAUDE_POOL_MAX_IDLE_BYTES", str(512 * 1024 * 1024)))
+CLAUDE_POOL_MAX_IDLE_AGE = float(os.getenv("CLAUDE_POOL_MAX_IDLE_AGE", "600"))  # Seconds before an idle process is replaced
+
+# Deadlines for a Claude run by job type, overridable with JOB_TIMEOUT_<TYPE> and JOB_IDLE_TIMEOUT_<TYPE>:
+# total wall-clock seconds, and seconds without any output. Runs past either are killed as timed_out
+JOB_TIMEOUTS = {
+    job_type: float(os.getenv(f"JOB_TIMEOUT_{job_type.upper()}", str(seconds)))
+    for job_type, seconds in {
+        "brand_data": 1800, "brief": 1800, "draft": 2400, "brief_edit": 600, "draft_edit": 600
+    }.items()
+}
+JOB_IDLE_TIMEOUT = float(os.getenv("JOB_IDLE_TIMEOUT", "600"))
+JOB_IDLE_TIMEOUTS = {
+    job_type: float(os.getenv(f"JOB_IDLE_TIMEOUT_{job_type.upper()}", str(JOB_IDLE_TIMEOUT)))
+    for job_type in JOB_TIMEOUTS
+}
+# Resource limits on Claude processes; 0 for none. Memory caps the data segment (RLIMIT_DATA), not
+# address space, since Node reserves far more address space than it uses
+CLAUDE_MEMORY_LIMIT = int(os.getenv("CLAUDE_MEMORY_LIMIT", str(8 * 1024 * 1024 * 1024)))  # Bytes
+CLAUDE_CPU_LIMIT = int(os.getenv("CLAUDE_CPU_LIMIT", "3600"))  # CPU seconds
+
+# Recent log lines kept per running job for live log streams
+LOG_CHANNEL_BUFFER = int(os.getenv("LOG_CHANNEL_BUFFER", "1000"))
+# Lines per page of log history when no limit is given
+LOG_PAGE_SIZE = 200
+# Job log records are written in batches, after this many seconds or once this many bytes are buffered
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.1"))
+LOG_FLUSH_BYTES = int(os.getenv("LOG_FLUSH_BYTES", str(16 * 1024)))
+# Echo job log lines to stdout for local debugging
+JOB_LOG_ECHO = os.getenv("JOB_LOG_ECHO", "true").lower() in ("true", "1", "yes")
+
+# /api/events: undelivered events per client before it is sent a fresh snapshot instead,
+# and the delay that coalesces queue position changes into one event
+EVENT_STREAM_BUFFER = int(os.getenv("EVENT_STREAM_BUFFER", "1000"))
+QUEUE_EVENT_DELAY = float(os.getenv("QUEUE_EVENT_DELAY", "0.25"))
+
+
+def create_concurrency_limiter(initial: int) -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        initial,
+        min_limit=CONCURRENCY_MIN,
+        max_limit=max(CONCURRENCY_MAX, initial),
+        adaptive=ADAPTIVE_CONCURRENCY,
+        min_memory_available=CONCURRENCY_MIN_MEMORY_AVAILABLE,
+        max_load_per_cpu=CONCURRENCY_MAX_LOAD_PER_CPU,
+    )
+
+# Scheduling priority classes; lower runs first. Edits are interactive: a user is waiting in the diff view
+INTERACTIVE_JOB_TYPES = {"brief_edit", "draft_edit"}
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SINGLE = 1
+PRIORITY_BATCH = 2
+
+# Retention of finished jobs: older ones are archived to disk and dropped from memory
+JOB_RETENTION_MAX_JOBS = int(os.getenv("JOB_RETENTION_MAX_JOBS", "500"))
+JOB_RETENTION_MAX_AGE = {
+    "completed": float(os.getenv("JOB_RETENTION_COMPLETED_MAX_AGE", str(24 * 3600))),
+    "failed": float(os.getenv("JOB_RETENTION_FAILED_MAX_AGE", str(7 * 24 * 3600))),
+    "timed_out": float(os.getenv("JOB_RETENTION_FAILED_MAX_AGE", str(7 * 24 * 3600))),
+    "cancelled": float(os.getenv("JOB_RETENTION_COMPLETED_MAX_AGE", str(24 * 3600))),
+}
+JOB_RETENTION_INTERVAL = float(os.getenv("JOB_RETENTION_INTERVAL", "60"))
+JOB_ARCHIVE_DIR = LOGS_DIR / "archive"
+JOB_ARCHIVE_INDEX_MAX = int(os.getenv("JOB_ARCHIVE_INDEX_MAX", "10000"))
+
+# Completed results remembered for reuse by identical job submissions
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+# Job types whose output depends only on their params and input files, and where it is written
+MEMOIZED_JOB_OUTPUTS = {"brief": "brief-outputs", "draft": "draft-outputs"}
+# Folder each job type writes its output files to
+JOB_OUTPUT_FOLDERS = {
+    "brand_data": "brand-data",
+    "brief": "brief-outputs",
+    "draft": "draft-outputs",
+    "brief_edit": "temp-diffs",
+    "draft_edit": "temp-diffs",
+}
+
+# Read-through cache for file contents fetched from Supabase Storage
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CONTENT_CACHE_TTL = float(os.getenv("CONTENT_CACHE_TTL", "30"))
+
+# Full-text search over generated documents
+SEARCH_FOLDERS = ("brief-outputs", "draft-outputs")
+SEARCH_INDEX_PATH = Path(os.getenv("SEARCH_INDEX_PATH", str(BASE_DIR / "search-index.json.gz")))
+SEARCH_SNAPSHOT_INTERVAL = float(os.getenv("SEARCH_SNAPSHOT_INTERVAL", "30"))
+
+# Near-duplicate brief detection
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.7"))
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "flag")  # skip, flag or allow
+DUPLICATE_POLICIES = {"skip", "flag", "allow"}
 
 
 # Pydantic models
@@ -88,20 +221,26 @@ class BriefGenerateRequest(BaseModel):
     primary_keyword: str
     secondary_keywords: str
     brand_data: str
+    duplicate_policy: Optional[str] = None  # Defaults to DUPLICATE_POLICY
+    force: bool = False  # Run even if an identical brief was already generated
 
 
 class DraftGenerateRequest(BaseModel):
     brief_filename: str
     brand_data_filename: str
     target_word_count: int = 2000  # Default to 2000 if not provided
+    force: bool = False  # Run even if an identical draft was already generated
 
 
 class BriefBatchGenerateRequest(BaseModel):
     briefs: List[BriefGenerateRequest]
+    duplicate_policy: Optional[str] = None  # Applies to briefs that don't set their own
+    force: bool = False  # Applies to every brief in the batch
 
 
 class DraftBatchGenerateRequest(BaseModel):
     drafts: List[DraftGenerateRequest]
+    force: bool = False  # Applies to every draft in the batch
 
 
 class BatchJobResponse(BaseModel):
@@ -109,6 +248,12 @@ class BatchJobResponse(BaseModel):
     job_ids: List[str]
     total_jobs: int
     message: str
+    skipped: List[dict] = []  # Near-duplicates that were not submitted
+    flagged: List[dict] = []  # Near-duplicates that were submitted anyway
+
+
+class ConcurrencyOverrideRequest(BaseModel):
+    limit: Optional[int] = None  # None lets the limit adapt again
 
 
 class FileResponse(BaseModel):
@@ -118,6 +263,15 @@ class FileResponse(BaseModel):
     preview: Optional[str] = None
 
 
+class DocumentResponse(FileResponse):
+    title: Optional[str] = None
+    word_count: Optional[int] = None
+    updated_at: Optional[float] = None
+    primary_keyword: Optional[str] = None
+    secondary_keywords: Optional[str] = None
+    brand_data: Optional[str] = None
+
+
 class JobResponse(BaseModel):
     job_id: str
     type: str
@@ -171,6 +325,11 @@ class FileManager:
             use_supabase: If True, use Supabase Storage; if False, use local filesystem (for backward compatibility)
         """
         self.use_supabase = use_supabase
+        self.cache = ContentCache(CONTENT_CACHE_MAX_BYTES, CONTENT_CACHE_TTL)
+        self._pending_reads: Dict[tuple, asyncio.Future] = {}
+        # (folder, extension, sort, view) -> (storage listing, sorted listing built from it)
+        self._listings: Dict[tuple, Tuple[List[dict], "SortedListing"]] = {}
+        self._listeners: List[Callable[[str, str, str, Optional[str], Optional[dict]], None]] = []
         if use_supabase:
             try:
                 self.storage = SupabaseStorageService()
@@ -183,10 +342,10 @@ class FileManager:
         else:
             self.base_dir = BASE_DIR
 
-    def list_files(self, folder: str, extension: str) -> List[FileResponse]:
+    async def list_files(self, folder: str, extension: str) -> List[FileResponse]:
         if self.use_supabase:
             try:
-                files_data = self.storage.list_files(folder, extension)
+                files_data = await self.storage.list_files(folder, extension)
                 return [FileResponse(**file_data) for file_data in files_data]
             except Exception as e:
                 print(f"Error listing files from Supabase: {e}")
@@ -215,6 +374,80 @@ class FileManager:
             files.sort(key=lambda x: x.created_at, reverse=True)
             return files
 
+    async def list_documents(self, folder: str) -> List[DocumentResponse]:
+        """List markdown documents with their catalog metadata (title, word count, keyword, brand)"""
+        if self.use_supabase:
+            try:
+                files_data = await self.storage.list_files(folder, "md")
+                return [DocumentResponse(**file_data) for file_data in files_data]
+            except Exception as e:
+                print(f"Error listing documents from Supabase: {e}")
+                return []
+        else:
+            # Legacy local filesystem implementation
+            documents = []
+            folder_path = self.base_dir / folder
+            if not folder_path.exists():
+                return documents
+
+            for file in folder_path.glob("*.md"):
+                try:
+                    stat = file.stat()
+                    content = file.read_text()
+                    documents.append(DocumentResponse(
+                        name=file.name,
+                        size=stat.st_size,
+                        created_at=stat.st_mtime,
+                        updated_at=stat.st_mtime,
+                        preview=self.get_preview_local(file),
+                        title=extract_title(content, file.name),
+                        word_count=len(content.split())
+                    ))
+                except Exception as e:
+                    print(f"Error reading file {file}: {e}")
+                    continue
+
+            documents.sort(key=lambda x: x.created_at, reverse=True)
+            return documents
+
+    async def sorted_listing(self, folder: str, extension: str, sort: str, sort_fields: Optional[set] = None,
+                             view: Optional[Callable[[dict], dict]] = None) -> "SortedListing":
+        """
+        A folder's listing sorted for paging, optionally with view applied to each row
+
+        sort_fields defaults to LIST_SORT_FIELDS. In Supabase mode the storage
+        listing is reused until the folder manifest changes, and so is the
+        sorted listing built from it.
+        """
+        field = sort.lstrip("-")
+        if field not in (sort_fields or LIST_SORT_FIELDS):
+            raise HTTPException(status_code=400, detail=f"Invalid sort field: {field}")
+
+        if self.use_supabase:
+            rows = await self.storage.list_files(folder, extension)
+        elif extension == "md":
+            rows = [document.dict() for document in await self.list_documents(folder)]
+        else:
+            rows = [file.dict() for file in await self.list_files(folder, extension)]
+
+        key = (folder, extension, sort, view)
+        cached = self._listings.get(key)
+        if cached is not None and cached[0] is rows:
+            return cached[1]
+        listing = SortedListing([view(row) for row in rows] if view else rows, field, sort.startswith("-"))
+        if self.use_supabase:
+            self._listings[key] = (rows, listing)
+        return listing
+
+    async def get_document(self, folder: str, filename: str) -> Optional[dict]:
+        """Get a document's catalog entry, or None if it is not catalogued"""
+        if self.use_supabase:
+            try:
+                return await self.storage.get_entry(folder, filename)
+            except Exception as e:
+                print(f"Error reading catalog entry for {filename}: {e}")
+        return None
+
     def get_preview_local(self, file: Path, chars: int = 200) -> str:
         """Local filesystem preview method"""
         try:
@@ -234,9 +467,9 @@ class FileManager:
             return ""
         return ""
 
-    def read_file(self, folder: str, filename: str) -> str:
+    async def read_file(self, folder: str, filename: str) -> str:
         if self.use_supabase:
-            return self.storage.read_file(folder, filename)
+            return await self._read_cached(folder, filename)
         else:
             # Legacy local filesystem implementation
             file_path = self.base_dir / folder / filename
@@ -244,31 +477,149 @@ class FileManager:
                 raise HTTPException(status_code=404, detail="File not found")
             return file_path.read_text()
 
-    def delete_file(self, folder: str, filename: str) -> bool:
+    async def _read_cached(self, folder: str, filename: str) -> str:
+        """Read through the content cache, sharing one download between concurrent readers"""
+        key = (folder, filename)
+        entry, fresh = self.cache.get(key)
+        if entry is not None and fresh:
+            self.cache.hits += 1
+            return entry.content
+
+        pending = self._pending_reads.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_into_cache(key, entry, self.cache.generation))
+            self._pending_reads[key] = pending
+
+            def forget(done: asyncio.Future):
+                if self._pending_reads.get(key) is done:
+                    del self._pending_reads[key]
+
+            pending.add_done_callback(forget)
+        return await asyncio.shield(pending)
+
+    async def _fetch_into_cache(self, key: tuple, stale_entry, generation: int) -> str:
+        """
+        Download a file, or revalidate a stale cached copy by etag
+
+        generation is the cache generation when stale_entry was looked up. If
+        a write invalidated the file since then, the copy may predate it, so
+        it is downloaded again instead of being revalidated.
+        """
+        folder, filename = key
+        while True:
+            etag = stale_entry.etag if stale_entry is not None else None
+            content, etag = await self.storage.read_file_if_changed(folder, filename, etag)
+            if content is not None:
+                self.cache.misses += 1
+                self.cache.put(key, content, etag, generation)
+                return content
+            if generation == self.cache.generation:
+                # Stored object still matches the cached copy
+                self.cache.revalidations += 1
+                self.cache.touch(key)
+                return stale_entry.content
+            stale_entry = None
+            generation = self.cache.generation
+
+    def _invalidate(self, folder: str, filename: str):
+        self.cache.invalidate((folder, filename))
+        self._pending_reads.pop((folder, filename), None)
+
+    @contextlib.asynccontextmanager
+    async def _writing(self, folder: str, filename: str):
+        """
+        Invalidate a file's cached content before and after writing it to storage
+
+        A read that runs while the write is awaited may fetch the old body; the
+        second invalidation bumps the generation so that copy is never cached.
+        """
+        self._invalidate(folder, filename)
+        try:
+            yield
+        finally:
+            self._invalidate(folder, filename)
+
+    def add_listener(self, listener: Callable[[str, str, str, Optional[str], Optional[dict]], None]):
+        """
+        Register a callback for document changes
+
+        The callback receives (event, folder, filename, content, metadata) after a
+        write ("write") or delete ("delete", content None) has succeeded. metadata
+        is the catalog metadata passed to write_file, if any.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, folder: str, filename: str, content: Optional[str] = None,
+                metadata: Optional[dict] = None):
+        for listener in self._listeners:
+            try:
+                listener(event, folder, filename, content, metadata)
+            except Exception as e:
+                print(f"Error in file change listener for {folder}/{filename}: {e}")
+
+    async def notify_external_write(self, folder: str, filename: str, metadata: Optional[dict] = None):
+        """Tell listeners about a file written by another process, such as a job worker or Claude"""
+        if self.use_supabase:
+            self._invalidate(folder, filename)
+        try:
+            content = await self.read_file(folder, filename)
+        except HTTPException as e:
+            print(f"Error reading {folder}/{filename} written elsewhere: {e.detail}")
+            return
+        if metadata is None:
+            entry = await self.get_document(folder, filename) or {}
+            metadata = {k: entry[k] for k in ("primary_keyword", "secondary_keywords", "brand_data") if entry.get(k)}
+        if self.use_supabase:
+            # Workers leave folder manifests to this process
+            await self.storage.record_external_write(folder, filename, content, metadata or None)
+        self._notify("write", folder, filename, content, metadata or None)
+
+    async def write_file(self, folder: str, filename: str, content: str,
+                         metadata: Optional[dict] = None) -> bool:
+        """Create or overwrite a file, recording optional catalog metadata alongside it"""
+        if self.use_supabase:
+            async with self._writing(folder, filename):
+                await self.storage.write_file(folder, filename, content, metadata)
+        else:
+            # Legacy local filesystem implementation
+            file_path = self.base_dir / folder / filename
+            file_path.write_text(content, encoding='utf-8')
+        self._notify("write", folder, filename, content, metadata)
+        return True
+
+    async def delete_file(self, folder: str, filename: str) -> bool:
         if self.use_supabase:
-            return self.storage.delete_file(folder, filename)
+            async with self._writing(folder, filename):
+                deleted = await self.storage.delete_file(folder, filename)
         else:
             # Legacy local filesystem implementation
             file_path = self.base_dir / folder / filename
-            if file_path.exists():
+            deleted = file_path.exists()
+            if deleted:
                 file_path.unlink()
-                return True
-            return False
+        if deleted:
+            self._notify("delete", folder, filename)
+        return deleted
 
     async def save_upload(self, folder: str, file: UploadFile) -> str:
         if self.use_supabase:
-            return await self.storage.save_upload(folder, file)
+            async with self._writing(folder, file.filename):
+                await self.storage.save_upload(folder, file)
+            await file.seek(0)
+            content = await file.read()
         else:
             # Legacy local filesystem implementation
             file_path = self.base_dir / folder / file.filename
             content = await file.read()
             file_path.write_bytes(content)
-            return file.filename
+        self._notify("write", folder, file.filename, content.decode('utf-8', errors='replace'))
+        return file.filename
 
-    def save_file(self, folder: str, filename: str, content: str) -> bool:
+    async def save_file(self, folder: str, filename: str, content: str) -> bool:
         """Save content to a file"""
         if self.use_supabase:
-            return self.storage.save_file(folder, filename, content)
+            async with self._writing(folder, filename):
+                await self.storage.save_file(folder, filename, content)
         else:
             # Legacy local filesystem implementation
             file_path = self.base_dir / folder / filename
@@ -276,10 +627,145 @@ class FileManager:
                 raise HTTPException(status_code=404, detail="File not found")
             try:
                 file_path.write_text(content, encoding='utf-8')
-                return True
             except Exception as e:
                 print(f"Error saving file {filename}: {e}")
                 raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+        self._notify("write", folder, filename, content)
+        return True
+
+
+# Listing pagination
+LIST_SORT_FIELDS = {"created_at", "name", "size"}
+DOCUMENT_SORT_FIELDS = LIST_SORT_FIELDS | {"updated_at", "title", "word_count"}
+MAX_PAGE_SIZE = 500
+
+
+def sort_value(value) -> tuple:
+    """Sort key for a field that may be None; None sorts after every value instead of raising TypeError"""
+    return (1,) if value is None else (0, value)
+
+
+class SortedListing:
+    """
+    A file listing sorted once for one sort order, paged by bisecting to the cursor
+
+    Rows are plain dicts, so response models are only built for the rows a
+    page returns.
+    """
+
+    def __init__(self, rows: List[dict], field: str, descending: bool):
+        self.field = field
+        self.descending = descending
+        self.rows = sorted(rows, key=self.key)
+        self.keys = [self.key(row) for row in self.rows]
+
+    def key(self, row: dict) -> tuple:
+        # Name breaks ties so every row has a unique position
+        return sort_value(row.get(self.field)), row["name"]
+
+    def page(self, limit: Optional[int], after: Optional[tuple],
+             accept: Callable[[dict], bool]) -> Tuple[List[dict], bool]:
+        """Up to limit accepted rows past the after key in sort order, and whether more follow"""
+        if self.descending:
+            end = len(self.keys) if after is None else bisect.bisect_left(self.keys, after)
+            indexes = range(end - 1, -1, -1)
+        else:
+            start = 0 if after is None else bisect.bisect_right(self.keys, after)
+            indexes = range(start, len(self.rows))
+        page = []
+        for index in indexes:
+            row = self.rows[index]
+            if accept(row):
+                if limit is not None and len(page) == limit:
+                    return page, True
+                page.append(row)
+        return page, False
+
+
+def document_row(row: dict) -> dict:
+    """A catalog row as briefs and drafts are listed: the UI shows the title as the preview and the word count as the size"""
+    return {**row, "preview": row.get("title"), "size": row.get("word_count") or 0}
+
+
+def document_filter(
+    brand_data: Optional[str] = None,
+    keyword: Optional[str] = None,
+    q: Optional[str] = None
+) -> Callable[[dict], bool]:
+    """Match catalogued documents by brand data file, primary keyword and title text"""
+    keyword = keyword.lower() if keyword else None
+    q = q.lower() if q else None
+
+    def accept(row: dict) -> bool:
+        if brand_data and row.get("brand_data") != brand_data:
+            return False
+        if keyword and keyword not in (row.get("primary_keyword") or "").lower():
+            return False
+        if q and q not in (row.get("title") or "").lower():
+            return False
+        return True
+
+    return accept
+
+
+def paginate_files(
+    listing: SortedListing,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    prefix: Optional[str] = None,
+    accept: Optional[Callable[[dict], bool]] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Filter and page a sorted file listing
+
+    The cursor encodes the sort key of the last item returned, so pages stay
+    stable when files are added or removed between requests.
+
+    Args:
+        listing: The listing, sorted by sort
+        limit: Page size; None returns everything after the cursor
+        cursor: Opaque cursor from a previous page
+        sort: Field the listing is sorted by, prefixed with "-" for descending order
+        prefix: Only include files whose name starts with this prefix
+        accept: Only include rows this returns True for
+
+    Returns:
+        (page, next_cursor) - next_cursor is None on the last page
+    """
+    after = None
+    if cursor:
+        try:
+            cursor_sort, cursor_value, cursor_name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if cursor_sort != sort:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        after = (sort_value(cursor_value), cursor_name)
+
+    def matches(row: dict) -> bool:
+        return (not prefix or row["name"].startswith(prefix)) and (accept is None or accept(row))
+
+    try:
+        page, more = listing.page(limit, after, matches)
+    except TypeError:
+        # A cursor value of a different type than the field's values
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not more:
+        return page, None
+
+    last_item = page[-1]
+    next_cursor = base64.urlsafe_b64encode(
+        json.dumps([sort, last_item.get(listing.field), last_item["name"]]).encode()
+    ).decode()
+    return page, next_cursor
+
+
+def brief_output_filename(title: str) -> str:
+    """File name a brief job writes its output to"""
+    filename = re.sub(r'[^\w\s-]', '', title.lower())
+    filename = re.sub(r'[-\s]+', '_', filename)
+    return f"{filename}_brief.md"
 
 
 # Job Manager
@@ -287,27 +773,128 @@ class JobManager:
     def __init__(self):
         self.jobs = jobs
         self.queue = job_queue
+        self.limiter = create_concurrency_limiter(MAX_CONCURRENT_JOBS)
+        self.throttle = DispatchThrottle(DISPATCH_RATE, DISPATCH_BURST, RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_MAX)
+        # "remote" when jobs are run by workers leasing them from the store (see JOB_EXECUTION)
+        self.execution = JOB_EXECUTION
+        self._dispatch_timer: Optional[asyncio.TimerHandle] = None
+        rlimits = {resource.RLIMIT_DATA: CLAUDE_MEMORY_LIMIT, resource.RLIMIT_CPU: CLAUDE_CPU_LIMIT}
+        # job id -> live log lines of a job queued or running in this process
+        self.log_channels: Dict[str, LogChannel] = {}
+        self.events = EventBus(EVENT_STREAM_BUFFER)
+        self.jobs.add_listener(self.job_changed)
+        self._queue_event_timer: Optional[asyncio.TimerHandle] = None
+        # Queue positions last sent to event subscribers
+        self._published_positions: Dict[str, int] = {}
+        self.process_pool = ProcessPool(CLAUDE_COMMAND, str(BASE_DIR.parent), CLAUDE_POOL_SIZE,
+                                        CLAUDE_POOL_MAX_IDLE_BYTES, CLAUDE_POOL_MAX_IDLE_AGE,
+                                        rlimits={limit: value for limit, value in rlimits.items() if value > 0})
+        # result key -> {"job_id", "output_files"} for completed memoizable jobs, oldest first
+        self.results: "OrderedDict[str, dict]" = OrderedDict()
+        # result key -> id of the queued or running job that will produce it
+        self.inflight: Dict[str, str] = {}
+        self.archive = JobArchive(JOB_ARCHIVE_DIR, JOB_ARCHIVE_INDEX_MAX)
+        # Last job store version applied by restore/sync_from_store
+        self.store_version = 0
+        self._retention_lock = asyncio.Lock()
 
     def active_count(self) -> int:
-        return sum(1 for job in self.jobs.values() if job["status"] == "running")
+        return self.jobs.count("running")
 
     def queued_count(self) -> int:
-        return sum(1 for job in self.jobs.values() if job["status"] == "queued")
+        return self.jobs.count("queued")
+
+    async def reuses(self, job_type: str, params: dict, batch_id: Optional[str] = None) -> bool:
+        """Whether start_job would return an in-flight or earlier identical job instead of running Claude"""
+        key = await self.result_key(job_type, params)
+        return key is not None and (self.joinable(key, batch_id) is not None or key in self.results)
+
+    def joinable(self, key: str, batch_id: Optional[str]) -> Optional[str]:
+        """
+        Id of the queued or running job producing a result key, if a submission in batch_id may join it
+
+        Jobs only join an in-flight job of the same batch (or no batch), so a
+        batch's job ids always belong to that batch.
+        """
+        job_id = self.inflight.get(key)
+        if job_id is None or job_id not in self.jobs or self.jobs[job_id].get("batch_id") != batch_id:
+            return None
+        return job_id
+
+    async def result_key(self, job_type: str, params: dict) -> Optional[str]:
+        """
+        Hash job type, params and the content of the job's input files
+
+        Returns None for job types that are not memoized or when an input
+        cannot be read.
+        """
+        if job_type == "brief":
+            inputs = [("brand-data", params["brand_data"])]
+        elif job_type == "draft":
+            inputs = [("brief-outputs", params["brief_filename"]), ("brand-data", params["brand_data_filename"])]
+        else:
+            return None
+
+        digest = hashlib.sha256(job_type.encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        try:
+            contents = await asyncio.gather(*(file_manager.read_file(folder, name) for folder, name in inputs))
+        except HTTPException:
+            return None
+        for content in contents:
+            digest.update(hashlib.sha256(content.encode()).digest())
+        return digest.hexdigest()
+
+    def remember_result(self, key: str, job_id: str, job_type: str, output_files: List[str]):
+        self.results[key] = {
+            "job_id": job_id,
+            "folder": MEMOIZED_JOB_OUTPUTS[job_type],
+            "output_files": output_files
+        }
+        self.results.move_to_end(key)
+        while len(self.results) > RESULT_CACHE_MAX_ENTRIES:
+            self.results.popitem(last=False)
+
+    def forget_output(self, folder: str, filename: str):
+        """Stop reusing results whose output file has been deleted"""
+        stale = [
+            key for key, result in self.results.items()
+            if result["folder"] == folder and filename in result["output_files"]
+        ]
+        for key in stale:
+            del self.results[key]
+
+    async def start_job(self, job_type: str, params: dict, batch_id: Optional[str] = None,
+                        force: bool = False) -> str:
+        """
+        Create a job and either start it immediately or add to queue
+
+        Brief and draft jobs whose type, params and input contents match an
+        earlier completed job complete at once with that job's output, and
+        matches for a job of the same batch still queued or running return
+        that job's id. Pass force=True to always run.
+        """
+        key = None if force else await self.result_key(job_type, params)
+        if key is not None:
+            joined = self.joinable(key, batch_id)
+            if joined is not None:
+                print(f"[Job {joined}] Identical submission joined the in-flight job", flush=True)
+                return joined
+            if key in self.results:
+                return self.complete_from_result(job_type, params, batch_id, self.results[key])
 
-    async def start_job(self, job_type: str, params: dict, batch_id: Optional[str] = None) -> str:
-        """Create a job and either start it immediately or add to queue"""
         job_id = str(uuid.uuid4())[:8]
 
         # Create log file
         log_file = LOGS_DIR / f"{job_id}.log"
 
-        # Determine initial status based on active jobs
-        if self.active_count() >= MAX_CONCURRENT_JOBS:
+        # Determine initial status based on active jobs; workers pick up remote jobs from the store
+        if self.execution == "remote" or self.active_count() >= self.limiter.limit or self.throttle.delay() > 0:
             status = "queued"
         else:
             status = "running"
 
-        self.jobs[job_id] = {
+        self.jobs.add({
             "id": job_id,
             "type": job_type,
             "status": status,
@@ -317,33 +904,209 @@ class JobManager:
             "log_file": str(log_file),
             "output_files": [],
             "batch_id": batch_id,
-            "queue_position": None
-        }
-
-        if status == "queued":
-            # Add to queue
-            self.queue.append(job_id)
-            self.jobs[job_id]["queue_position"] = len(self.queue)
-            print(f"[Job {job_id}] Added to queue (position: {len(self.queue)})", flush=True)
+            "result_key": key
+        })
+        if key is not None:
+            self.inflight[key] = job_id
+
+        if self.execution == "remote":
+            print(f"[Job {job_id}] Queued for a worker", flush=True)
+        elif status == "queued":
+            self.enqueue(self.jobs[job_id])
+            print(f"[Job {job_id}] Added to queue ({len(self.queue)} queued)", flush=True)
+            await self.process_queue()
         else:
             # Start immediately
+            self.throttle.take()
             asyncio.create_task(self.execute_job(job_id, job_type, params, log_file))
 
         return job_id
 
+    def complete_from_result(self, job_type: str, params: dict, batch_id: Optional[str], result: dict) -> str:
+        """Record a job that reuses the output of an earlier identical job without running Claude"""
+        job_id = str(uuid.uuid4())[:8]
+        log_file = LOGS_DIR / f"{job_id}.log"
+        with LogSink(log_file, "w", flush_interval=0) as log:
+            log.write("info", f"Inputs identical to job {result['job_id']}, reusing its output")
+            log.write("info", f"Output files: {', '.join(result['output_files'])}")
+
+        self.jobs.add({
+            "id": job_id,
+            "type": job_type,
+            "status": "completed",
+            "created_at": datetime.now().isoformat(),
+            "params": params,
+            "process": None,
+            "log_file": str(log_file),
+            "output_files": list(result["output_files"]),
+            "batch_id": batch_id,
+            "result_key": None,
+            "reused_from": result["job_id"],
+            "finished_at": datetime.now().isoformat()
+        })
+        print(f"[Job {job_id}] Reused output of job {result['job_id']}", flush=True)
+        return job_id
+
+    def finish_job(self, job_id: str, status: str):
+        """Move a job to a final status and release its process handle; a cancelled job stays cancelled"""
+        job = self.jobs[job_id]
+        if job["status"] == "cancelled":
+            return
+        job["finished_at"] = datetime.now().isoformat()
+        job["process"] = None
+        self.jobs.set_status(job_id, status)
+
+    async def enforce_retention(self):
+        """
+        Archive finished jobs that are past their status's max age, then the
+        oldest finished jobs beyond JOB_RETENTION_MAX_JOBS
+
+        Archived jobs are removed from memory; their records and compressed
+        logs stay on disk and can still be fetched by id.
+        """
+        async with self._retention_lock:
+            now = datetime.now()
+            # Entry order isn't finish order for jobs restored or synced from the store, so check every job
+            expired = [
+                job for status, max_age in JOB_RETENTION_MAX_AGE.items() for job in self.jobs.by_entry_order(status)
+                if (now - datetime.fromisoformat(job["finished_at"])).total_seconds() >= max_age
+            ]
+
+            expired_ids = {job["id"] for job in expired}
+            finished = sorted(
+                (job for status in JOB_RETENTION_MAX_AGE for job in self.jobs.by_entry_order(status)
+                 if job["id"] not in expired_ids),
+                key=lambda job: job["finished_at"]
+            )
+            excess = len(finished) - JOB_RETENTION_MAX_JOBS
+            if excess > 0:
+                expired.extend(finished[:excess])
+            if not expired:
+                return
+
+            records = [{k: v for k, v in job.items() if k != "process"} for job in expired]
+            try:
+                await asyncio.to_thread(self.archive.archive, records)
+            except Exception as e:
+                print(f"Failed to archive {len(records)} finished job(s): {e}")
+                return
+            for job in expired:
+                self.jobs.remove(job["id"])
+            print(f"Archived {len(records)} finished job(s)", flush=True)
+
+    async def get_archived_job(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.archive.get, job_id)
+
+    async def restore(self):
+        """
+        Reload jobs from the store after a restart
+
+        Queued jobs go back on the queue in submission order. Jobs that were
+        running when the server stopped lost their process, so they are queued
+        again, or failed once they have used up JOB_MAX_ATTEMPTS runs.
+
+        In remote execution mode workers own the queue and reclaim running
+        jobs whose lease expires, so records are only loaded. The index of
+        archived jobs is rebuilt so they can still be fetched by id.
+        """
+        await asyncio.to_thread(self.archive.load)
+        records, self.store_version = await asyncio.to_thread(self.jobs.store.load)
+        requeued = failed = 0
+        for record in records:
+            changed = False
+            if record["status"] == "running" and self.execution == "local":
+                changed = True
+                if record.get("attempts", 0) >= JOB_MAX_ATTEMPTS:
+                    record["status"] = "failed"
+                    record["finished_at"] = datetime.now().isoformat()
+                    failed += 1
+                else:
+                    record["status"] = "queued"
+                    requeued += 1
+            record["process"] = None
+            self.jobs.add(record, persist=changed)
+
+            key = record.get("result_key")
+            if record["status"] in ("queued", "running"):
+                if record["status"] == "queued" and self.execution == "local":
+                    self.enqueue(record)
+                if key is not None:
+                    self.inflight[key] = record["id"]
+            elif record["status"] == "completed" and key is not None and record.get("output_files"):
+                self.remember_result(key, record["id"], record["type"], record["output_files"])
+
+        print(f"Restored {len(records)} job(s) from {self.jobs.store.path} "
+              f"({self.queued_count()} queued, {requeued} interrupted and requeued, {failed} failed)", flush=True)
+        await self.process_queue()
+
+    async def sync_from_store(self) -> List[dict]:
+        """
+        Apply job changes written to the store by workers (remote execution mode)
+
+        Returns the records of jobs that finished since the last sync.
+        """
+        records, self.store_version = await asyncio.to_thread(self.jobs.store.changed_since, self.store_version)
+        finished = []
+        for record in records:
+            previous = self.jobs.get(record["id"])
+            record["process"] = None
+            self.jobs.add(record, persist=False)
+            if record["status"] in ("queued", "running"):
+                continue
+            if previous is not None and previous["status"] not in ("queued", "running"):
+                continue
+
+            key = record.get("result_key")
+            if key is not None and self.inflight.get(key) == record["id"]:
+                del self.inflight[key]
+            if record["status"] == "completed" and key is not None and record.get("output_files"):
+                self.remember_result(key, record["id"], record["type"], record["output_files"])
+            finished.append(record)
+        return finished
+
+    def enqueue(self, job: dict):
+        """
+        Queue a job under its priority class, brand and batch
+
+        Edits outrank single generation requests, which outrank batch jobs.
+        """
+        if job["type"] in INTERACTIVE_JOB_TYPES:
+            priority = PRIORITY_INTERACTIVE
+        elif job.get("batch_id"):
+            priority = PRIORITY_BATCH
+        else:
+            priority = PRIORITY_SINGLE
+        params = job["params"]
+        brand = params.get("brand_data") or params.get("brand_data_filename") or params.get("brand_name") or ""
+        self.queue.push(job["id"], priority, brand, job.get("batch_id"))
+
+    def queue_position(self, job: dict) -> Optional[int]:
+        """1-based position of a queued job in dispatch order"""
+        if job["status"] != "queued":
+            return None
+        return self.queue.position(job["id"])
+
     async def process_queue(self):
-        """Process queued jobs when slots become available"""
-        while self.queue and self.active_count() < MAX_CONCURRENT_JOBS:
-            job_id = self.queue.popleft()
+        """Process queued jobs when slots become available and the dispatch throttle allows"""
+        if self.execution == "remote":
+            return
+        while self.queue and self.active_count() < self.limiter.limit:
+            wait = self.throttle.delay()
+            if wait > 0:
+                self.schedule_dispatch(wait)
+                return
+
+            job_id = self.queue.pop()
 
-            if job_id not in self.jobs:
+            if job_id is None or job_id not in self.jobs:
                 continue
 
+            self.throttle.take()
+
             job = self.jobs[job_id]
 
             # Update status and start job
-            job["status"] = "running"
-            job["queue_position"] = None
+            self.jobs.set_status(job_id, "running")
 
             print(f"[Job {job_id}] Starting from queue", flush=True)
 
@@ -356,21 +1119,237 @@ class JobManager:
                 )
             )
 
-        # Update queue positions for remaining jobs
-        for idx, job_id in enumerate(self.queue, start=1):
-            if job_id in self.jobs:
-                self.jobs[job_id]["queue_position"] = idx
+    async def cancel_job(self, job_id: str) -> Optional[dict]:
+        """
+        Cancel a queued or running job
+
+        Queued jobs leave the queue; running jobs have their Claude process
+        group killed and their output is not collected. The slot is free as
+        soon as this returns; call process_queue to fill it. Returns the job,
+        unchanged if it had already finished, or None if there is no such job.
+
+        In remote execution mode the job is cancelled in the store, and the
+        worker running it stops at its next lease renewal.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return job
+        if self.execution == "remote":
+            for record in await asyncio.to_thread(self.jobs.store.cancel, [job_id]):
+                record["process"] = None
+                self.jobs.add(record, persist=False)
+        else:
+            queued = self.queue.remove(job_id)
+            process = job.get("process")
+            self.finish_job(job_id, "cancelled")
+            if process is not None:
+                kill_process_group(process)
+            if queued:
+                # No run will close the live log stream of a job that never started
+                self.close_log_channel(job_id)
+        key = job.get("result_key")
+        if key is not None and self.inflight.get(key) == job_id:
+            del self.inflight[key]
+        print(f"[Job {job_id}] Cancelled", flush=True)
+        return self.jobs[job_id]
+
+    async def cancel_batch(self, batch_id: str) -> List[dict]:
+        """Cancel every queued or running job of a batch, returning the cancelled jobs"""
+        pending = [job["id"] for job in self.jobs.in_batch(batch_id) if job["status"] in ("queued", "running")]
+        cancelled = []
+        if self.execution == "remote":
+            for record in await asyncio.to_thread(self.jobs.store.cancel, pending):
+                record["process"] = None
+                self.jobs.add(record, persist=False)
+                key = record.get("result_key")
+                if key is not None and self.inflight.get(key) == record["id"]:
+                    del self.inflight[key]
+                cancelled.append(record)
+        else:
+            for job_id in pending:
+                cancelled.append(await self.cancel_job(job_id))
+        print(f"Batch {batch_id}: cancelled {len(cancelled)} job(s)", flush=True)
+        return cancelled
+
+    def batch_status(self, batch_id: str) -> Optional[dict]:
+        """
+        Counts by status, compact job states and an ETA for a batch, or None if it is unknown
+
+        The ETA spreads the expected remaining work (usual duration of each
+        job type, less the time running jobs have already had) over the
+        current job slots. It is None while there is no duration to go by.
+        """
+        batch = self.jobs.in_batch(batch_id)
+        if not batch:
+            return None
+        counts: Dict[str, int] = {}
+        remaining = 0.0
+        estimable = True
+        now = datetime.now()
+        for job in batch:
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+            if job["status"] not in ("queued", "running"):
+                continue
+            usual = self.limiter.baselines.get(job["type"])
+            if usual is None:
+                estimable = False
+            elif job["status"] == "running" and job.get("started_at"):
+                remaining += max(0.0, usual - (now - datetime.fromisoformat(job["started_at"])).total_seconds())
+            else:
+                remaining += usual
+        finished = len(batch) - counts.get("queued", 0) - counts.get("running", 0)
+        slots = max(1, min(self.limiter.limit, len(batch) - finished))
+        return {
+            "batch_id": batch_id,
+            "total": len(batch),
+            "finished": finished,
+            "counts": counts,
+            "eta_seconds": round(remaining / slots) if estimable else None,
+            "jobs": [self.job_summary(job) for job in batch]
+        }
+
+    def job_summary(self, job: dict) -> dict:
+        """Compact job state for batch progress and job events"""
+        return {
+            "id": job["id"],
+            "type": job["type"],
+            "status": job["status"],
+            "batch_id": job.get("batch_id"),
+            "queue_position": self.queue_position(job),
+            "output_files": job.get("output_files", [])
+        }
+
+    def job_changed(self, job: dict, previous_status: Optional[str]):
+        """Registry listener: publish the transition, and queue positions if the queue changed"""
+        if not self.events.subscribers:
+            self._published_positions = {}
+            return
+        self.events.publish("job", self.job_summary(job), job)
+        if "queued" in (previous_status, job["status"]) and self._queue_event_timer is None:
+            self._queue_event_timer = asyncio.get_running_loop().call_later(
+                QUEUE_EVENT_DELAY, self.publish_queue_positions
+            )
+
+    def publish_queue_positions(self):
+        """Send subscribers the queue positions that changed since they were last sent"""
+        self._queue_event_timer = None
+        if not self.events.subscribers:
+            self._published_positions = {}
+            return
+        positions = dict(self.queue.positions()) if self.queue else {}
+        changed: Dict[str, Optional[int]] = {
+            job_id: position for job_id, position in positions.items()
+            if self._published_positions.get(job_id) != position
+        }
+        for job_id in self._published_positions.keys() - positions.keys():
+            changed[job_id] = None
+        self._published_positions = positions
+        jobs = {job_id: self.jobs[job_id] for job_id in changed if job_id in self.jobs}
+        if jobs:
+            self.events.publish_positions(changed, jobs)
+
+    def log_channel(self, job_id: str) -> Optional[LogChannel]:
+        """The live log channel of a job this process will run or is running, None otherwise"""
+        job = self.jobs.get(job_id)
+        if job is None or job["status"] not in ("queued", "running") or self.execution == "remote":
+            return self.log_channels.get(job_id)
+        channel = self.log_channels.get(job_id)
+        if channel is None:
+            channel = self.log_channels[job_id] = LogChannel(
+                LOG_CHANNEL_BUFFER, lambda line, offset: self.events.publish_log(job, line, offset)
+            )
+        return channel
+
+    def close_log_channel(self, job_id: str):
+        channel = self.log_channels.pop(job_id, None)
+        if channel is not None:
+            channel.close()
+
+    def open_log(self, job_id: str, log_file: Path, mode: str) -> LogSink:
+        """Open a job's log file so records written to it also reach live log streams and the console"""
+        return LogSink(log_file, mode, self.log_channels.get(job_id), LOG_FLUSH_INTERVAL, LOG_FLUSH_BYTES,
+                       f"[Job {job_id}] " if JOB_LOG_ECHO else None)
+
+    def schedule_dispatch(self, delay: float):
+        """Run process_queue again once the throttle allows another start"""
+        if self._dispatch_timer is not None:
+            return
+
+        def dispatch():
+            self._dispatch_timer = None
+            asyncio.create_task(self.process_queue())
+
+        self._dispatch_timer = asyncio.get_running_loop().call_later(delay, dispatch)
+
+    def requeue_rate_limited(self, job_id: str) -> bool:
+        """
+        Put a job whose run was throttled upstream back on the queue and pause dispatch
+
+        Returns False once the job has been requeued JOB_RATE_LIMIT_RETRIES
+        times, leaving it to fail. Throttled runs don't count towards
+        JOB_MAX_ATTEMPTS.
+        """
+        job = self.jobs[job_id]
+        retries = job.get("rate_limit_retries", 0)
+        if retries >= JOB_RATE_LIMIT_RETRIES:
+            return False
+        pause = self.throttle.rate_limited()
+        job["rate_limit_retries"] = retries + 1
+        job["attempts"] -= 1
+        job["process"] = None
+        self.jobs.set_status(job_id, "queued")
+        if self.execution == "local":
+            self.enqueue(job)
+        print(f"[Job {job_id}] Rate limited, requeued (retry {retries + 1} of {JOB_RATE_LIMIT_RETRIES}, "
+              f"dispatch paused {pause:.0f}s)", flush=True)
+        return True
+
+    async def read_output(self, job_id: str, process: asyncio.subprocess.Process, deadline: float,
+                          idle_timeout: float):
+        """
+        Lines of Claude output until it closes stdout or a deadline passes
+
+        Stops early when no line arrives for idle_timeout seconds or the
+        monotonic deadline is reached, recording why in the job's "timeout".
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = await asyncio.wait_for(process.stdout.readline(), timeout=max(0.0, min(idle_timeout, remaining)))
+            except asyncio.TimeoutError:
+                if idle_timeout < remaining:
+                    self.jobs[job_id]["timeout"] = f"no output for {idle_timeout:.0f}s"
+                else:
+                    self.jobs[job_id]["timeout"] = "ran past its time limit"
+                return
+            if not line:
+                return
+            yield line
 
     async def execute_job(self, job_id: str, job_type: str, params: dict, log_file: Path):
         """Execute Claude Code command and capture output"""
+        self.jobs[job_id]["attempts"] = self.jobs[job_id].get("attempts", 0) + 1
+        self.jobs[job_id]["started_at"] = datetime.now().isoformat()
+        self.jobs[job_id].pop("rate_limited", None)
+        self.jobs[job_id].pop("timeout", None)
+        self.jobs.touch(job_id)
+        started = time.monotonic()
+        self.log_channel(job_id)
+        deadline = started + JOB_TIMEOUTS.get(job_type, 1800)
+        idle_timeout = JOB_IDLE_TIMEOUTS.get(job_type, JOB_IDLE_TIMEOUT)
+        process = None
+        # Keep the log of runs that were rate limited
+        retry = self.jobs[job_id].get("rate_limit_retries", 0)
+        log = None
         try:
+            log = self.open_log(job_id, log_file, "a" if retry else "w")
             # Build the prompt based on job type
             if job_type == "brand_data":
                 prompt = self.build_brand_data_prompt(params)
             elif job_type == "brief":
-                prompt = self.build_brief_prompt(params)
+                prompt = await self.build_brief_prompt(params)
             elif job_type == "draft":
-                prompt = self.build_draft_prompt(params)
+                prompt = await self.build_draft_prompt(params)
             elif job_type == "brief_edit":
                 prompt = self.build_brief_edit_prompt(params)
             elif job_type == "draft_edit":
@@ -378,38 +1357,28 @@ class JobManager:
             else:
                 raise ValueError(f"Unknown job type: {job_type}")
 
-            # Write initial log entry
-            with open(log_file, "w") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                f.write(f"{timestamp} | Starting job type: {job_type}\n")
-                f.write(f"{timestamp} | Working directory: {BASE_DIR.parent}\n")
-                f.write(f"{timestamp} | Executing Claude Code...\n")
-                f.flush()
+            if self.jobs[job_id]["status"] == "cancelled":
+                # Cancelled while the prompt was built: leave the process pool alone
+                log.write("info", "Cancelled before Claude started")
+                log.flush()
+                print(f"\n[Job {job_id}] ✗ Cancelled before starting\n", flush=True)
+                return
+
+            # Write initial log entries
+            if retry:
+                log.write("info", f"Retrying after rate limit (retry {retry})")
+            log.write("info", f"Starting job type: {job_type}")
+            log.write("info", f"Working directory: {BASE_DIR.parent}")
+            log.write("info", "Executing Claude Code...")
 
-            # Also print to console for local debugging
-            print(f"\n[Job {job_id}] Starting {job_type} job", flush=True)
             print(f"[Job {job_id}] Log file: {log_file}", flush=True)
-            print(f"[Job {job_id}] Working directory: {BASE_DIR.parent}\n", flush=True)
-
-            # Run with stream-json format for real-time output
-            process = await asyncio.create_subprocess_exec(
-                "claude",
-                "--print",
-                "--verbose",
-                "--dangerously-skip-permissions",
-                "--output-format",
-                "stream-json",
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(BASE_DIR.parent)
-            )
 
-            # Write prompt and close stdin
-            if process.stdin:
-                process.stdin.write(prompt.encode())
-                await process.stdin.drain()
-                process.stdin.close()
+            # Run with stream-json format for real-time output, on a pre-spawned process when one is idle.
+            # The pool writes the prompt
+            process, warm = await self.process_pool.acquire(prompt.encode())
+            if self.jobs[job_id]["status"] == "cancelled":
+                # Cancelled while the process was handed over, before cancel_job could see it
+                kill_process_group(process)
 
             self.jobs[job_id]["process"] = process
 
@@ -417,276 +1386,176 @@ class JobManager:
             tool_use_map = {}  # tool_use_id -> tool_name
 
             # Read JSON stream line by line
-            with open(log_file, "a", buffering=1) as f:
-                if process.stdout:
-                    async for line in process.stdout:
-                        try:
-                            data = json.loads(line.decode())
-                            event_type = data.get('type', 'unknown')
-                            timestamp = datetime.now().strftime("%H:%M:%S")
-
-                            # Log different event types
-                            if event_type == 'system' and data.get('subtype') == 'init':
-                                log_entry = f"{timestamp} | Session initialized: {data.get('session_id', 'N/A')}\n"
-                                f.write(log_entry)
-                                f.flush()
-                                print(f"[Job {job_id}] Session initialized", flush=True)
-
-                            elif event_type == 'assistant':
-                                message = data.get('message', {})
-                                content = message.get('content', [])
-                                for item in content:
-                                    if item.get('type') == 'text':
-                                        text = item.get('text', '')
-                                        # Write the actual response text
-                                        log_entry = f"{timestamp} | {text}\n"
-                                        f.write(log_entry)
-                                        f.flush()
-                                        print(f"[Job {job_id}] Response: {text[:100]}...", flush=True)
-
-                                    elif item.get('type') == 'tool_use':
-                                        # Tool call is embedded in assistant message
-                                        tool_name = item.get('name', 'unknown')
-                                        tool_use_id = item.get('id')
-                                        tool_input = item.get('input', {})
-
-                                        # Store mapping for later result matching
-                                        if tool_use_id:
-                                            tool_use_map[tool_use_id] = tool_name
-
-                                        # Format tool input for logging
-                                        input_str = ""
-                                        if isinstance(tool_input, dict):
-                                            # Show key parameters
-                                            if 'command' in tool_input:
-                                                input_str = f" → {tool_input['command'][:100]}"
-                                            elif 'file_path' in tool_input:
-                                                input_str = f" → {tool_input['file_path']}"
-                                            elif 'pattern' in tool_input:
-                                                input_str = f" → pattern: {tool_input['pattern']}"
-                                            elif 'url' in tool_input:
-                                                input_str = f" → {tool_input['url']}"
-                                            elif 'query' in tool_input:
-                                                input_str = f" → query: {tool_input['query'][:80]}"
-                                            elif 'prompt' in tool_input:
-                                                input_str = f" → prompt: {tool_input['prompt'][:80]}"
-
-                                        log_entry = f"{timestamp} | 🔧 Tool: {tool_name}{input_str}\n"
-                                        f.write(log_entry)
-                                        f.flush()
-                                        print(f"[Job {job_id}] 🔧 Tool: {tool_name}{input_str}", flush=True)
-
-                            elif event_type == 'user':
-                                # Tool results come in user messages
-                                message = data.get('message', {})
-                                content = message.get('content', [])
-                                for item in content:
-                                    if item.get('type') == 'tool_result':
-                                        tool_use_id = item.get('tool_use_id')
-                                        tool_name = tool_use_map.get(tool_use_id, 'unknown')
-                                        is_error = item.get('is_error', False)
-                                        result_content = item.get('content', '')
-
-                                        # Get a preview of the result
-                                        result_preview = ""
-                                        if isinstance(result_content, str):
-                                            clean_content = result_content.strip()
-                                            if len(clean_content) > 150:
-                                                result_preview = f" → {clean_content[:150]}..."
-                                            elif clean_content:
-                                                result_preview = f" → {clean_content}"
-                                        elif isinstance(result_content, list) and result_content:
-                                            result_preview = f" → {len(result_content)} items"
-
-                                        status_icon = "✗" if is_error else "✓"
-                                        status_str = 'error' if is_error else 'success'
-                                        log_entry = f"{timestamp} |   {status_icon} {tool_name}: {status_str}{result_preview}\n"
-                                        f.write(log_entry)
-                                        f.flush()
-                                        print(f"[Job {job_id}]   {status_icon} {tool_name}: {status_str}", flush=True)
-
-                            elif event_type == 'result':
-                                status = 'success' if not data.get('is_error') else 'error'
-                                duration = data.get('duration_ms', 0) / 1000
-                                log_entry = f"{timestamp} | Task {status} (took {duration:.1f}s)\n"
-                                f.write(log_entry)
-                                f.flush()
-                                print(f"[Job {job_id}] Task {status}", flush=True)
-
-                        except json.JSONDecodeError:
-                            # Skip invalid JSON lines
-                            pass
-                        except Exception as e:
-                            print(f"[Job {job_id}] Error processing line: {e}", flush=True)
-
-            # Wait for process to complete
-            await process.wait()
-
-            # Update job status
-            with open(log_file, "a") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                f.write(f"{timestamp} | Process completed with return code: {process.returncode}\n")
-                f.flush()
-
-            if process.returncode == 0:
-                self.jobs[job_id]["status"] = "completed"
-                # Find output files
-                output_files = self.find_output_files(job_type, params)
-                self.jobs[job_id]["output_files"] = output_files
-                print(f"\n[Job {job_id}] ✓ Completed successfully", flush=True)
-                print(f"[Job {job_id}] Output files: {output_files}\n", flush=True)
+            first_output = None
+            if process.stdout:
+                async for line in self.read_output(job_id, process, deadline, idle_timeout):
+                    if first_output is None:
+                        first_output = time.monotonic() - started
+                        self.jobs[job_id]["first_output_seconds"] = round(first_output, 3)
+                        self.process_pool.record_first_output(warm, first_output)
+                        print(f"[Job {job_id}] First output after {first_output:.2f}s "
+                              f"({'warm' if warm else 'cold'} process)", flush=True)
+                    try:
+                        data = json.loads(line.decode())
+                        event_type = data.get('type', 'unknown')
+
+                        # Log different event types
+                        if event_type in ('system', 'result') and is_rate_limited(data):
+                            self.jobs[job_id]["rate_limited"] = True
+
+                        if event_type == 'system' and data.get('subtype') == 'init':
+                            log.write("session", f"Session initialized: {data.get('session_id', 'N/A')}")
+
+                        elif event_type == 'assistant':
+                            message = data.get('message', {})
+                            content = message.get('content', [])
+                            for item in content:
+                                if item.get('type') == 'text':
+                                    text = item.get('text', '')
+                                    # Write the actual response text
+                                    log.write("text", text)
+
+                                elif item.get('type') == 'tool_use':
+                                    # Tool call is embedded in assistant message
+                                    tool_name = item.get('name', 'unknown')
+                                    tool_use_id = item.get('id')
+                                    tool_input = item.get('input', {})
+
+                                    # Store mapping for later result matching
+                                    if tool_use_id:
+                                        tool_use_map[tool_use_id] = tool_name
+
+                                    # Format tool input for logging
+                                    input_str = ""
+                                    if isinstance(tool_input, dict):
+                                        # Show key parameters
+                                        if 'command' in tool_input:
+                                            input_str = tool_input['command'][:100]
+                                        elif 'file_path' in tool_input:
+                                            input_str = tool_input['file_path']
+                                        elif 'pattern' in tool_input:
+                                            input_str = f"pattern: {tool_input['pattern']}"
+                                        elif 'url' in tool_input:
+                                            input_str = tool_input['url']
+                                        elif 'query' in tool_input:
+                                            input_str = f"query: {tool_input['query'][:80]}"
+                                        elif 'prompt' in tool_input:
+                                            input_str = f"prompt: {tool_input['prompt'][:80]}"
+
+                                    log.write("tool_use", input_str, tool=tool_name)
+
+                        elif event_type == 'user':
+                            # Tool results come in user messages
+                            message = data.get('message', {})
+                            content = message.get('content', [])
+                            for item in content:
+                                if item.get('type') == 'tool_result':
+                                    tool_use_id = item.get('tool_use_id')
+                                    tool_name = tool_use_map.get(tool_use_id, 'unknown')
+                                    is_error = item.get('is_error', False)
+                                    result_content = item.get('content', '')
+
+                                    # Get a preview of the result
+                                    result_preview = ""
+                                    if isinstance(result_content, str):
+                                        clean_content = result_content.strip()
+                                        if len(clean_content) > 150:
+                                            result_preview = f"{clean_content[:150]}..."
+                                        else:
+                                            result_preview = clean_content
+                                    elif isinstance(result_content, list) and result_content:
+                                        result_preview = f"{len(result_content)} items"
+
+                                    status_str = 'error' if is_error else 'success'
+                                    log.write("tool_result", result_preview, tool=tool_name, status=status_str)
+
+                        elif event_type == 'result':
+                            status = 'success' if not data.get('is_error') else 'error'
+                            if self.jobs[job_id].get("rate_limited"):
+                                status = 'rate limited'
+                            duration = data.get('duration_ms', 0) / 1000
+                            log.write("result", f"Task {status} (took {duration:.1f}s)", status=status)
+
+                    except json.JSONDecodeError:
+                        # Skip invalid JSON lines
+                        pass
+                    except Exception as e:
+                        print(f"[Job {job_id}] Error processing line: {e}", flush=True)
+
+            cancelled = self.jobs[job_id]["status"] == "cancelled"
+
+            # Wait for process to complete, within what is left of the deadline
+            if "timeout" not in self.jobs[job_id] and not cancelled:
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    self.jobs[job_id]["timeout"] = "ran past its time limit"
+
+            timeout = self.jobs[job_id].get("timeout")
+            if timeout or cancelled:
+                # Kill Claude and anything it started, so a hung run frees its slot now
+                kill_process_group(process)
+                await process.wait()
+
+            # Update job status, with the log complete before clients hear about it
+            if cancelled:
+                log.write("info", "Cancelled, process killed")
+            elif timeout:
+                log.write("info", f"Timed out ({timeout}), process killed")
             else:
-                self.jobs[job_id]["status"] = "failed"
+                log.write("info", f"Process completed with return code: {process.returncode}")
+            log.flush()
+
+            if cancelled:
+                print(f"\n[Job {job_id}] ✗ Cancelled\n", flush=True)
+            elif timeout:
+                self.finish_job(job_id, "timed_out")
+                print(f"\n[Job {job_id}] ✗ Timed out: {timeout}\n", flush=True)
+            elif process.returncode == 0:
+                # Find output files, before completing so the completed job carries them
+                output_files = await self.find_output_files(job_type, params)
+                self.jobs[job_id]["output_files"] = output_files
+                self.finish_job(job_id, "completed")
+                if self.jobs[job_id]["status"] == "cancelled":
+                    print(f"\n[Job {job_id}] ✗ Cancelled while collecting output\n", flush=True)
+                else:
+                    key = self.jobs[job_id].get("result_key")
+                    if key is not None and output_files:
+                        self.remember_result(key, job_id, job_type, output_files)
+                    print(f"\n[Job {job_id}] ✓ Completed successfully", flush=True)
+                    print(f"[Job {job_id}] Output files: {output_files}\n", flush=True)
+            elif not (self.jobs[job_id].get("rate_limited") and self.requeue_rate_limited(job_id)):
+                self.finish_job(job_id, "failed")
                 print(f"\n[Job {job_id}] ✗ Failed with return code: {process.returncode}\n", flush=True)
 
         except Exception as e:
-            self.jobs[job_id]["status"] = "failed"
-            with open(log_file, "a") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                f.write(f"{timestamp} | Exception: {str(e)}\n")
-                f.write(f"{timestamp} | Traceback: {traceback.format_exc()}\n")
+            if process is not None:
+                kill_process_group(process)
+            if log is not None:
+                log.write("error", f"Exception: {str(e)}")
+                log.write("error", f"Traceback: {traceback.format_exc()}")
+                log.flush()
+            self.finish_job(job_id, "failed")
             print(f"\n[Job {job_id}] ✗ Exception: {str(e)}\n", flush=True)
 
         finally:
+            if log is not None:
+                log.close()
+            job = self.jobs[job_id]
+            if job["status"] not in ("queued", "running"):
+                self.close_log_channel(job_id)
+            if job["status"] != "cancelled":
+                self.limiter.record(job_type, time.monotonic() - started, job["status"] == "completed",
+                                    job.get("rate_limited", False), job["status"] == "timed_out")
+            if job["status"] == "completed" and not job.get("rate_limited"):
+                self.throttle.succeeded()
+            # A job requeued after a rate limit will still produce its result, so identical submissions keep joining it
+            key = job.get("result_key")
+            if key is not None and self.inflight.get(key) == job_id and job["status"] not in ("queued", "running"):
+                del self.inflight[key]
             # Process queue to start next jobs
             await self.process_queue()
 
-    def _run_claude_with_pty(self, job_id: str, prompt: str, log_file: Path):
-        """Run Claude with PTY for unbuffered output - runs in thread pool"""
-        import subprocess
-        import fcntl
-        import time
-
-        try:
-            # Create a pseudo-terminal
-            master_fd, slave_fd = pty.openpty()
-
-            # Start Claude process with PTY
-            env = os.environ.copy()
-            env['PYTHONUNBUFFERED'] = '1'
-
-            process = subprocess.Popen(
-                ["claude", "--print", "--dangerously-skip-permissions"],
-                stdin=subprocess.PIPE,
-                stdout=slave_fd,
-                stderr=slave_fd,
-                cwd=str(BASE_DIR.parent),
-                env=env,
-                preexec_fn=os.setsid  # Create new session
-            )
-
-            # Store process in jobs
-            self.jobs[job_id]["process"] = process
-
-            # Close slave fd in parent process
-            os.close(slave_fd)
-
-            # Write prompt to stdin and close it
-            if process.stdin:
-                process.stdin.write(prompt.encode())
-                process.stdin.flush()
-                process.stdin.close()
-
-            # Set master_fd to non-blocking mode
-            flags = fcntl.fcntl(master_fd, fcntl.F_GETFL)
-            fcntl.fcntl(master_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-
-            # Read output from master_fd in real-time
-            buffer = ""
-            with open(log_file, "a", buffering=1) as f:
-                while True:
-                    # Use select to wait for data with timeout
-                    ready, _, _ = select.select([master_fd], [], [], 0.1)
-
-                    if ready:
-                        try:
-                            chunk = os.read(master_fd, 1024)
-                            if not chunk:  # EOF
-                                break
-
-                            # Decode chunk
-                            try:
-                                decoded = chunk.decode('utf-8')
-                            except UnicodeDecodeError:
-                                decoded = chunk.decode('utf-8', errors='ignore')
-
-                            buffer += decoded
-
-                            # Process complete lines
-                            while '\n' in buffer:
-                                line, buffer = buffer.split('\n', 1)
-                                # Remove ANSI color codes and control characters
-                                clean_line = re.sub(r'\x1b\[[0-9;]*[mGKHF]', '', line)
-                                if clean_line.strip():
-                                    timestamp = datetime.now().strftime("%H:%M:%S")
-                                    log_entry = f"{timestamp} | {clean_line}\n"
-                                    f.write(log_entry)
-                                    f.flush()
-                                    print(f"[Job {job_id}] {clean_line}", flush=True)
-
-                        except OSError as e:
-                            if e.errno == 5:  # Input/output error - process ended
-                                break
-                            raise
-
-                    # Check if process has finished
-                    if process.poll() is not None:
-                        # Read any remaining data
-                        time.sleep(0.1)
-                        try:
-                            chunk = os.read(master_fd, 4096)
-                            if chunk:
-                                decoded = chunk.decode('utf-8', errors='ignore')
-                                buffer += decoded
-                        except:
-                            pass
-                        break
-
-                # Write any remaining buffer
-                if buffer.strip():
-                    clean_buffer = re.sub(r'\x1b\[[0-9;]*[mGKHF]', '', buffer)
-                    if clean_buffer.strip():
-                        timestamp = datetime.now().strftime("%H:%M:%S")
-                        log_entry = f"{timestamp} | {clean_buffer}\n"
-                        f.write(log_entry)
-                        f.flush()
-                        print(f"[Job {job_id}] {clean_buffer}", flush=True)
-
-            # Close master_fd
-            os.close(master_fd)
-
-            # Wait for process to complete
-            returncode = process.wait()
-
-            # Update job status
-            with open(log_file, "a") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                f.write(f"{timestamp} | Process completed with return code: {returncode}\n")
-                f.flush()
-
-            if returncode == 0:
-                self.jobs[job_id]["status"] = "completed"
-                # Find output files
-                output_files = self.find_output_files(
-                    self.jobs[job_id]["type"],
-                    self.jobs[job_id]["params"]
-                )
-                self.jobs[job_id]["output_files"] = output_files
-                print(f"\n[Job {job_id}] ✓ Completed successfully", flush=True)
-                print(f"[Job {job_id}] Output files: {output_files}\n", flush=True)
-            else:
-                self.jobs[job_id]["status"] = "failed"
-                print(f"\n[Job {job_id}] ✗ Failed with return code: {returncode}\n", flush=True)
-
-        except Exception as e:
-            self.jobs[job_id]["status"] = "failed"
-            print(f"[Job {job_id}] PTY Exception: {str(e)}", flush=True)
-            traceback.print_exc()
-            with open(log_file, "a") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                f.write(f"{timestamp} | PTY Exception: {str(e)}\n")
-                f.write(f"{timestamp} | Traceback: {traceback.format_exc()}\n")
-
     def build_brand_data_prompt(self, params: dict) -> str:
         """Build prompt for brand data generation"""
         brand_name = params["brand_name"]
@@ -750,7 +1619,7 @@ class JobManager:
 
         return prompt
 
-    def build_brief_prompt(self, params: dict) -> str:
+    async def build_brief_prompt(self, params: dict) -> str:
         """Build prompt for brief generation by populating template with actual data"""
         # Sanitize filename
         filename = re.sub(r'[^\w\s-]', '', params["title"].lower())
@@ -762,7 +1631,7 @@ class JobManager:
         brand_data = {}
 
         try:
-            brand_data_content = file_manager.read_file("brand-data", params["brand_data"])
+            brand_data_content = await file_manager.read_file("brand-data", params["brand_data"])
             brand_data = json.loads(brand_data_content)
         except Exception as e:
             print(f"Warning: Could not fetch brand data from storage: {e}")
@@ -854,7 +1723,7 @@ class JobManager:
 
         return prompt
 
-    def build_draft_prompt(self, params: dict) -> str:
+    async def build_draft_prompt(self, params: dict) -> str:
         """Build prompt for draft generation by populating template with actual data"""
         # Extract title from brief filename for output naming
         brief_name = params["brief_filename"].replace("_brief.md", "")
@@ -867,8 +1736,8 @@ class JobManager:
         brand_data = {}
 
         try:
-            brief_content = file_manager.read_file("brief-outputs", params["brief_filename"])
-            brand_data_content = file_manager.read_file("brand-data", params["brand_data_filename"])
+            brief_content = await file_manager.read_file("brief-outputs", params["brief_filename"])
+            brand_data_content = await file_manager.read_file("brand-data", params["brand_data_filename"])
             brand_data = json.loads(brand_data_content)
         except Exception as e:
             print(f"Warning: Could not fetch files from storage: {e}")
@@ -1045,16 +1914,18 @@ class JobManager:
 
         return prompt
 
-    def find_output_files(self, job_type: str, params: dict) -> List[str]:
+    async def find_output_files(self, job_type: str, params: dict) -> List[str]:
         """Find output files created by the job and sync to Supabase if needed"""
         output_files = []
 
-        def sync_to_supabase(local_path: Path, folder: str, filename: str):
-            """Helper to sync local file to Supabase Storage"""
-            if file_manager.use_supabase and local_path.exists():
+        async def sync_to_supabase(local_path: Path, folder: str, filename: str, metadata: Optional[dict] = None):
+            """Helper to sync local file to Supabase Storage, or just tell file listeners about it"""
+            if not file_manager.use_supabase and local_path.exists():
+                await file_manager.notify_external_write(folder, filename, metadata)
+            elif local_path.exists():
                 try:
                     content = local_path.read_text(encoding='utf-8')
-                    file_manager.storage.write_file(folder, filename, content)
+                    await file_manager.write_file(folder, filename, content, metadata)
                     print(f"✓ Synced {filename} to Supabase Storage ({folder})")
                 except Exception as e:
                     print(f"✗ Failed to sync {filename} to Supabase: {e}")
@@ -1068,16 +1939,15 @@ class JobManager:
             local_path = BRAND_DATA_DIR / filename
             if local_path.exists():
                 output_files.append(filename)
-                sync_to_supabase(local_path, "brand-data", filename)
+                await sync_to_supabase(local_path, "brand-data", filename)
 
         elif job_type == "brief":
-            filename = re.sub(r'[^\w\s-]', '', params["title"].lower())
-            filename = re.sub(r'[-\s]+', '_', filename)
-            filename = f"{filename}_brief.md"
+            filename = brief_output_filename(params["title"])
             local_path = BRIEF_OUTPUTS_DIR / filename
             if local_path.exists():
                 output_files.append(filename)
-                sync_to_supabase(local_path, "brief-outputs", filename)
+                await sync_to_supabase(local_path, "brief-outputs", filename,
+                                       await self.output_metadata(job_type, params))
 
         elif job_type == "draft":
             brief_name = params["brief_filename"].replace("_brief.md", "")
@@ -1085,7 +1955,8 @@ class JobManager:
             local_path = DRAFT_OUTPUTS_DIR / filename
             if local_path.exists():
                 output_files.append(filename)
-                sync_to_supabase(local_path, "draft-outputs", filename)
+                await sync_to_supabase(local_path, "draft-outputs", filename,
+                                       await self.output_metadata(job_type, params))
 
         elif job_type == "brief_edit":
             filename = params.get("filename", "")
@@ -1094,7 +1965,7 @@ class JobManager:
             local_path = TEMP_DIFFS_DIR / temp_filename
             if local_path.exists():
                 output_files.append(temp_filename)
-                sync_to_supabase(local_path, "temp-diffs", temp_filename)
+                await sync_to_supabase(local_path, "temp-diffs", temp_filename)
 
         elif job_type == "draft_edit":
             filename = params.get("filename", "")
@@ -1103,20 +1974,44 @@ class JobManager:
             local_path = TEMP_DIFFS_DIR / temp_filename
             if local_path.exists():
                 output_files.append(temp_filename)
-                sync_to_supabase(local_path, "temp-diffs", temp_filename)
+                await sync_to_supabase(local_path, "temp-diffs", temp_filename)
 
         return output_files
 
+    async def output_metadata(self, job_type: str, params: dict) -> Optional[dict]:
+        """Catalog metadata recorded with a brief or draft job's output document"""
+        if job_type == "brief":
+            return {
+                "primary_keyword": params["primary_keyword"],
+                "secondary_keywords": params.get("secondary_keywords", ""),
+                "brand_data": params["brand_data"]
+            }
+        if job_type == "draft":
+            # Drafts inherit the keywords of the brief they were written from
+            brief = await file_manager.get_document("brief-outputs", params["brief_filename"]) or {}
+            return {
+                "primary_keyword": brief.get("primary_keyword"),
+                "secondary_keywords": brief.get("secondary_keywords"),
+                "brand_data": params["brand_data_filename"]
+            }
+        return None
+
     def get_job(self, job_id: str) -> Optional[dict]:
         return self.jobs.get(job_id)
 
-    def list_jobs(self, status: Optional[str] = None) -> List[dict]:
+    def list_jobs(self, status: Optional[str] = None, batch_id: Optional[str] = None) -> List[dict]:
         """List jobs, excluding process objects for JSON serialization"""
-        jobs_list = []
-        for job in self.jobs.values():
-            if status and job["status"] != status:
-                continue
+        if batch_id:
+            selected = self.jobs.in_batch(batch_id)
+            if status:
+                selected = [job for job in selected if job["status"] == status]
+        elif status:
+            selected = self.jobs.with_status(status)
+        else:
+            selected = self.jobs.values()
 
+        jobs_list = []
+        for job in selected:
             # Create serializable job dict without process object
             job_dict = {
                 "id": job["id"],
@@ -1127,7 +2022,8 @@ class JobManager:
                 "log_file": job["log_file"],
                 "output_files": job.get("output_files", []),
                 "batch_id": job.get("batch_id"),
-                "queue_position": job.get("queue_position")
+                "queue_position": self.queue_position(job),
+                "reused_from": job.get("reused_from")
             }
             jobs_list.append(job_dict)
 
@@ -1137,6 +2033,260 @@ class JobManager:
 # Initialize managers
 file_manager = FileManager(use_supabase=True)  # Use Supabase Storage by default
 job_manager = JobManager()
+search_index = SearchIndex()
+duplicate_index = DuplicateIndex(DUPLICATE_THRESHOLD)
+document_feed = DocumentFeed(EVENT_STREAM_BUFFER)
+
+# Long-running tasks started at startup, kept referenced so they are not garbage collected
+background_tasks = set()
+
+
+def index_document_change(event: str, folder: str, filename: str, content: Optional[str],
+                          metadata: Optional[dict]):
+    """Keep the search index in step with writes and deletes made through FileManager"""
+    if folder not in SEARCH_FOLDERS or not filename.endswith(".md"):
+        return
+    if event == "delete":
+        search_index.remove(folder, filename)
+    else:
+        search_index.add(folder, filename, content, extract_title(content, filename), datetime.now().timestamp())
+
+
+file_manager.add_listener(index_document_change)
+
+
+def index_brief_change(event: str, folder: str, filename: str, content: Optional[str],
+                       metadata: Optional[dict]):
+    """Keep the duplicate index in step with briefs written or deleted through FileManager"""
+    if folder != "brief-outputs" or not filename.endswith(".md"):
+        return
+    if event == "delete":
+        duplicate_index.remove(filename)
+        return
+    # Edits and uploads carry no metadata; keep the keywords already known for the brief
+    previous = duplicate_index.get(filename)
+    metadata = metadata or {}
+    duplicate_index.add(
+        filename,
+        extract_title(content, filename),
+        metadata.get("primary_keyword") or (previous.primary_keyword if previous else ""),
+        metadata.get("secondary_keywords") or (previous.secondary_keywords if previous else "")
+    )
+
+
+file_manager.add_listener(index_brief_change)
+
+
+def forget_deleted_output(event: str, folder: str, filename: str, content: Optional[str],
+                          metadata: Optional[dict]):
+    """Identical submissions must run again once the output they would reuse is deleted"""
+    if event == "delete":
+        job_manager.forget_output(folder, filename)
+
+
+file_manager.add_listener(forget_deleted_output)
+
+
+def publish_document_change(event: str, folder: str, filename: str, content: Optional[str],
+                            metadata: Optional[dict]):
+    """Push brief and draft changes to the document change feed, with the fields their listing shows"""
+    if folder not in SEARCH_FOLDERS or not filename.endswith(".md"):
+        return
+    if event == "delete":
+        document_feed.publish(folder, filename, None)
+        return
+    title = extract_title(content, filename)
+    word_count = len(content.split())
+    now = datetime.now().timestamp()
+    document = {
+        "name": filename,
+        "title": title,
+        "word_count": word_count,
+        # As in the listings, the UI shows the title as the preview and the word count as the size
+        "preview": title,
+        "size": word_count,
+        "updated_at": now,
+        **{key: value for key, value in (metadata or {}).items() if value is not None}
+    }
+    if document_feed.is_new(folder, filename):
+        document["created_at"] = now
+    document_feed.publish(folder, filename, document)
+
+
+file_manager.add_listener(publish_document_change)
+
+
+async def sync_duplicate_index():
+    """Index existing briefs from the catalog so new requests can be checked against them"""
+    for document in await file_manager.list_documents("brief-outputs"):
+        if duplicate_index.get(document.name) is None:
+            duplicate_index.add(
+                document.name,
+                document.title or document.name,
+                document.primary_keyword or "",
+                document.secondary_keywords or ""
+            )
+    # Brief jobs restored from the job store that have not produced their output yet
+    for status in ("queued", "running"):
+        for job in job_manager.jobs.with_status(status):
+            params = job["params"]
+            filename = brief_output_filename(params["title"]) if job["type"] == "brief" else None
+            if filename and duplicate_index.get(filename) is None:
+                duplicate_index.add(filename, params["title"], params["primary_keyword"],
+                                    params.get("secondary_keywords", ""), job_id=job["id"])
+    print(f"Duplicate index ready: {duplicate_index.stats()['entries']} briefs")
+
+
+def is_stale_duplicate(entry: DuplicateEntry) -> bool:
+    """Entries reserved by a brief job no longer count once that job has failed, timed out or been cancelled"""
+    if entry.job_id is None:
+        return False
+    job = job_manager.jobs.get(entry.job_id)
+    return job is None or job["status"] in ("failed", "timed_out", "cancelled")
+
+
+def resolve_duplicate_policy(*policies: Optional[str]) -> str:
+    policy = next((p for p in policies if p), DUPLICATE_POLICY)
+    if policy not in DUPLICATE_POLICIES:
+        raise HTTPException(status_code=400, detail=f"Invalid duplicate_policy: {policy}")
+    return policy
+
+
+def find_duplicate_brief(request: BriefGenerateRequest, policy: str) -> Optional[dict]:
+    """Return the closest existing or pending brief to the request, unless duplicates are allowed"""
+    if policy == "allow":
+        return None
+    return duplicate_index.find(
+        request.title, request.primary_keyword, request.secondary_keywords,
+        is_stale=is_stale_duplicate
+    )
+
+
+def reserve_brief(request: BriefGenerateRequest, job_id: str):
+    """Index a submitted brief job under its output file so later requests see it"""
+    filename = brief_output_filename(request.title)
+    existing = duplicate_index.get(filename)
+    if existing is None or is_stale_duplicate(existing):
+        duplicate_index.add(filename, request.title, request.primary_keyword,
+                            request.secondary_keywords, job_id=job_id)
+
+
+async def sync_search_index():
+    """Load the last snapshot, then index documents that changed while the server was down"""
+    snapshot = await asyncio.to_thread(read_snapshot, SEARCH_INDEX_PATH)
+    if snapshot:
+        search_index.load_snapshot(snapshot)
+
+    for folder in SEARCH_FOLDERS:
+        documents = await file_manager.list_documents(folder)
+        names = {d.name for d in documents}
+        document_feed.seed(folder, names)
+        for indexed in [d for d in search_index.documents.values() if d.folder == folder]:
+            if indexed.name not in names:
+                search_index.remove(folder, indexed.name)
+
+        stale = []
+        for document in documents:
+            indexed = search_index.get(folder, document.name)
+            if indexed is None or indexed.updated_at is None or indexed.updated_at < (document.updated_at or 0):
+                stale.append(document)
+
+        async def index_one(document: DocumentResponse):
+            try:
+                content = await file_manager.read_file(folder, document.name)
+            except HTTPException as e:
+                print(f"Skipping {document.name} while indexing: {e.detail}")
+                return
+            search_index.add(folder, document.name, content, extract_title(content, document.name), document.updated_at)
+
+        await asyncio.gather(*(index_one(document) for document in stale))
+
+    print(f"Search index ready: {search_index.stats()['documents']} documents")
+
+
+async def sync_remote_jobs():
+    """Follow job progress written to the job store by workers (remote execution mode)"""
+    while True:
+        await asyncio.sleep(JOB_SYNC_INTERVAL)
+        try:
+            finished = await job_manager.sync_from_store()
+        except Exception as e:
+            print(f"Error syncing jobs from the job store: {e}")
+            continue
+        # Workers write outputs from their own process, so this one's listeners and manifests missed them
+        for job in finished:
+            folder = JOB_OUTPUT_FOLDERS.get(job["type"])
+            if folder and job["status"] == "completed":
+                metadata = await job_manager.output_metadata(job["type"], job["params"])
+                for filename in job.get("output_files", []):
+                    await file_manager.notify_external_write(folder, filename, metadata)
+
+
+async def retain_jobs():
+    """Periodically archive finished jobs that fall outside the retention policy"""
+    while True:
+        await asyncio.sleep(JOB_RETENTION_INTERVAL)
+        try:
+            await job_manager.enforce_retention()
+        except Exception as e:
+            print(f"Error enforcing job retention: {e}")
+
+
+async def snapshot_search_index():
+    """Periodically persist the search index so restarts only reindex what changed"""
+    while True:
+        await asyncio.sleep(SEARCH_SNAPSHOT_INTERVAL)
+        if search_index.dirty:
+            search_index.dirty = False
+            try:
+                await asyncio.to_thread(write_snapshot, SEARCH_INDEX_PATH, search_index.to_snapshot())
+            except Exception as e:
+                search_index.dirty = True
+                print(f"Failed to write search index snapshot: {e}")
+
+
+async def adjust_concurrency():
+    """Periodically check host pressure, and start queued jobs if the limit has grown"""
+    while True:
+        await asyncio.sleep(CONCURRENCY_SAMPLE_INTERVAL)
+        job_manager.limiter.sample_host()
+        await job_manager.process_queue()
+
+
+def start_background_task(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+@app.on_event("startup")
+async def startup():
+    if file_manager.use_supabase:
+        await file_manager.storage.startup()
+    job_manager.jobs.store.start()
+    await job_manager.restore()
+    start_background_task(sync_search_index())
+    start_background_task(sync_duplicate_index())
+    start_background_task(retain_jobs())
+    if JOB_EXECUTION == "remote":
+        start_background_task(sync_remote_jobs())
+    else:
+        start_background_task(adjust_concurrency())
+        job_manager.process_pool.start()
+    start_background_task(snapshot_search_index())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_manager.process_pool.close()
+    # Claude runs in its own process group, so it doesn't see the server's Ctrl-C; restore() requeues these jobs
+    for job in job_manager.jobs.with_status("running"):
+        if job.get("process") is not None:
+            kill_process_group(job["process"])
+    await asyncio.to_thread(job_manager.jobs.store.close)
+    if file_manager.use_supabase:
+        await file_manager.storage.close()
 
 
 # API Endpoints
@@ -1155,22 +2305,80 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "active_jobs": job_manager.active_count(),
-        "max_concurrent_jobs": MAX_CONCURRENT_JOBS,
+        "queued_jobs": job_manager.queued_count(),
+        "max_concurrent_jobs": job_manager.limiter.limit,
         "version": "1.0"
     }
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """Runtime counters for monitoring"""
+    return {
+        "content_cache": file_manager.cache.stats(),
+        "search_index": search_index.stats(),
+        "duplicate_index": duplicate_index.stats(),
+        "jobs": job_manager.jobs.counts(),
+        "job_archive": job_manager.archive.stats(),
+        "job_store": job_manager.jobs.store.stats(),
+        "job_queue": job_manager.queue.stats(),
+        "concurrency": job_manager.limiter.status(),
+        "dispatch_throttle": job_manager.throttle.stats(),
+        "process_pool": job_manager.process_pool.stats(),
+        "event_stream": job_manager.events.stats(),
+        "document_feed": document_feed.stats()
+    }
+
+
+# Admin Endpoints
+@app.get("/api/admin/concurrency")
+async def get_concurrency():
+    """Current job slot limit, how it was reached and the signals it adapts to"""
+    return {**job_manager.limiter.status(), "active_jobs": job_manager.active_count()}
+
+
+@app.put("/api/admin/concurrency")
+async def set_concurrency(request: ConcurrencyOverrideRequest):
+    """Pin the job slot limit, or send a null limit to let it adapt again"""
+    if request.limit is not None and request.limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be at least 1")
+    job_manager.limiter.set_override(request.limit)
+    print(f"Concurrency limit {'set to ' + str(request.limit) if request.limit else 'adapting again'}", flush=True)
+    await job_manager.process_queue()
+    return {**job_manager.limiter.status(), "active_jobs": job_manager.active_count()}
+
+
+# Search Endpoint
+@app.get("/api/search")
+async def search_documents(
+    q: str = Query(..., min_length=1),
+    folder: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Full-text search over briefs and drafts, ranked with BM25"""
+    if folder and folder not in SEARCH_FOLDERS:
+        raise HTTPException(status_code=400, detail=f"Folder must be one of: {', '.join(SEARCH_FOLDERS)}")
+    hits = search_index.search(q, folders=[folder] if folder else None, limit=limit)
+    return {"query": q, "hits": hits}
+
+
 # Brand Data Endpoints
 @app.get("/api/brand-data")
-async def list_brand_data():
-    files = file_manager.list_files("brand-data", "json")
-    return {"files": [f.dict() for f in files]}
+async def list_brand_data(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    prefix: Optional[str] = None
+):
+    listing = await file_manager.sorted_listing("brand-data", "json", sort)
+    rows, next_cursor = paginate_files(listing, limit, cursor, sort, prefix)
+    return {"files": [FileResponse(**row).dict() for row in rows], "next_cursor": next_cursor}
 
 
 @app.get("/api/brand-data/{filename}")
 async def get_brand_data(filename: str):
     try:
-        content = file_manager.read_file("brand-data", filename)
+        content = await file_manager.read_file("brand-data", filename)
         return json.loads(content)
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Invalid JSON file")
@@ -1200,7 +2408,7 @@ async def save_brand_data(request: BrandDataSaveRequest):
     try:
         # Validate JSON content
         content_str = json.dumps(request.content, indent=2, ensure_ascii=False)
-        file_manager.save_file("brand-data", request.filename, content_str)
+        await file_manager.save_file("brand-data", request.filename, content_str)
         return {"success": True, "message": "Brand data saved successfully"}
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON content")
@@ -1208,7 +2416,7 @@ async def save_brand_data(request: BrandDataSaveRequest):
 
 @app.delete("/api/brand-data/{filename}")
 async def delete_brand_data(filename: str):
-    success = file_manager.delete_file("brand-data", filename)
+    success = await file_manager.delete_file("brand-data", filename)
     if not success:
         raise HTTPException(status_code=404, detail="File not found")
     return {"success": True}
@@ -1230,28 +2438,24 @@ async def generate_brand_data(request: BrandDataGenerateRequest):
 
 # Brief Endpoints
 @app.get("/api/briefs")
-async def list_briefs():
-    files = file_manager.list_files("brief-outputs", "md")
-    # Extract title from first H1 header for each file
-    for file in files:
-        try:
-            content = file_manager.read_file("brief-outputs", file.name)
-            # Extract title from content (first H1 or filename)
-            match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-            title = match.group(1) if match else file.name.replace("_", " ").replace(".md", "")
-            file.preview = title
-            # Count words
-            word_count = len(content.split())
-            file.size = word_count  # Store word count in size field for display
-        except Exception as e:
-            print(f"Error processing brief {file.name}: {e}")
-
-    return {"files": [f.dict() for f in files]}
+async def list_briefs(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    prefix: Optional[str] = None,
+    brand_data: Optional[str] = None,
+    keyword: Optional[str] = None,
+    q: Optional[str] = None
+):
+    """List briefs from the document catalog, without reading their contents"""
+    listing = await file_manager.sorted_listing("brief-outputs", "md", sort, DOCUMENT_SORT_FIELDS, document_row)
+    rows, next_cursor = paginate_files(listing, limit, cursor, sort, prefix, document_filter(brand_data, keyword, q))
+    return {"files": [DocumentResponse(**row).dict() for row in rows], "next_cursor": next_cursor}
 
 
 @app.get("/api/briefs/{filename}")
 async def get_brief(filename: str):
-    content = file_manager.read_file("brief-outputs", filename)
+    content = await file_manager.read_file("brief-outputs", filename)
     return {"content": content}
 
 
@@ -1270,13 +2474,13 @@ async def save_brief(request: BriefSaveRequest):
     if not request.filename.endswith(".md"):
         raise HTTPException(status_code=400, detail="Filename must end with .md")
 
-    file_manager.save_file("brief-outputs", request.filename, request.content)
+    await file_manager.save_file("brief-outputs", request.filename, request.content)
     return {"success": True, "message": "Brief saved successfully"}
 
 
 @app.delete("/api/briefs/{filename}")
 async def delete_brief(filename: str):
-    success = file_manager.delete_file("brief-outputs", filename)
+    success = await file_manager.delete_file("brief-outputs", filename)
     if not success:
         raise HTTPException(status_code=404, detail="File not found")
     return {"success": True}
@@ -1291,7 +2495,7 @@ async def generate_brief(request: BriefGenerateRequest):
     if file_manager.use_supabase:
         try:
             # Try to read from Supabase to verify it exists
-            file_manager.read_file("brand-data", request.brand_data)
+            await file_manager.read_file("brand-data", request.brand_data)
         except HTTPException:
             raise HTTPException(status_code=404, detail="Brand data file not found")
     else:
@@ -1300,12 +2504,27 @@ async def generate_brief(request: BriefGenerateRequest):
         if not brand_data_path.exists():
             raise HTTPException(status_code=404, detail="Brand data file not found")
 
-    job_id = await job_manager.start_job("brief", {
+    params = {
         "title": request.title,
         "primary_keyword": request.primary_keyword,
         "secondary_keywords": request.secondary_keywords,
         "brand_data": request.brand_data
-    })
+    }
+    policy = resolve_duplicate_policy(request.duplicate_policy)
+    # Regenerating on purpose, or resubmitting a brief whose job is reused, doesn't add a near-duplicate
+    duplicate = None
+    if not request.force and not await job_manager.reuses("brief", params):
+        duplicate = find_duplicate_brief(request, policy)
+    if duplicate and policy == "skip":
+        raise HTTPException(status_code=409, detail={
+            "message": f"A similar brief already exists: {duplicate['title']}",
+            "duplicate_of": duplicate
+        })
+
+    job_id = await job_manager.start_job("brief", params, force=request.force)
+    reserve_brief(request, job_id)
+    if duplicate:
+        return {"job_id": job_id, "duplicate_of": duplicate}
     return {"job_id": job_id}
 
 
@@ -1328,7 +2547,7 @@ async def generate_briefs_batch(request: BriefBatchGenerateRequest):
         # Check if brand data exists (Supabase or local)
         if file_manager.use_supabase:
             try:
-                file_manager.read_file("brand-data", brief_request.brand_data)
+                await file_manager.read_file("brand-data", brief_request.brand_data)
             except HTTPException:
                 raise HTTPException(status_code=404, detail=f"Brand data file not found: {brief_request.brand_data}")
         else:
@@ -1336,24 +2555,44 @@ async def generate_briefs_batch(request: BriefBatchGenerateRequest):
             if not brand_data_path.exists():
                 raise HTTPException(status_code=404, detail=f"Brand data file not found: {brief_request.brand_data}")
 
-    # Create all jobs concurrently using asyncio.gather
-    job_tasks = [
-        job_manager.start_job("brief", {
+    policies = [resolve_duplicate_policy(b.duplicate_policy, request.duplicate_policy) for b in request.briefs]
+
+    # Submit in order so each brief is also checked against earlier briefs in the batch
+    job_ids = []
+    skipped = []
+    flagged = []
+    for index, (brief_request, policy) in enumerate(zip(request.briefs, policies)):
+        params = {
             "title": brief_request.title,
             "primary_keyword": brief_request.primary_keyword,
             "secondary_keywords": brief_request.secondary_keywords,
             "brand_data": brief_request.brand_data
-        }, batch_id=batch_id)
-        for brief_request in request.briefs
-    ]
-
-    job_ids = await asyncio.gather(*job_tasks)
+        }
+        force = brief_request.force or request.force
+        duplicate = None
+        if not force and not await job_manager.reuses("brief", params, batch_id):
+            duplicate = find_duplicate_brief(brief_request, policy)
+        if duplicate and policy == "skip":
+            skipped.append({"index": index, "title": brief_request.title, "duplicate_of": duplicate})
+            continue
+
+        job_id = await job_manager.start_job("brief", params, batch_id=batch_id, force=force)
+        reserve_brief(brief_request, job_id)
+        job_ids.append(job_id)
+        if duplicate:
+            flagged.append({"index": index, "title": brief_request.title, "job_id": job_id, "duplicate_of": duplicate})
+
+    message = f"Batch of {len(job_ids)} brief(s) submitted successfully"
+    if skipped:
+        message += f" ({len(skipped)} near-duplicate(s) skipped)"
 
     return BatchJobResponse(
         batch_id=batch_id,
         job_ids=job_ids,
         total_jobs=len(job_ids),
-        message=f"Batch of {len(job_ids)} brief(s) submitted successfully"
+        message=message,
+        skipped=skipped,
+        flagged=flagged
     )
 
 
@@ -1366,7 +2605,7 @@ async def edit_brief_with_ai(request: BriefEditWithAIRequest):
     # Check if brief file exists (check both Supabase and local)
     if file_manager.use_supabase:
         try:
-            file_manager.read_file("brief-outputs", request.filename)
+            await file_manager.read_file("brief-outputs", request.filename)
         except HTTPException:
             raise HTTPException(status_code=404, detail="Brief file not found")
     else:
@@ -1388,28 +2627,24 @@ async def edit_brief_with_ai(request: BriefEditWithAIRequest):
 
 # Draft Endpoints
 @app.get("/api/drafts")
-async def list_drafts():
-    files = file_manager.list_files("draft-outputs", "md")
-    # Extract metadata
-    for file in files:
-        try:
-            content = file_manager.read_file("draft-outputs", file.name)
-            # Extract title
-            match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-            title = match.group(1) if match else file.name.replace("_", " ").replace(".md", "")
-            file.preview = title
-            # Count words
-            word_count = len(content.split())
-            file.size = word_count
-        except Exception as e:
-            print(f"Error processing draft {file.name}: {e}")
-
-    return {"files": [f.dict() for f in files]}
+async def list_drafts(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    prefix: Optional[str] = None,
+    brand_data: Optional[str] = None,
+    keyword: Optional[str] = None,
+    q: Optional[str] = None
+):
+    """List drafts from the document catalog, without reading their contents"""
+    listing = await file_manager.sorted_listing("draft-outputs", "md", sort, DOCUMENT_SORT_FIELDS, document_row)
+    rows, next_cursor = paginate_files(listing, limit, cursor, sort, prefix, document_filter(brand_data, keyword, q))
+    return {"files": [DocumentResponse(**row).dict() for row in rows], "next_cursor": next_cursor}
 
 
 @app.get("/api/drafts/{filename}")
 async def get_draft(filename: str):
-    content = file_manager.read_file("draft-outputs", filename)
+    content = await file_manager.read_file("draft-outputs", filename)
     return {"content": content}
 
 
@@ -1428,13 +2663,13 @@ async def save_draft(request: DraftSaveRequest):
     if not request.filename.endswith(".md"):
         raise HTTPException(status_code=400, detail="Filename must end with .md")
 
-    file_manager.save_file("draft-outputs", request.filename, request.content)
+    await file_manager.save_file("draft-outputs", request.filename, request.content)
     return {"success": True, "message": "Draft saved successfully"}
 
 
 @app.delete("/api/drafts/{filename}")
 async def delete_draft(filename: str):
-    success = file_manager.delete_file("draft-outputs", filename)
+    success = await file_manager.delete_file("draft-outputs", filename)
     if not success:
         raise HTTPException(status_code=404, detail="File not found")
     return {"success": True}
@@ -1449,8 +2684,8 @@ async def generate_draft(request: DraftGenerateRequest):
     if file_manager.use_supabase:
         try:
             # Try to read from Supabase to verify files exist
-            file_manager.read_file("brief-outputs", request.brief_filename)
-            file_manager.read_file("brand-data", request.brand_data_filename)
+            await file_manager.read_file("brief-outputs", request.brief_filename)
+            await file_manager.read_file("brand-data", request.brand_data_filename)
         except HTTPException as e:
             if "Brief" in str(e.detail):
                 raise HTTPException(status_code=404, detail="Brief file not found")
@@ -1470,7 +2705,7 @@ async def generate_draft(request: DraftGenerateRequest):
         "brief_filename": request.brief_filename,
         "brand_data_filename": request.brand_data_filename,
         "target_word_count": request.target_word_count
-    })
+    }, force=request.force)
     return {"job_id": job_id}
 
 
@@ -1493,8 +2728,8 @@ async def generate_drafts_batch(request: DraftBatchGenerateRequest):
         # Check if files exist (Supabase or local)
         if file_manager.use_supabase:
             try:
-                file_manager.read_file("brief-outputs", draft_request.brief_filename)
-                file_manager.read_file("brand-data", draft_request.brand_data_filename)
+                await file_manager.read_file("brief-outputs", draft_request.brief_filename)
+                await file_manager.read_file("brand-data", draft_request.brand_data_filename)
             except HTTPException as e:
                 if "Brief" in str(e.detail):
                     raise HTTPException(status_code=404, detail=f"Brief file not found: {draft_request.brief_filename}")
@@ -1516,7 +2751,7 @@ async def generate_drafts_batch(request: DraftBatchGenerateRequest):
             "brief_filename": draft_request.brief_filename,
             "brand_data_filename": draft_request.brand_data_filename,
             "target_word_count": draft_request.target_word_count
-        }, batch_id=batch_id)
+        }, batch_id=batch_id, force=draft_request.force or request.force)
         for draft_request in request.drafts
     ]
 
@@ -1539,7 +2774,7 @@ async def edit_draft_with_ai(request: DraftEditWithAIRequest):
     # Check if draft file exists (check both Supabase and local)
     if file_manager.use_supabase:
         try:
-            file_manager.read_file("draft-outputs", request.filename)
+            await file_manager.read_file("draft-outputs", request.filename)
         except HTTPException:
             raise HTTPException(status_code=404, detail="Draft file not found")
     else:
@@ -1567,7 +2802,7 @@ async def get_diff(diff_id: str):
         # Use Supabase Storage
         try:
             # List files in temp-diffs folder to find the matching diff
-            temp_files = file_manager.storage.list_files("temp-diffs", "md")
+            temp_files = await file_manager.storage.list_files("temp-diffs", "md")
             diff_file = None
             for file in temp_files:
                 if file["name"].startswith(f"{diff_id}_"):
@@ -1578,7 +2813,7 @@ async def get_diff(diff_id: str):
                 raise HTTPException(status_code=404, detail="Diff not found")
 
             # Read edited content
-            edited_content = file_manager.read_file("temp-diffs", diff_file["name"])
+            edited_content = await file_manager.read_file("temp-diffs", diff_file["name"])
 
             # Extract original filename
             original_filename = diff_file["name"].replace(f"{diff_id}_", "")
@@ -1586,10 +2821,10 @@ async def get_diff(diff_id: str):
             # Determine the type and get original content
             if original_filename.endswith("_brief.md"):
                 file_type = "brief"
-                original_content = file_manager.read_file("brief-outputs", original_filename)
+                original_content = await file_manager.read_file("brief-outputs", original_filename)
             else:
                 file_type = "draft"
-                original_content = file_manager.read_file("draft-outputs", original_filename)
+                original_content = await file_manager.read_file("draft-outputs", original_filename)
 
             return {
                 "diff_id": diff_id,
@@ -1641,7 +2876,7 @@ async def approve_diff(request: DiffApproveRequest):
         # Use Supabase Storage
         try:
             # Find the diff file
-            temp_files = file_manager.storage.list_files("temp-diffs", "md")
+            temp_files = await file_manager.storage.list_files("temp-diffs", "md")
             diff_file = None
             for file in temp_files:
                 if file["name"].startswith(f"{request.diff_id}_"):
@@ -1660,10 +2895,10 @@ async def approve_diff(request: DiffApproveRequest):
                 folder = "draft-outputs"
 
             # Save the edited content to the original file using write_file to create/update
-            file_manager.storage.write_file(folder, original_filename, request.edited_content)
+            await file_manager.write_file(folder, original_filename, request.edited_content)
 
             # Delete the temporary diff file
-            file_manager.delete_file("temp-diffs", diff_file["name"])
+            await file_manager.delete_file("temp-diffs", diff_file["name"])
 
             return {"success": True, "message": "Changes approved and applied successfully"}
         except Exception as e:
@@ -1679,15 +2914,14 @@ async def approve_diff(request: DiffApproveRequest):
         diff_file = diff_files[0]
         original_filename = diff_file.name.replace(f"{request.diff_id}_", "")
 
-        if original_filename.endswith("_brief.md"):
-            original_file = BRIEF_OUTPUTS_DIR / original_filename
-        else:
-            original_file = DRAFT_OUTPUTS_DIR / original_filename
+        folder = "brief-outputs" if original_filename.endswith("_brief.md") else "draft-outputs"
+        original_file = BASE_DIR / folder / original_filename
 
         if not original_file.exists():
             raise HTTPException(status_code=404, detail="Original file not found")
 
-        original_file.write_text(request.edited_content, encoding='utf-8')
+        # Through FileManager so the search index and change feed see the edit
+        await file_manager.write_file(folder, original_filename, request.edited_content)
         diff_file.unlink()
 
         return {"success": True, "message": "Changes approved and applied successfully"}
@@ -1700,7 +2934,7 @@ async def reject_diff(request: DiffRejectRequest):
         # Use Supabase Storage
         try:
             # Find the diff file
-            temp_files = file_manager.storage.list_files("temp-diffs", "md")
+            temp_files = await file_manager.storage.list_files("temp-diffs", "md")
             diff_file = None
             for file in temp_files:
                 if file["name"].startswith(f"{request.diff_id}_"):
@@ -1711,7 +2945,7 @@ async def reject_diff(request: DiffRejectRequest):
                 raise HTTPException(status_code=404, detail="Diff not found")
 
             # Delete the temporary diff file
-            file_manager.delete_file("temp-diffs", diff_file["name"])
+            await file_manager.delete_file("temp-diffs", diff_file["name"])
 
             return {"success": True, "message": "Changes rejected successfully"}
         except Exception as e:
@@ -1731,14 +2965,14 @@ async def reject_diff(request: DiffRejectRequest):
 
 # Job Endpoints
 @app.get("/api/jobs")
-async def list_jobs(status: Optional[str] = None):
-    jobs_list = job_manager.list_jobs(status)
+async def list_jobs(status: Optional[str] = None, batch_id: Optional[str] = None):
+    jobs_list = job_manager.list_jobs(status, batch_id)
     return {"jobs": jobs_list}
 
 
 @app.get("/api/jobs/{job_id}")
 async def get_job(job_id: str):
-    job = job_manager.get_job(job_id)
+    job = job_manager.get_job(job_id) or await job_manager.get_archived_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -1752,65 +2986,224 @@ async def get_job(job_id: str):
         "log_file": job["log_file"],
         "output_files": job.get("output_files", []),
         "batch_id": job.get("batch_id"),
-        "queue_position": job.get("queue_position")
+        "queue_position": job_manager.queue_position(job),
+        "reused_from": job.get("reused_from"),
+        "finished_at": job.get("finished_at"),
+        "timeout": job.get("timeout"),
+        "archived": job.get("archived", False)
     }
     return job_response
 
 
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job, freeing its slot for the next queued job"""
+    job = await job_manager.cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    await job_manager.process_queue()
+    return {"job_id": job_id, "status": job["status"]}
+
+
+@app.get("/api/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """Progress of a batch in one request: counts by status, each job's state and an ETA"""
+    batch = job_manager.batch_status(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+
+@app.post("/api/batches/{batch_id}/cancel")
+async def cancel_batch(batch_id: str):
+    """Cancel every queued or running job in a batch"""
+    if not job_manager.jobs.in_batch(batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    cancelled = await job_manager.cancel_batch(batch_id)
+    await job_manager.process_queue()
+    return {"batch_id": batch_id, "cancelled": [job["id"] for job in cancelled]}
+
+
+@app.get("/api/events")
+async def stream_events(
+    job_ids: Optional[str] = None,
+    batch_ids: Optional[str] = None,
+    types: Optional[str] = None,
+    logs: bool = False
+):
+    """
+    One Server-Sent Events stream of job updates, instead of a stream or poll per job
+
+    job_ids, batch_ids and types are comma-separated filters; with no job or
+    batch filter, every job is watched. The stream opens with a "snapshot"
+    of the watched jobs (all queued and running jobs when unfiltered) and
+    then sends "job" events on status changes, "queue" events with changed
+    queue positions and, with logs=true, "log" lines of jobs run by this
+    process. A "snapshot" is sent again if the client falls behind.
+    """
+    def split(value: Optional[str]) -> List[str]:
+        return [item for item in (value or "").split(",") if item]
+
+    def snapshot(subscription: Subscription) -> dict:
+        if subscription.job_ids or subscription.batch_ids:
+            watched = [job_manager.jobs.get(job_id) for job_id in subscription.job_ids]
+            for batch_id in subscription.batch_ids:
+                watched.extend(job_manager.jobs.in_batch(batch_id))
+        else:
+            watched = job_manager.jobs.with_status("running") + job_manager.jobs.with_status("queued")
+        jobs = {job["id"]: job for job in watched if job is not None and subscription.matches(job)}
+        return {
+            "event": "snapshot",
+            "data": json.dumps({"jobs": [job_manager.job_summary(job) for job in jobs.values()]})
+        }
+
+    async def event_generator():
+        # Subscribed before the snapshot, so nothing that happens meanwhile is missed
+        subscription = job_manager.events.subscribe(split(job_ids), split(batch_ids), split(types), logs)
+        try:
+            yield snapshot(subscription)
+            async for event in subscription.events():
+                yield snapshot(subscription) if event is RESYNC else event
+        finally:
+            job_manager.events.unsubscribe(subscription)
+
+    return EventSourceResponse(event_generator())
+
+
+@app.get("/api/documents/events")
+async def stream_document_events(folders: Optional[str] = None):
+    """
+    Server-Sent Events for briefs and drafts being created, updated or deleted
+
+    folders is a comma-separated filter (brief-outputs, draft-outputs). The
+    stream opens with a "resync" event, sent again if the client falls
+    behind: the client should (re)load its listing then, and apply the
+    "created", "updated" and "deleted" events that follow to it. Created and
+    updated events carry the document's listing fields under "document".
+    """
+    watched = [folder for folder in (folders or "").split(",") if folder]
+    unknown = [folder for folder in watched if folder not in SEARCH_FOLDERS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown folder: {unknown[0]}")
+
+    async def event_generator():
+        subscription = document_feed.subscribe(watched)
+        try:
+            # Subscribed first, so changes made while the client reloads its listing still arrive
+            yield {"event": "resync", "data": "{}"}
+            async for event in subscription.events():
+                yield {"event": "resync", "data": "{}"} if event is RESYNC else event
+        finally:
+            document_feed.unsubscribe(subscription)
+
+    return EventSourceResponse(event_generator())
+
+
+def log_event(entry: Tuple[int, int, str]) -> dict:
+    """SSE event for a log line; its id is the byte offset after the line, so a reconnect resumes there"""
+    _, end, line = entry
+    return {"event": "log", "id": str(end), "data": json.dumps({"message": line.strip()})}
+
+
 @app.get("/api/jobs/{job_id}/logs")
-async def stream_logs(job_id: str):
-    """Stream job logs using Server-Sent Events"""
-    job = job_manager.get_job(job_id)
+async def stream_logs(
+    job_id: str,
+    request: Request,
+    offset: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    last_event_id: Optional[str] = None
+):
+    """
+    Stream job logs using Server-Sent Events, or return one page of them
+
+    The stream starts at the byte offset in the Last-Event-ID header (sent by
+    browsers when they reconnect) or the last_event_id parameter, and from
+    the start of the log otherwise. With offset or limit, returns up to limit
+    lines ending before byte offset offset (default: the end of the log)
+    instead, for loading history a page at a time.
+    """
+    job = job_manager.get_job(job_id) or await job_manager.get_archived_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    log_file = Path(job["log_file"])
+    # Archived jobs keep a gzipped copy of their log, or none if it was missing
+    log_file = Path(job["log_file"]) if job.get("log_file") else None
 
-    async def event_generator():
-        # If log file doesn't exist yet, wait for it
-        for _ in range(10):
-            if log_file.exists():
-                break
-            await asyncio.sleep(0.5)
+    if offset is not None or limit is not None:
+        entries = []
+        if log_file is not None and log_file.exists():
+            entries = await asyncio.to_thread(read_log_before, log_file, offset, limit or LOG_PAGE_SIZE)
+        start = entries[0][0] if entries else (offset or 0)
+        return {
+            "job_id": job_id,
+            "lines": [line.strip() for _, _, line in entries],
+            "start": start,
+            "end": entries[-1][1] if entries else start,
+        }
 
-        if not log_file.exists():
-            yield {
-                "event": "error",
-                "data": json.dumps({"message": "Log file not found"})
-            }
-            return
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    try:
+        position = int(resume_from) if resume_from else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be a log offset")
+
+    def current() -> dict:
+        # Look the job up each time: syncing from the store replaces its record
+        return job_manager.get_job(job_id) or job
+
+    async def event_generator():
+        nonlocal position
+        channel = job_manager.log_channel(job_id)
 
-        # Read existing logs
-        with open(log_file, "r") as f:
-            for line in f:
+        if channel is not None:
+            # Job runs in this process: catch up from the file, then follow lines as they are written
+            if log_file.exists():
+                if position > log_file.stat().st_size:
+                    # The log was rewritten since the client last saw it
+                    position = 0
+                for entry in await asyncio.to_thread(read_log, log_file, position):
+                    yield log_event(entry)
+                    position = entry[1]
+            async for entry in channel.follow(position):
+                if entry[0] > position:
+                    # Fell behind the channel's buffer; catch up from the file
+                    for missed in await asyncio.to_thread(read_log, log_file, position, entry[0]):
+                        yield log_event(missed)
+                yield log_event(entry)
+                position = entry[1]
+        else:
+            # Job runs in a worker or has finished: poll its log file until the job is final.
+            # A job still queued for a worker has no log yet
+            while current()["status"] in ("queued", "running"):
+                if log_file is not None and log_file.exists():
+                    if position > log_file.stat().st_size:
+                        # A worker re-ran the job after its lease expired and rewrote the log
+                        position = 0
+                    for entry in await asyncio.to_thread(read_log, log_file, position):
+                        yield log_event(entry)
+                        position = entry[1]
+                await asyncio.sleep(0.5)
+
+            if log_file is None or not log_file.exists():
                 yield {
-                    "event": "log",
-                    "data": json.dumps({"message": line.strip()})
+                    "event": "error",
+                    "data": json.dumps({"message": "Log file not found"})
                 }
-
-        # Stream new logs
-        last_size = log_file.stat().st_size
-        while job["status"] == "running":
-            await asyncio.sleep(0.5)
-            current_size = log_file.stat().st_size
-
-            if current_size > last_size:
-                with open(log_file, "r") as f:
-                    f.seek(last_size)
-                    for line in f:
-                        yield {
-                            "event": "log",
-                            "data": json.dumps({"message": line.strip()})
-                        }
-                last_size = current_size
+                return
+            if position > log_file.stat().st_size and log_file.suffix != ".gz":
+                position = 0
+            # Nothing more will be written, so a last line without a newline is complete
+            for entry in await asyncio.to_thread(read_log, log_file, position, None, True):
+                yield log_event(entry)
 
         # Send completion event
+        finished = current()
         yield {
             "event": "complete",
             "data": json.dumps({
                 "job_id": job_id,
-                "status": job["status"],
-                "output_files": job.get("output_files", [])
+                "status": finished["status"],
+                "output_files": finished.get("output_files", [])
             })
         }
 
@@ -0,0 +1,128 @@
+"""
+Job Log Benchmark
+Log throughput and event loop latency with many concurrent jobs, writing each line with its own
+write, flush and print (as execute_job used to) versus batched NDJSON records through LogSink
+
+Usage: python bench_job_logs.py [--jobs 24] [--records 2000] [--rate 0] [--interval 0.1] [--max-bytes 16384]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from log_channel import LogChannel, LogSink, describe_record
+
+# Record kinds and fields in roughly the mix a Claude run produces
+SAMPLE_RECORDS = [
+    {"kind": "text", "text": "Reviewing the brand guidelines before drafting the outline."},
+    {"kind": "tool_use", "tool": "Read", "text": "backend/brand-data/acme_brand_data.json"},
+    {"kind": "tool_result", "tool": "Read", "status": "success", "text": "{\"brandName\": \"Acme\", ...}"},
+    {"kind": "tool_use", "tool": "WebFetch", "text": "https://example.com/about"},
+    {"kind": "tool_result", "tool": "WebFetch", "status": "success", "text": "Acme builds tools for..."},
+]
+
+
+class LineLogFile:
+    """The old way: every line written, flushed and printed on its own"""
+
+    def __init__(self, path: Path, channel: LogChannel, job_id: str):
+        self.f = open(path, "w")
+        self.channel = channel
+        self.job_id = job_id
+        self.flushes = 0
+
+    def write(self, kind: str, text: str, tool=None, status=None):
+        record = {"kind": kind, "text": text, "tool": tool, "status": status}
+        line = f"{datetime.now().strftime('%H:%M:%S')} | {describe_record(record)}\n"
+        self.f.write(line)
+        self.f.flush()
+        self.channel.publish(line)
+        print(f"[Job {self.job_id}] {describe_record(record)[:100]}", flush=True)
+        self.flushes += 1
+
+    def close(self):
+        self.f.close()
+
+
+async def probe_loop(lags: list, stop: asyncio.Event, interval: float = 0.001):
+    """Record how late the loop wakes a task that sleeps interval seconds"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        before = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - before - interval)
+
+
+async def run_job(log, records: int, rate: float):
+    for i in range(records):
+        log.write(**SAMPLE_RECORDS[i % len(SAMPLE_RECORDS)])
+        # Each stream-json line arrives through an await on the process's stdout
+        await asyncio.sleep(1 / rate if rate > 0 else 0)
+    log.close()
+
+
+async def run(mode: str, jobs: int, records: int, rate: float, interval: float, max_bytes: int,
+              directory: Path) -> dict:
+    channels = [LogChannel(1000) for _ in range(jobs)]
+    if mode == "line":
+        logs = [LineLogFile(directory / f"{mode}-{i}.log", channels[i], str(i)) for i in range(jobs)]
+    else:
+        logs = [LogSink(directory / f"{mode}-{i}.log", "w", channels[i], interval, max_bytes, f"[Job {i}] ")
+                for i in range(jobs)]
+
+    lags: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(run_job(log, records, rate) for log in logs))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    lags.sort()
+    return {
+        "records_per_second": jobs * records / elapsed,
+        "seconds": elapsed,
+        "lag_p50_ms": statistics.median(lags) * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+        # Each flush is one write to the log file and one to stdout
+        "writes": 2 * sum(log.flushes for log in logs),
+        "bytes": sum(os.path.getsize(directory / f"{mode}-{i}.log") for i in range(jobs)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=24, help="Concurrent jobs writing logs")
+    parser.add_argument("--records", type=int, default=2000, help="Log records written per job")
+    parser.add_argument("--rate", type=float, default=0, help="Records per second per job; 0 for as fast as possible")
+    parser.add_argument("--interval", type=float, default=0.1, help="LogSink flush interval in seconds")
+    parser.add_argument("--max-bytes", type=int, default=16 * 1024, help="LogSink buffer size that forces a flush")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("line", "batched"):
+            # Console output goes nowhere so the terminal's speed doesn't skew the numbers
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results[mode] = asyncio.run(run(mode, args.jobs, args.records, args.rate, args.interval,
+                                                    args.max_bytes, Path(directory)))
+
+    print(f"{args.jobs} jobs x {args.records} records at {args.rate or 'max'} records/s, "
+          f"flush every {args.interval}s or {args.max_bytes} bytes")
+    print(f"{'mode':<10}{'records/s':>12}{'seconds':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}"
+          f"{'lag max ms':>12}{'writes':>10}{'bytes':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['records_per_second']:>12.0f}{result['seconds']:>10.2f}"
+              f"{result['lag_p50_ms']:>12.2f}{result['lag_p99_ms']:>12.2f}{result['lag_max_ms']:>12.2f}"
+              f"{result['writes']:>10}{result['bytes']:>12}")
+
+
+if __name__ == "__main__":
+    main()
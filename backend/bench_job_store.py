@@ -0,0 +1,94 @@
+"""
+Job Store Benchmark
+Job status transitions per second through JobStore: how fast save() returns to the caller (enqueue),
+how fast the same transitions reach SQLite through the write-behind flush (flushed), and writing
+each transition in its own transaction (direct) for comparison. Write-behind coalesces several
+transitions of a job into one row write, so rows/s shows the disk writes behind the flushed rate
+
+Usage: python bench_job_store.py [--jobs 2000] [--transitions 4] [--interval 0.05]
+"""
+import argparse
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from job_store import JobStore
+
+STATUSES = ["queued", "running", "running", "completed"]
+
+
+def make_jobs(count: int) -> list:
+    """Job records shaped like the ones JobManager creates"""
+    return [{
+        "id": str(uuid.uuid4())[:8],
+        "type": "brief",
+        "status": "queued",
+        "batch_id": None,
+        "created_at": datetime.now().isoformat(),
+        "params": {"brand_name": f"brand-{i}", "topic": "Spring launch", "urls": ["https://example.com"]},
+        "log_file": f"/app/backend/logs/job_{i}.log",
+        "output_files": [],
+        "attempts": 0,
+    } for i in range(count)]
+
+
+def transitions(jobs: list, per_job: int):
+    """Each job's status changes, interleaved across jobs as they would be with many running at once"""
+    for step in range(per_job):
+        for job in jobs:
+            job["status"] = STATUSES[min(step, len(STATUSES) - 1)]
+            job["attempts"] = step
+            yield job
+
+
+def run(mode: str, jobs: int, per_job: int, interval: float, directory: Path) -> dict:
+    store = JobStore(directory / f"{mode}.db", flush_interval=interval)
+    records = make_jobs(jobs)
+    if mode != "direct":
+        store.start()
+
+    started = time.perf_counter()
+    for job in transitions(records, per_job):
+        store.save(job)
+        if mode == "direct":
+            store.flush()
+    enqueued = time.perf_counter() - started
+    # close() waits for the writer thread and flushes whatever is left, so every transition is on disk
+    store.close()
+    flushed = time.perf_counter() - started
+
+    count = jobs * per_job
+    return {
+        "enqueue_per_second": count / enqueued,
+        "flushed_per_second": count / flushed,
+        "rows_per_second": store.rows_written / flushed,
+        "seconds": flushed,
+        "rows_written": store.rows_written,
+        "flushes": store.flushes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000, help="Jobs whose status changes")
+    parser.add_argument("--transitions", type=int, default=4, help="Status changes per job")
+    parser.add_argument("--interval", type=float, default=0.05, help="Write-behind flush interval in seconds")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("direct", "write-behind"):
+            results[mode] = run(mode, args.jobs, args.transitions, args.interval, Path(directory))
+
+    print(f"{args.jobs} jobs x {args.transitions} transitions, flush interval {args.interval}s")
+    print(f"{'mode':<14}{'enqueue/s':>12}{'flushed/s':>12}{'rows/s':>10}{'seconds':>10}{'rows':>10}{'flushes':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<14}{result['enqueue_per_second']:>12.0f}{result['flushed_per_second']:>12.0f}"
+              f"{result['rows_per_second']:>10.0f}"
+              f"{result['seconds']:>10.2f}{result['rows_written']:>10}{result['flushes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Process Pool Benchmark
+Time from job start to the first line of Claude output, spawning the CLI for each job (pool size 0)
+versus handing jobs processes pre-spawned by ProcessPool
+
+Each run sends a real prompt, so point --command at a stub CLI to measure without calling Claude.
+
+Usage: python bench_process_pool.py [--jobs 10] [--size 2] [--gap 2] [--settle 5] [--command "claude --print ..."]
+"""
+import argparse
+import asyncio
+import shlex
+import statistics
+import time
+from pathlib import Path
+
+from process_pool import ProcessPool
+
+DEFAULT_COMMAND = "claude --print --verbose --output-format stream-json"
+
+
+async def run(command: list, size: int, jobs: int, gap: float, settle: float, prompt: bytes) -> dict:
+    pool = ProcessPool(command, str(Path(__file__).parent), size, max_idle_bytes=1 << 40)
+    pool.start()
+    # Give pre-spawned processes time to get through CLI startup, as they would between real jobs
+    await asyncio.sleep(settle if size > 0 else 0)
+
+    latencies = []
+    try:
+        for _ in range(jobs):
+            started = time.monotonic()
+            process, _ = await pool.acquire(prompt)
+            line = await process.stdout.readline()
+            if line:
+                latencies.append(time.monotonic() - started)
+            await process.communicate()
+            await asyncio.sleep(gap)
+    finally:
+        await pool.close()
+
+    stats = pool.stats()
+    latencies.sort()
+    return {
+        "warm": stats["warm_starts"],
+        "cold": stats["cold_starts"],
+        "mean_s": statistics.mean(latencies) if latencies else 0.0,
+        "p50_s": statistics.median(latencies) if latencies else 0.0,
+        "max_s": latencies[-1] if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs run one after another")
+    parser.add_argument("--size", type=int, default=2, help="Idle processes kept by the pool")
+    parser.add_argument("--gap", type=float, default=2.0, help="Seconds between jobs, for the pool to refill")
+    parser.add_argument("--settle", type=float, default=5.0, help="Seconds to let the pool start up before the first job")
+    parser.add_argument("--command", default=DEFAULT_COMMAND, help="Claude CLI command line")
+    parser.add_argument("--prompt", default="Reply with OK.", help="Prompt sent to each process")
+    args = parser.parse_args()
+
+    command = shlex.split(args.command)
+    results = {}
+    for mode, size in (("cold", 0), ("pooled", args.size)):
+        results[mode] = asyncio.run(run(command, size, args.jobs, args.gap, args.settle, args.prompt.encode()))
+
+    print(f"{args.jobs} jobs {args.gap}s apart, pool of {args.size}: {args.command}")
+    print(f"{'mode':<10}{'warm':>6}{'cold':>6}{'first output mean s':>22}{'p50 s':>9}{'max s':>9}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['warm']:>6}{result['cold']:>6}{result['mean_s']:>22.3f}"
+              f"{result['p50_s']:>9.3f}{result['max_s']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Concurrency Module
+AIMD limiter that adapts the number of concurrent Claude jobs to latency, errors and host pressure,
+and a token bucket that paces job starts and backs off while the upstream API is throttling
+"""
+import os
+import random
+import re
+import time
+from typing import Dict, Optional
+
+# Result text from Claude that means the upstream API pushed back
+RATE_LIMIT_PATTERN = re.compile(r"rate.?limit|\b429\b|overloaded|\b529\b", re.IGNORECASE)
+
+
+def is_rate_limited(event: dict) -> bool:
+    """Whether a stream-json "result" or "system" event reports a rate limit or overload"""
+    if event.get("type") == "result" and not event.get("is_error"):
+        return False
+    if event.get("type") == "system" and event.get("subtype") == "init":
+        return False
+    text = " ".join(str(event.get(key, "")) for key in ("result", "subtype", "error", "message"))
+    return bool(RATE_LIMIT_PATTERN.search(text))
+
+
+def read_host_pressure() -> Dict[str, Optional[float]]:
+    """
+    Sample memory and CPU pressure
+
+    Returns the fraction of memory available (from /proc/meminfo, None where
+    unavailable) and the 1-minute load average per CPU.
+    """
+    memory_available = None
+    try:
+        with open("/proc/meminfo") as f:
+            info = {}
+            for line in f:
+                key, _, value = line.partition(":")
+                info[key] = int(value.split()[0])
+        memory_available = info["MemAvailable"] / info["MemTotal"]
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        pass
+    try:
+        load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        load_per_cpu = None
+    return {"memory_available": memory_available, "load_per_cpu": load_per_cpu}
+
+
+class AdaptiveLimiter:
+    """
+    Additive-increase/multiplicative-decrease limit on concurrent jobs
+
+    The limit grows by one after a full window of healthy completions (one per
+    slot) and is cut by decrease_factor when a job is rate limited, times out,
+    runs far slower than the usual time for its type, or the host is short of
+    memory or CPU. Other failures (a bad prompt, a missing brand file) say
+    nothing about capacity and leave the limit alone. Decreases are spaced by
+    cooldown seconds so one bad burst only counts once. An override pins the limit until it is cleared. With
+    adaptive=False the limit stays at its initial value.
+    """
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: int = 10, adaptive: bool = True,
+                 decrease_factor: float = 0.7, latency_tolerance: float = 2.0,
+                 min_memory_available: float = 0.15, max_load_per_cpu: float = 1.5,
+                 cooldown: float = 30.0):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.override: Optional[int] = None
+        self.adaptive = adaptive
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.min_memory_available = min_memory_available
+        self.max_load_per_cpu = max_load_per_cpu
+        self.cooldown = cooldown
+        # job type -> moving average of successful job durations, also used for batch ETAs
+        self.baselines: Dict[str, float] = {}
+        self.pressure: Dict[str, Optional[float]] = {"memory_available": None, "load_per_cpu": None}
+        self._last_decrease = 0.0
+        self.last_reason: Optional[str] = None
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        if self.override is not None:
+            return self.override
+        return int(self._limit)
+
+    def set_override(self, limit: Optional[int]):
+        """Pin the limit to a fixed value, or pass None to resume adapting"""
+        self.override = limit
+        if limit is not None:
+            self._limit = float(min(max(limit, self.min_limit), self.max_limit))
+
+    def under_pressure(self) -> Optional[str]:
+        memory = self.pressure.get("memory_available")
+        load = self.pressure.get("load_per_cpu")
+        if memory is not None and memory < self.min_memory_available:
+            return f"memory available {memory:.0%}"
+        if load is not None and load > self.max_load_per_cpu:
+            return f"load {load:.2f} per CPU"
+        return None
+
+    def sample_host(self):
+        """Refresh host pressure, backing off if the host is overloaded (blocking read of /proc)"""
+        self.pressure = read_host_pressure()
+        reason = self.under_pressure()
+        if reason and self.adaptive:
+            self._decrease(reason)
+
+    def record(self, job_type: str, duration: float, ok: bool, rate_limited: bool = False,
+               timed_out: bool = False):
+        """Feed back the outcome of a finished job"""
+        baseline = self.baselines.get(job_type)
+        if ok and not rate_limited:
+            self.baselines[job_type] = duration if baseline is None else 0.9 * baseline + 0.1 * duration
+        if not self.adaptive:
+            return
+        if rate_limited:
+            self._decrease("rate limited")
+            return
+        if timed_out:
+            self._decrease(f"{job_type} timed out")
+            return
+
+        if baseline is not None and duration > baseline * self.latency_tolerance:
+            self._decrease(f"{job_type} took {duration:.0f}s (usual {baseline:.0f}s)")
+            return
+        if not ok:
+            return
+
+        if self.under_pressure() is None and self._limit < self.max_limit:
+            before = self.limit
+            self._limit = min(self.max_limit, self._limit + 1 / max(self._limit, 1))
+            if self.limit > before:
+                self.increases += 1
+                self.last_reason = "healthy completions"
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown or self._limit <= self.min_limit:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), int(self._limit * self.decrease_factor))
+        self.decreases += 1
+        self.last_reason = reason
+        print(f"Concurrency limit lowered to {self.limit}: {reason}", flush=True)
+
+    def status(self) -> dict:
+        """Current state for the admin endpoint"""
+        return {
+            "limit": self.limit,
+            "adaptive_limit": int(self._limit),
+            "override": self.override,
+            "adaptive": self.adaptive,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "last_reason": self.last_reason,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "pressure": self.pressure,
+            "baselines": {job_type: round(seconds, 1) for job_type, seconds in self.baselines.items()},
+        }
+
+
+class DispatchThrottle:
+    """
+    Token bucket for starting Claude runs, paused with exponential backoff on rate limits
+
+    Up to burst runs may start at once, refilled at rate per second (rate <= 0
+    disables pacing). Each rate limit reported while dispatch is not already
+    paused doubles the pause, from backoff_base up to backoff_max, with jitter
+    so several processes don't resume in lockstep. A run that completes
+    without being throttled resets the backoff.
+    """
+
+    def __init__(self, rate: float, burst: int, backoff_base: float = 5.0, backoff_max: float = 300.0):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.rate_limits = 0
+        self.dispatched = 0
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        else:
+            self.tokens = float(self.burst)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a run may start; 0 if one may start now"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Use up a token for a run being started"""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        self.dispatched += 1
+
+    def rate_limited(self) -> float:
+        """Pause dispatch after a throttled run; returns the seconds until it resumes"""
+        now = time.monotonic()
+        self.rate_limits += 1
+        # Runs throttled during the same pause are one episode, not several strikes
+        if now >= self.paused_until:
+            self.strikes += 1
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (self.strikes - 1))
+            self.paused_until = now + backoff * random.uniform(0.8, 1.2)
+            self.tokens = 0.0
+            print(f"Upstream rate limit, pausing job dispatch for {self.paused_until - now:.0f}s", flush=True)
+        return self.paused_until - now
+
+    def succeeded(self):
+        self.strikes = 0
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            "tokens": round(self.tokens, 2),
+            "strikes": self.strikes,
+            "rate_limits": self.rate_limits,
+            "dispatched": self.dispatched,
+        }
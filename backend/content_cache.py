@@ -0,0 +1,103 @@
+"""
+Content Cache Module
+Byte-bounded LRU cache with TTL revalidation for file contents read from storage
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class CacheEntry:
+    """A cached file body together with the validator used to revalidate it"""
+
+    __slots__ = ("content", "etag", "size", "fetched_at")
+
+    def __init__(self, content: str, etag: Optional[str]):
+        self.content = content
+        self.etag = etag
+        self.size = len(content.encode('utf-8'))
+        self.fetched_at = time.monotonic()
+
+
+class ContentCache:
+    """
+    LRU cache of file contents keyed by (folder, filename)
+
+    Entries younger than ttl seconds are served as-is. Older entries are handed
+    back as stale so the caller can revalidate them against storage; the total
+    size of cached content never exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        # Bumped on every invalidation so reads that raced a write are not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str]) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Look up an entry
+
+        Returns:
+            (entry, fresh) - entry is None on a miss; fresh is False when the
+            entry has outlived the TTL and must be revalidated before use
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        self._entries.move_to_end(key)
+        return entry, time.monotonic() - entry.fetched_at < self.ttl
+
+    def put(self, key: Tuple[str, str], content: str, etag: Optional[str], generation: Optional[int] = None):
+        """
+        Store content, evicting least recently used entries to stay within max_bytes
+
+        If generation is given and an invalidation happened since it was read,
+        the content may predate a write and is not stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._drop(key)
+        entry = CacheEntry(content, etag)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def touch(self, key: Tuple[str, str]):
+        """Mark an entry as freshly validated"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.fetched_at = time.monotonic()
+
+    def invalidate(self, key: Tuple[str, str]):
+        """Drop an entry, e.g. after the file has been written or deleted"""
+        self.generation += 1
+        self._drop(key)
+
+    def _drop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,167 @@
+"""
+Duplicate Detection Module
+MinHash/LSH index over brief titles and keywords for spotting near-duplicate requests
+"""
+import hashlib
+import random
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from search_index import tokenize
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed seed so signatures are comparable across restarts
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _normalize(token: str) -> str:
+    """Fold simple plurals so "campervans" and "campervan" match"""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def shingles(title: str, primary_keyword: str = "", secondary_keywords: str = "") -> Set[str]:
+    """
+    Normalized terms of the title and keywords
+
+    Word order is ignored on purpose: "Best Hotels for Tomorrowland" and
+    "Tomorrowland: the best hotels" ask for the same brief.
+    """
+    return {_normalize(t) for t in tokenize(f"{title} {primary_keyword} {secondary_keywords}")}
+
+
+def minhash(shingle_set: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a shingle set"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingle_set
+    ]
+    if not hashes:
+        return tuple([MERSENNE_PRIME] * NUM_PERMUTATIONS)
+    return tuple(
+        min((a * h + b) % MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class DuplicateEntry:
+    """An indexed brief: an existing document or the expected output of a pending job"""
+
+    __slots__ = ("key", "title", "primary_keyword", "secondary_keywords", "job_id", "shingles", "bands")
+
+    def __init__(self, key: str, title: str, primary_keyword: str, secondary_keywords: str,
+                 job_id: Optional[str], shingle_set: Set[str], bands: List[Tuple[int, ...]]):
+        self.key = key
+        self.title = title
+        self.primary_keyword = primary_keyword
+        self.secondary_keywords = secondary_keywords
+        self.job_id = job_id
+        self.shingles = shingle_set
+        self.bands = bands
+
+
+class DuplicateIndex:
+    """
+    Locality-sensitive hashing index of brief shingle sets
+
+    Each signature is split into bands; entries sharing any band bucket are
+    candidates, which are then confirmed with their exact Jaccard similarity.
+    """
+
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+        self.entries: Dict[str, DuplicateEntry] = {}
+        self.buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(BANDS)]
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND] for i in range(BANDS)]
+
+    def add(self, key: str, title: str, primary_keyword: str = "", secondary_keywords: str = "",
+            job_id: Optional[str] = None):
+        """Index a brief under key, replacing any previous entry for it"""
+        self.remove(key)
+        shingle_set = shingles(title, primary_keyword, secondary_keywords)
+        if not shingle_set:
+            return
+        entry = DuplicateEntry(key, title, primary_keyword, secondary_keywords, job_id,
+                               shingle_set, self._bands(minhash(shingle_set)))
+        self.entries[key] = entry
+        for band, bucket in zip(entry.bands, self.buckets):
+            bucket.setdefault(band, set()).add(key)
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for band, bucket in zip(entry.bands, self.buckets):
+            keys = bucket.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band]
+
+    def get(self, key: str) -> Optional[DuplicateEntry]:
+        return self.entries.get(key)
+
+    def find(self, title: str, primary_keyword: str = "", secondary_keywords: str = "",
+             is_stale: Optional[Callable[[DuplicateEntry], bool]] = None) -> Optional[dict]:
+        """
+        Find the most similar indexed brief at or above the threshold
+
+        Args:
+            title: Requested brief title
+            primary_keyword: Requested primary keyword
+            secondary_keywords: Requested secondary keywords
+            is_stale: Called for candidates; entries it returns True for are dropped
+
+        Returns:
+            Dict with key, title, primary_keyword, job_id and similarity, or None
+        """
+        shingle_set = shingles(title, primary_keyword, secondary_keywords)
+        if not shingle_set:
+            return None
+
+        candidates: Set[str] = set()
+        for band, bucket in zip(self._bands(minhash(shingle_set)), self.buckets):
+            candidates.update(bucket.get(band, ()))
+
+        best = None
+        best_similarity = 0.0
+        for key in candidates:
+            entry = self.entries[key]
+            similarity = jaccard(shingle_set, entry.shingles)
+            if similarity < self.threshold or similarity <= best_similarity:
+                continue
+            if is_stale is not None and is_stale(entry):
+                self.remove(key)
+                continue
+            best, best_similarity = entry, similarity
+
+        if best is None:
+            return None
+        return {
+            "key": best.key,
+            "title": best.title,
+            "primary_keyword": best.primary_keyword,
+            "job_id": best.job_id,
+            "similarity": round(best_similarity, 3),
+        }
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for the metrics endpoint"""
+        return {"entries": len(self.entries), "threshold": self.threshold}
@@ -0,0 +1,198 @@
+"""
+Event Bus Module
+Fan-out of job events to /api/events subscribers, each filtered to the jobs it watches,
+and of document changes to /api/documents/events subscribers
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Iterable, Optional, Set
+
+# Queued in place of a subscriber's backlog when it falls too far behind; it should resend its full state
+RESYNC = {"event": "resync"}
+
+
+class EventQueue:
+    """Bounded backlog of events for one stream client"""
+
+    def __init__(self, max_pending: int = 1000):
+        self.queue: asyncio.Queue = asyncio.Queue(max_pending)
+        self.resyncs = 0
+
+    def put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The backlog is stale anyway; drop it and have the client start over from its full state
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.resyncs += 1
+
+    async def events(self) -> AsyncIterator[dict]:
+        while True:
+            yield await self.queue.get()
+
+
+class Subscription(EventQueue):
+    """
+    One event stream client and the jobs it watches
+
+    A job matches if its id is in job_ids or its batch is in batch_ids (any
+    job when both are empty) and its type is in types (any type when empty).
+    Log lines are only delivered when logs is set.
+    """
+
+    def __init__(self, job_ids: Iterable[str] = (), batch_ids: Iterable[str] = (), types: Iterable[str] = (),
+                 logs: bool = False, max_pending: int = 1000):
+        super().__init__(max_pending)
+        self.job_ids: Set[str] = set(job_ids)
+        self.batch_ids: Set[str] = set(batch_ids)
+        self.types: Set[str] = set(types)
+        self.logs = logs
+
+    def matches(self, job: dict) -> bool:
+        if self.types and job.get("type") not in self.types:
+            return False
+        if not self.job_ids and not self.batch_ids:
+            return True
+        return job.get("id") in self.job_ids or job.get("batch_id") in self.batch_ids
+
+
+class EventBus:
+    """
+    Job state transitions, queue position changes and log lines, pushed to subscribers
+
+    An event is serialized once and costs one filter check per subscriber,
+    and nothing when there are none, so load follows the rate of job events
+    rather than the number of clients watching. Each subscriber has a bounded backlog; one that
+    can't keep up gets RESYNC instead of unbounded memory.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self.subscribers: Set[Subscription] = set()
+        self._log_subscribers = 0
+        self.published = 0
+
+    def subscribe(self, job_ids: Iterable[str] = (), batch_ids: Iterable[str] = (), types: Iterable[str] = (),
+                  logs: bool = False) -> Subscription:
+        subscription = Subscription(job_ids, batch_ids, types, logs, self.max_pending)
+        self.subscribers.add(subscription)
+        if logs:
+            self._log_subscribers += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscribers:
+            self.subscribers.discard(subscription)
+            if subscription.logs:
+                self._log_subscribers -= 1
+
+    def publish(self, event: str, data: dict, job: dict):
+        """Send an event about a job to the subscribers watching it"""
+        if not self.subscribers:
+            return
+        self.published += 1
+        message = {"event": event, "data": json.dumps(data)}
+        for subscription in self.subscribers:
+            if subscription.matches(job):
+                subscription.put(message)
+
+    def publish_log(self, job: dict, line: str, offset: int):
+        """Send a job's log line to the subscribers that asked for log lines"""
+        if not self._log_subscribers:
+            return
+        self.published += 1
+        data = {"job_id": job["id"], "message": line.strip(), "offset": offset}
+        message = {"event": "log", "data": json.dumps(data)}
+        for subscription in self.subscribers:
+            if subscription.logs and subscription.matches(job):
+                subscription.put(message)
+
+    def publish_positions(self, positions: Dict[str, Optional[int]], jobs: Dict[str, dict]):
+        """Send each subscriber one event with the new queue positions of the jobs it watches"""
+        self.published += 1
+        for subscription in self.subscribers:
+            watched = {job_id: position for job_id, position in positions.items()
+                       if job_id in jobs and subscription.matches(jobs[job_id])}
+            if watched:
+                subscription.put({"event": "queue", "data": json.dumps({"positions": watched})})
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "subscribers": len(self.subscribers),
+            "log_subscribers": self._log_subscribers,
+            "published": self.published,
+            "resyncs": sum(subscription.resyncs for subscription in self.subscribers),
+        }
+
+
+class FolderSubscription(EventQueue):
+    """One document change feed client and the folders it watches (all when empty)"""
+
+    def __init__(self, folders: Iterable[str] = (), max_pending: int = 1000):
+        super().__init__(max_pending)
+        self.folders: Set[str] = set(folders)
+
+
+class DocumentFeed:
+    """
+    "created", "updated" and "deleted" events for documents, so clients can patch their listings
+
+    Whether a write created a document is judged from the names seen in each
+    folder, seeded from a listing with seed(); until then every write counts
+    as an update. Either way clients should treat both as an upsert.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self.subscribers: Set[FolderSubscription] = set()
+        self.known: Dict[str, Set[str]] = {}
+        self._seeded: Set[str] = set()
+        self.published = 0
+
+    def seed(self, folder: str, names: Iterable[str]):
+        self.known.setdefault(folder, set()).update(names)
+        self._seeded.add(folder)
+
+    def is_new(self, folder: str, name: str) -> bool:
+        """Whether writing a document now would create it"""
+        return folder in self._seeded and name not in self.known.get(folder, ())
+
+    def subscribe(self, folders: Iterable[str] = ()) -> FolderSubscription:
+        subscription = FolderSubscription(folders, self.max_pending)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FolderSubscription):
+        self.subscribers.discard(subscription)
+
+    def publish(self, folder: str, name: str, document: Optional[dict]):
+        """Record a document written (with its listing fields) or deleted (document None)"""
+        known = self.known.setdefault(folder, set())
+        if document is None:
+            event = "deleted"
+            known.discard(name)
+        else:
+            event = "created" if self.is_new(folder, name) else "updated"
+            known.add(name)
+        if not self.subscribers:
+            return
+
+        self.published += 1
+        data = {"folder": folder, "name": name}
+        if document is not None:
+            data["document"] = document
+        message = {"event": event, "data": json.dumps(data)}
+        for subscription in self.subscribers:
+            if not subscription.folders or folder in subscription.folders:
+                subscription.put(message)
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "resyncs": sum(subscription.resyncs for subscription in self.subscribers),
+        }
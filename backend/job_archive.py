@@ -0,0 +1,102 @@
+"""
+Job Archive Module
+On-disk archive for job records evicted from memory, with their logs compressed alongside
+"""
+import gzip
+import json
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ARCHIVE_RECORDS_FILENAME = "jobs.ndjson"
+
+
+class JobArchive:
+    """
+    Append-only archive of finished job records
+
+    Each record is written as one JSON line and its log file is gzipped into
+    the archive directory. Only a compact index (job id -> line offset) stays
+    in memory, bounded by max_index_entries; older jobs remain on disk but can
+    no longer be looked up by id. load() rebuilds the index from the records
+    file after a restart.
+
+    All methods block on file I/O; call them through asyncio.to_thread.
+    """
+
+    def __init__(self, directory: Path, max_index_entries: int = 10000):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.records_path = directory / ARCHIVE_RECORDS_FILENAME
+        self.max_index_entries = max_index_entries
+        self._offsets: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.archived = 0
+
+    def load(self):
+        """Index the most recently archived records already on disk"""
+        if not self.records_path.exists():
+            return
+        offsets: "OrderedDict[str, int]" = OrderedDict()
+        with self._lock, open(self.records_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    job_id = json.loads(line)["id"]
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by a crash mid-write
+                    job_id = None
+                if job_id is not None:
+                    offsets.pop(job_id, None)
+                    offsets[job_id] = offset
+                    if len(offsets) > self.max_index_entries:
+                        offsets.popitem(last=False)
+                offset += len(line)
+            # Keep records archived before the scan; they are the newest
+            offsets.update(self._offsets)
+            self._offsets = offsets
+            while len(self._offsets) > self.max_index_entries:
+                self._offsets.popitem(last=False)
+
+    def archive(self, records: List[dict]):
+        """Compress each record's log file and append the records to the archive"""
+        with self._lock, open(self.records_path, "ab") as f:
+            for record in records:
+                record = dict(record)
+                record["log_file"] = self._archive_log(record.get("log_file"))
+                record["archived"] = True
+                offset = f.tell()
+                f.write(json.dumps(record).encode("utf-8") + b"\n")
+                self._offsets[record["id"]] = offset
+                self.archived += 1
+            f.flush()
+            while len(self._offsets) > self.max_index_entries:
+                self._offsets.popitem(last=False)
+
+    def _archive_log(self, log_file: Optional[str]) -> Optional[str]:
+        if not log_file:
+            return None
+        source = Path(log_file)
+        if not source.exists():
+            return None
+        target = self.directory / (source.name + ".gz")
+        with open(source, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        source.unlink()
+        return str(target)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Read an archived record by job id, or None if it is not indexed"""
+        with self._lock:
+            offset = self._offsets.get(job_id)
+            if offset is None:
+                return None
+            with open(self.records_path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint"""
+        return {"indexed": len(self._offsets), "archived": self.archived}
@@ -0,0 +1,154 @@
+"""
+Job Registry Module
+Job records indexed by status and batch so counts and filtered lookups don't scan every job
+"""
+from typing import Callable, Dict, Iterator, List, Optional
+
+from job_store import JobStore
+
+
+class JobRegistry:
+    """
+    Dict-like store of job records keyed by job id
+
+    Records are plain dicts as before, but their status must be changed with
+    set_status so the per-status index stays correct. Counting jobs in a status
+    is O(1); listing the jobs in a status or batch is O(k) in the jobs returned.
+
+    With a store attached, every add, status change, touch and removal is
+    persisted to it. Other field changes must be followed by touch().
+
+    Listeners are told about new jobs and status changes.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None):
+        self.store = store
+        self._jobs: Dict[str, dict] = {}
+        # status -> job ids; dicts are used as insertion-ordered sets
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._by_batch: Dict[str, Dict[str, None]] = {}
+        # Creation sequence, so filtered listings keep the same order as an unfiltered one
+        self._sequence: Dict[str, int] = {}
+        self._next_sequence = 0
+        self._listeners: List[Callable[[dict, Optional[str]], None]] = []
+
+    def add_listener(self, listener: Callable[[dict, Optional[str]], None]):
+        """
+        Register a callback for job state transitions
+
+        The callback receives (job, previous_status) after a job is added
+        (previous_status None) or its status changes, including through add().
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, job: dict, previous_status: Optional[str]):
+        for listener in self._listeners:
+            try:
+                listener(job, previous_status)
+            except Exception as e:
+                print(f"Error in job listener for {job['id']}: {e}")
+
+    def add(self, job: dict, persist: bool = True):
+        """
+        Register a job record; it must have "id" and "status" and may have "batch_id"
+
+        Adding a record for a job that is already registered replaces it in place.
+        persist=False is for records that came from the store.
+        """
+        job_id = job["id"]
+        previous = self._jobs.get(job_id)
+        if previous is None:
+            self._sequence[job_id] = self._next_sequence
+            self._next_sequence += 1
+        else:
+            if previous["status"] != job["status"]:
+                self._discard(self._by_status, previous["status"], job_id)
+            if previous.get("batch_id") and previous.get("batch_id") != job.get("batch_id"):
+                self._discard(self._by_batch, previous["batch_id"], job_id)
+        self._jobs[job_id] = job
+        self._by_status.setdefault(job["status"], {})[job_id] = None
+        if job.get("batch_id"):
+            self._by_batch.setdefault(job["batch_id"], {})[job_id] = None
+        if persist:
+            self.touch(job_id)
+        if previous is None or previous["status"] != job["status"]:
+            self._notify(job, previous["status"] if previous is not None else None)
+
+    def set_status(self, job_id: str, status: str):
+        """Change a job's status, moving it between status indexes"""
+        job = self._jobs[job_id]
+        previous = job["status"]
+        if previous == status:
+            return
+        self._discard(self._by_status, previous, job_id)
+        self._by_status.setdefault(status, {})[job_id] = None
+        job["status"] = status
+        self.touch(job_id)
+        self._notify(job, previous)
+
+    def touch(self, job_id: str):
+        """Persist the current state of a job record"""
+        if self.store is not None:
+            self.store.save(self._jobs[job_id])
+
+    def remove(self, job_id: str, persist: bool = True) -> Optional[dict]:
+        """Drop a job record and its index entries; persist=False keeps it in the store"""
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return None
+        self._sequence.pop(job_id, None)
+        self._discard(self._by_status, job["status"], job_id)
+        if job.get("batch_id"):
+            self._discard(self._by_batch, job["batch_id"], job_id)
+        if persist and self.store is not None:
+            self.store.delete(job_id)
+        return job
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[str, None]], key: str, job_id: str):
+        members = index.get(key)
+        if members is not None:
+            members.pop(job_id, None)
+            if not members:
+                del index[key]
+
+    def count(self, status: str) -> int:
+        return len(self._by_status.get(status, ()))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status"""
+        return {status: len(members) for status, members in self._by_status.items()}
+
+    def _ordered(self, job_ids) -> List[dict]:
+        return [self._jobs[job_id] for job_id in sorted(job_ids, key=self._sequence.__getitem__)]
+
+    def by_entry_order(self, status: str) -> Iterator[dict]:
+        """Jobs in a status in the order they entered it, longest first"""
+        for job_id in list(self._by_status.get(status, ())):
+            yield self._jobs[job_id]
+
+    def with_status(self, status: str) -> List[dict]:
+        """Jobs in a status, oldest first"""
+        return self._ordered(self._by_status.get(status, ()))
+
+    def in_batch(self, batch_id: str) -> List[dict]:
+        """Jobs submitted in a batch, oldest first"""
+        return self._ordered(self._by_batch.get(batch_id, ()))
+
+    def get(self, job_id: str, default=None) -> Optional[dict]:
+        return self._jobs.get(job_id, default)
+
+    def values(self):
+        return self._jobs.values()
+
+    def __getitem__(self, job_id: str) -> dict:
+        return self._jobs[job_id]
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._jobs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._jobs)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
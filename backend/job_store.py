@@ -0,0 +1,314 @@
+"""
+Job Store Module
+SQLite (WAL) persistence for job records so queued and running jobs survive restarts,
+doubling as the shared queue that worker processes lease jobs from
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    batch_id TEXT,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+# Columns added after the first release of the store, with their definitions
+MIGRATIONS = {
+    "lease_owner": "TEXT",
+    "lease_expires": "REAL",
+    "version": "INTEGER NOT NULL DEFAULT 0",
+}
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_type ON jobs (type);
+CREATE INDEX IF NOT EXISTS jobs_batch_id ON jobs (batch_id);
+CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_version ON jobs (version);
+"""
+
+UPSERT = """
+INSERT INTO jobs (id, type, status, batch_id, created_at, record, version) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    status = excluded.status, batch_id = excluded.batch_id, record = excluded.record, version = excluded.version
+-- A worker whose lease was taken over must not overwrite the new holder's state,
+-- and a cancelled job stays cancelled whatever its worker reports afterwards
+WHERE (jobs.lease_owner IS NULL OR jobs.lease_owner = json_extract(excluded.record, '$.worker'))
+    AND jobs.status != 'cancelled'
+"""
+
+# Runtime-only fields that are never persisted
+TRANSIENT_FIELDS = {"process"}
+
+
+class JobStore:
+    """
+    Write-behind store of job records
+
+    save() and delete() only record the latest state of a job in memory; a
+    writer thread flushes everything pending in one transaction every
+    flush_interval seconds. Several transitions of the same job between
+    flushes cost a single row write, so callers on the event loop never wait
+    on disk.
+
+    Every write transaction bumps a store-wide version that is stamped on the
+    rows it touches, so other processes sharing the database can follow
+    changes with changed_since(). lease() and renew() write immediately and
+    are safe to call from several processes at once.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 0.05):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, definition in MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        self._conn.executescript(INDEXES)
+        # job id -> record to upsert, or None to delete
+        self._pending: Dict[str, Optional[dict]] = {}
+        # Guards _pending only, so save() never waits behind a disk write
+        self._pending_lock = threading.Lock()
+        # Serializes use of the connection between the writer thread and blocking callers
+        self._conn_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self.rows_written = 0
+        self.flushes = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="job-store-writer", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread (blocking)"""
+        self._closing = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._flush()
+        self._conn.close()
+
+    def save(self, job: dict):
+        record = {k: v for k, v in job.items() if k not in TRANSIENT_FIELDS}
+        with self._pending_lock:
+            self._pending[job["id"]] = record
+        self._wakeup.set()
+
+    def delete(self, job_id: str):
+        with self._pending_lock:
+            self._pending[job_id] = None
+        self._wakeup.set()
+
+    def load(self) -> Tuple[List[dict], int]:
+        """All stored job records, oldest first, and the store version they reflect (blocking)"""
+        with self._conn_lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute("SELECT record FROM jobs ORDER BY created_at").fetchall()
+                version = self._version()
+            finally:
+                self._conn.execute("COMMIT")
+        return [json.loads(record) for (record,) in rows], version
+
+    def changed_since(self, version: int) -> Tuple[List[dict], int]:
+        """Records written after a store version, and the latest version (blocking)"""
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT record, version FROM jobs WHERE version > ? ORDER BY version", (version,)
+            ).fetchall()
+        if rows:
+            version = rows[-1][1]
+        return [json.loads(record) for record, _ in rows], version
+
+    def _version(self) -> int:
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _next_version(self) -> int:
+        """Bump the store version; call inside a write transaction"""
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return self._version()
+
+    def _run(self):
+        while not self._closing:
+            self._wakeup.wait()
+            # Give closely spaced transitions a moment to coalesce into this flush
+            threading.Event().wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self._flush()
+            except Exception as e:
+                print(f"Error writing job store: {e}")
+
+    def flush(self):
+        """Write pending changes now (blocking)"""
+        self._flush()
+
+    def _flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._conn_lock:
+            deletes = [(job_id,) for job_id, r in pending.items() if r is None]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._next_version()
+                upserts = [
+                    (r["id"], r["type"], r["status"], r.get("batch_id"), r["created_at"], json.dumps(r), version)
+                    for r in pending.values() if r is not None
+                ]
+                if upserts:
+                    self._conn.executemany(UPSERT, upserts)
+                if deletes:
+                    self._conn.executemany("DELETE FROM jobs WHERE id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # Keep the records for the next flush unless newer state arrived meanwhile
+                with self._pending_lock:
+                    for job_id, record in pending.items():
+                        self._pending.setdefault(job_id, record)
+                raise
+        self.rows_written += len(pending)
+        self.flushes += 1
+
+    def lease(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[dict]:
+        """
+        Claim the oldest queued job, or a running job whose lease has expired (blocking)
+
+        A reclaimed job that has already used max_attempts runs is marked
+        failed instead. Returns the claimed record, now running, or None.
+        """
+        now = time.time()
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT record FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                    if row is None:
+                        row = self._conn.execute(
+                            "SELECT record FROM jobs WHERE status = 'running' AND lease_expires < ? "
+                            "ORDER BY created_at LIMIT 1", (now,)
+                        ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    record = json.loads(row[0])
+                    version = self._next_version()
+                    if record["status"] == "running" and record.get("attempts", 0) >= max_attempts:
+                        record["status"] = "failed"
+                        record["finished_at"] = datetime.now().isoformat()
+                        self._conn.execute(
+                            "UPDATE jobs SET status = 'failed', record = ?, lease_owner = NULL, "
+                            "lease_expires = NULL, version = ? WHERE id = ?",
+                            (json.dumps(record), version, record["id"])
+                        )
+                        continue
+
+                    record["status"] = "running"
+                    record["worker"] = worker_id
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', record = ?, lease_owner = ?, "
+                        "lease_expires = ?, version = ? WHERE id = ?",
+                        (json.dumps(record), worker_id, now + lease_seconds, version, record["id"])
+                    )
+                    self._conn.execute("COMMIT")
+                    return record
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; False if the worker no longer holds it (blocking)"""
+        with self._conn_lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, worker_id: str):
+        """Give a leased job back to the queue, e.g. when a worker shuts down (blocking)"""
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT record FROM jobs WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                    (job_id, worker_id)
+                ).fetchone()
+                if row is not None:
+                    record = json.loads(row[0])
+                    record["status"] = "queued"
+                    record.pop("worker", None)
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'queued', record = ?, lease_owner = NULL, "
+                        "lease_expires = NULL, version = ? WHERE id = ?",
+                        (json.dumps(record), self._next_version(), job_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def cancel(self, job_ids: List[str]) -> List[dict]:
+        """
+        Mark queued or running jobs cancelled, returning their updated records (blocking)
+
+        Workers stop running a cancelled job when their next lease renewal fails.
+        """
+        cancelled = []
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._next_version()
+                for job_id in job_ids:
+                    row = self._conn.execute(
+                        "SELECT record FROM jobs WHERE id = ? AND status IN ('queued', 'running')", (job_id,)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    record = json.loads(row[0])
+                    record["status"] = "cancelled"
+                    record["finished_at"] = datetime.now().isoformat()
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'cancelled', record = ?, lease_owner = NULL, "
+                        "lease_expires = NULL, version = ? WHERE id = ?",
+                        (json.dumps(record), version, job_id)
+                    )
+                    cancelled.append(record)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cancelled
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint"""
+        return {"pending": len(self._pending), "rows_written": self.rows_written, "flushes": self.flushes}
@@ -0,0 +1,272 @@
+"""
+Log Channel Module
+Batched writes of job logs as NDJSON records, in-process broadcast of their lines to SSE
+subscribers, so they don't poll log files, and reads of log files by byte offset for
+resuming and paging through logs
+"""
+import asyncio
+import gzip
+import json
+import os
+import sys
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Deque, List, Optional, Tuple
+
+# (start, end, line): byte offsets of the line in the job's log file, and its text without the newline
+LogEntry = Tuple[int, int, str]
+
+# Bytes read per step when paging backwards through a log file
+READ_BLOCK_SIZE = 64 * 1024
+
+# Characters of a log line echoed to stdout
+ECHO_WIDTH = 200
+
+# Shared, since json.dumps builds a new encoder per call when given options
+_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def describe_record(record: dict) -> str:
+    """The message of a log record, without its timestamp"""
+    text = record.get("text", "")
+    if record.get("kind") == "tool_use":
+        return f"🔧 Tool: {record.get('tool')}" + (f" → {text}" if text else "")
+    if record.get("kind") == "tool_result":
+        status = record.get("status")
+        icon = "✗" if status == "error" else "✓"
+        return f"  {icon} {record.get('tool')}: {status}" + (f" → {text}" if text else "")
+    return text
+
+
+def render_record(record: dict, message: Optional[str] = None) -> str:
+    """A log record as the human-readable line streamed to clients"""
+    if message is None:
+        message = describe_record(record)
+    return f"{record.get('ts', '')[11:19]} | {message}"
+
+
+def _render(raw: bytes) -> str:
+    """A stored log line as streamed: NDJSON records rendered, plain lines of older logs as they are"""
+    line = raw.decode("utf-8", errors="replace")
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return line
+        if isinstance(record, dict) and "kind" in record:
+            return render_record(record)
+    return line
+
+
+def _open_log(path: Path):
+    """Open a live log file, or the gzipped copy of an archived one, for reading bytes"""
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _entries(data: bytes, start: int) -> List[LogEntry]:
+    """Split bytes read from offset start into entries, one per newline-terminated line"""
+    entries = []
+    for raw in data.split(b"\n")[:-1]:
+        end = start + len(raw) + 1
+        entries.append((start, end, _render(raw)))
+        start = end
+    return entries
+
+
+def read_log(path: Path, start: int = 0, end: Optional[int] = None, partial: bool = False) -> List[LogEntry]:
+    """
+    Lines of a log file from byte offset start (up to end)
+
+    A trailing line without its newline yet is left for the next read,
+    unless partial is set because nothing more will be written.
+    """
+    with _open_log(path) as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(max(0, end - start))
+    complete = data.rfind(b"\n") + 1
+    entries = _entries(data[:complete], start)
+    if partial and complete < len(data):
+        entries.append((start + complete, start + len(data), _render(data[complete:])))
+    return entries
+
+
+def read_log_before(path: Path, end: Optional[int] = None, limit: int = 200) -> List[LogEntry]:
+    """
+    Up to limit complete lines of a log file ending at or before byte offset end
+
+    end defaults to the end of the file. Plain files are read backwards in
+    blocks, so paging through the start of a long log doesn't read all of it.
+    """
+    with _open_log(path) as f:
+        if path.suffix == ".gz":
+            # Seeking backwards in a gzip stream decompresses from the start anyway
+            start = 0
+            data = f.read() if end is None else f.read(end)
+        else:
+            size = f.seek(0, os.SEEK_END)
+            start = size if end is None else min(end, size)
+            data = b""
+            while start > 0 and data.count(b"\n") <= limit:
+                step = min(READ_BLOCK_SIZE, start)
+                start -= step
+                f.seek(start)
+                data = f.read(step) + data
+    data = data[:data.rfind(b"\n") + 1]
+    if start > 0:
+        # Drop the part of a line cut off by the block boundary
+        cut = data.find(b"\n") + 1
+        data, start = data[cut:], start + cut
+    return _entries(data, start)[-limit:] if limit > 0 else []
+
+
+class LogChannel:
+    """
+    Recent log lines of one job, with waiting subscribers woken on every new line
+
+    Entries carry their byte range in the log file, so a subscriber that has
+    read the file up to some offset can continue from the channel without
+    gaps or repeats. Only the last capacity lines are kept; a subscriber
+    that falls further behind sees a gap between its offset and the next
+    entry's start, and reads that range from the file.
+    """
+
+    def __init__(self, capacity: int, listener: Optional[Callable[[str, int], None]] = None):
+        self.entries: Deque[LogEntry] = deque(maxlen=capacity)
+        # Also told about every line, with the offset after it
+        self.listener = listener
+        self.offset = 0  # Bytes written to the log file so far
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def reset(self, offset: int):
+        """Start over at a log file position, e.g. after the file was truncated or appended to elsewhere"""
+        if offset != self.offset:
+            self.entries.clear()
+            self.offset = offset
+
+    def publish(self, line: str, size: Optional[int] = None):
+        """Add one line, including its trailing newline, that takes size bytes of the log file (its own length by default)"""
+        start = self.offset
+        self.offset += len(line.encode()) if size is None else size
+        self.entries.append((start, self.offset, line.rstrip("\n")))
+        self._wake()
+        if self.listener is not None:
+            self.listener(line, self.offset)
+
+    def publish_many(self, lines: List[Tuple[str, int]]):
+        """Add several (line, size) pairs as publish() would, waking subscribers once"""
+        for line, size in lines:
+            start = self.offset
+            self.offset += size
+            self.entries.append((start, self.offset, line.rstrip("\n")))
+            if self.listener is not None:
+                self.listener(line, self.offset)
+        self._wake()
+
+    def close(self):
+        """No more lines will be published; subscribers finish once they have read everything"""
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _after(self, offset: int) -> list:
+        newer = []
+        for entry in reversed(self.entries):
+            if entry[1] <= offset:
+                break
+            newer.append(entry)
+        newer.reverse()
+        return newer
+
+    async def follow(self, offset: int) -> AsyncIterator[LogEntry]:
+        """Entries ending after offset, waiting for new ones until the channel is closed"""
+        while True:
+            changed = self._changed
+            for entry in self._after(offset):
+                yield entry
+                offset = entry[1]
+            if self.closed:
+                return
+            await changed.wait()
+
+
+class LogSink:
+    """
+    A job's log file, written as one NDJSON record per line in batches
+
+    Records have ts, kind, text and, where they apply, tool and status.
+    write() only buffers a record; the batch goes to the file in a single
+    write flush_interval seconds after its first record, or as soon as it
+    reaches max_bytes. Only then are the records' rendered lines published
+    to the channel, so every channel entry's byte range is already in the
+    file, and echoed to stdout after the echo prefix, if one is given.
+    Needs a running event loop unless flush_interval is 0, which writes
+    every record immediately.
+    """
+
+    def __init__(self, path: Path, mode: str = "a", channel: Optional[LogChannel] = None,
+                 flush_interval: float = 0.1, max_bytes: int = 16 * 1024, echo: Optional[str] = None):
+        self.f = open(path, mode + "b")
+        self.channel = channel
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.echo = echo
+        # (encoded line, record) of records not yet written
+        self._pending: List[Tuple[bytes, dict]] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.flushes = 0
+        if channel is not None:
+            channel.reset(self.f.seek(0, os.SEEK_END))
+
+    def write(self, kind: str, text: str, tool: Optional[str] = None, status: Optional[str] = None):
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "kind": kind}
+        if tool is not None:
+            record["tool"] = tool
+        if status is not None:
+            record["status"] = status
+        record["text"] = text
+        data = (_encoder.encode(record) + "\n").encode()
+        self._pending.append((data, record))
+        self._pending_bytes += len(data)
+        if self.flush_interval <= 0 or self._pending_bytes >= self.max_bytes:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self.flush)
+
+    def flush(self):
+        """Write buffered records now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        pending, self._pending, self._pending_bytes = self._pending, [], 0
+        self.f.write(b"".join(data for data, _ in pending))
+        self.f.flush()
+        self.flushes += 1
+        messages = [describe_record(record) for _, record in pending]
+        if self.channel is not None:
+            self.channel.publish_many([
+                (render_record(record, message) + "\n", len(data))
+                for (data, record), message in zip(pending, messages)
+            ])
+        if self.echo is not None:
+            # First line of each message only, so a long response doesn't flood the console
+            lines = [message.strip().partition("\n")[0][:ECHO_WIDTH] for message in messages]
+            sys.stdout.write("".join(f"{self.echo}{line}\n" for line in lines))
+            sys.stdout.flush()
+
+    def close(self):
+        self.flush()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,240 @@
+"""
+Process Pool Module
+Pre-spawned Claude CLI processes waiting on stdin, so jobs skip CLI startup
+"""
+import asyncio
+import os
+import resource
+import signal
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+def process_rss(pid: int) -> int:
+    """Resident memory of a process in bytes, 0 where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_alive(process: asyncio.subprocess.Process) -> bool:
+    """
+    Whether a process is still running, without waiting for the event loop to reap it
+
+    returncode is only set once the child watcher's callback has run, so a
+    process that just exited can still look alive; /proc shows it gone or a
+    zombie straight away. Where /proc is unavailable only returncode is checked.
+    """
+    if process.returncode is not None:
+        return False
+    try:
+        with open(f"/proc/{process.pid}/stat") as f:
+            # The state follows the parenthesised command name, which may itself contain spaces
+            return f.read().rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+    except FileNotFoundError:
+        return not os.path.isdir("/proc/self")
+    except (OSError, IndexError):
+        return True
+
+
+def kill_process_group(process: asyncio.subprocess.Process):
+    """Kill a process started in its own session along with any children it spawned"""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+
+
+class ProcessPool:
+    """
+    Idle Claude processes, started ahead of time with the command every job runs
+
+    acquire() hands out an idle process (warm) or spawns one on the spot
+    (cold) when none is ready, and writes the prompt to its stdin. Idle
+    processes that have died are skipped, and a warm process that dies while
+    taking the prompt is swapped for another. A maintenance task keeps up to
+    size processes idle, stops refilling while their resident memory exceeds
+    max_idle_bytes, and replaces processes that have died or sat idle for
+    max_idle_age seconds. size=0 disables pre-spawning.
+
+    Processes start in their own session so that stopping one also stops
+    the children holding its pipes; use kill_process_group() on them.
+    rlimits maps resource.RLIMIT_* constants to limits set on each process
+    with prlimit(2) as soon as it has started. A preexec_fn could deadlock
+    the child, since this process runs other threads.
+
+    Time from job start to the first line of Claude output is tracked for
+    warm and cold starts separately, to show what the pool saves.
+    """
+
+    def __init__(self, command: List[str], cwd: str, size: int, max_idle_bytes: int, max_idle_age: float = 600.0,
+                 rlimits: Optional[Dict[int, int]] = None, spawn_attempts: int = 3):
+        self.command = command
+        self.rlimits = rlimits or {}
+        self._rlimits_warned = False
+        self.cwd = cwd
+        self.size = size
+        self.max_idle_bytes = max_idle_bytes
+        self.max_idle_age = max_idle_age
+        self.spawn_attempts = max(1, spawn_attempts)
+        self._idle: Deque[Tuple[asyncio.subprocess.Process, float]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.warm_starts = 0
+        self.cold_starts = 0
+        self.recycled = 0
+        # "warm"/"cold" -> [jobs measured, total seconds to first output]
+        self._first_output: Dict[str, List[float]] = {"warm": [0, 0.0], "cold": [0, 0.0]}
+
+    def start(self):
+        if self._task is None and self.size > 0:
+            self._task = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        """Stop the maintenance task and all idle processes"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._idle:
+            process, _ = self._idle.popleft()
+            await self._stop(process)
+
+    async def spawn(self) -> asyncio.subprocess.Process:
+        process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            start_new_session=True
+        )
+        if self.rlimits:
+            self._apply_rlimits(process.pid)
+        return process
+
+    def _apply_rlimits(self, pid: int):
+        """Lower a started process's resource limits; the children it starts afterwards inherit them"""
+        if not hasattr(resource, "prlimit"):
+            if not self._rlimits_warned:
+                print("Claude process resource limits need prlimit (Linux); running without them", flush=True)
+                self._rlimits_warned = True
+            return
+        for limit, value in self.rlimits.items():
+            try:
+                _, hard = resource.prlimit(pid, limit)
+                if hard != resource.RLIM_INFINITY:
+                    value = min(value, hard)
+                resource.prlimit(pid, limit, (value, value))
+            except ProcessLookupError:
+                # Already exited; the caller sees that when it reads the output
+                return
+
+    async def acquire(self, prompt: Optional[bytes] = None) -> Tuple[asyncio.subprocess.Process, bool]:
+        """
+        A process given the prompt on stdin (stdin is then closed), and whether it came from the pool
+
+        With prompt=None the process is returned with stdin untouched.
+        Spawning is retried up to spawn_attempts times before the error is raised.
+        """
+        while self._idle:
+            process, _ = self._idle.popleft()
+            self._wakeup.set()
+            if not process_alive(process):
+                self.recycled += 1
+                await self._stop(process)
+                continue
+            if prompt is None or await self._send(process, prompt):
+                self.warm_starts += 1
+                return process, True
+            self.recycled += 1
+            await self._stop(process)
+
+        for attempt in range(1, self.spawn_attempts + 1):
+            try:
+                process = await self.spawn()
+            except OSError as e:
+                if attempt == self.spawn_attempts:
+                    raise
+                print(f"Failed to start Claude process (attempt {attempt}): {e}", flush=True)
+                await asyncio.sleep(0.1 * attempt)
+                continue
+            if prompt is not None and not await self._send(process, prompt):
+                # Leave the process for the caller, which will see it exit and report why
+                print(f"Claude process {process.pid} exited before reading its prompt", flush=True)
+            self.cold_starts += 1
+            return process, False
+
+    @staticmethod
+    async def _send(process: asyncio.subprocess.Process, prompt: bytes) -> bool:
+        """Write the prompt and close stdin, False if the process is gone"""
+        if process.stdin is None:
+            return True
+        try:
+            process.stdin.write(prompt)
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+        return True
+
+    def record_first_output(self, warm: bool, seconds: float):
+        totals = self._first_output["warm" if warm else "cold"]
+        totals[0] += 1
+        totals[1] += seconds
+
+    def idle_bytes(self) -> int:
+        return sum(process_rss(process.pid) for process, _ in self._idle)
+
+    @staticmethod
+    async def _stop(process: asyncio.subprocess.Process):
+        kill_process_group(process)
+        await process.wait()
+
+    async def _maintain(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            for entry in list(self._idle):
+                process, spawned_at = entry
+                if not process_alive(process) or now - spawned_at > self.max_idle_age:
+                    self._idle.remove(entry)
+                    self.recycled += 1
+                    await self._stop(process)
+
+            while len(self._idle) < self.size and self.idle_bytes() < self.max_idle_bytes:
+                try:
+                    process = await self.spawn()
+                except Exception as e:
+                    print(f"Failed to pre-spawn Claude process: {e}", flush=True)
+                    break
+                self._idle.append((process, time.monotonic()))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(30.0, self.max_idle_age))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint"""
+        first_output = {
+            kind: round(total / count, 3) if count else None
+            for kind, (count, total) in self._first_output.items()
+        }
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "idle_bytes": self.idle_bytes(),
+            "warm_starts": self.warm_starts,
+            "cold_starts": self.cold_starts,
+            "recycled": self.recycled,
+            "avg_first_output_seconds": first_output,
+        }
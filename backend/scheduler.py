@@ -0,0 +1,222 @@
+"""
+Scheduler Module
+Priority classes with fair sharing between brands and batches for queued jobs
+"""
+import heapq
+import itertools
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class _Brand:
+    """Queued work of one brand within a priority class: a heap of its batches"""
+
+    __slots__ = ("vtime", "heap", "batches")
+
+    def __init__(self):
+        self.vtime = 0  # Tag of the batch served last
+        self.heap: List[Tuple[int, int, Optional[str]]] = []  # (tag, seq, batch)
+        self.batches: Dict[Optional[str], deque] = {}
+
+
+class _Class:
+    """Queued work of one priority class: a heap of brands"""
+
+    __slots__ = ("vtime", "heap", "brands")
+
+    def __init__(self):
+        self.vtime = 0  # Tag of the brand served last
+        self.heap: List[Tuple[int, int, str]] = []  # (tag, seq, brand)
+        self.brands: Dict[str, _Brand] = {}
+
+
+class _Simulation:
+    """Dispatch order of a queue snapshot, worked out only as far as it has been asked for"""
+
+    __slots__ = ("classes", "removed", "seq", "order", "head", "count", "done")
+
+    def __init__(self, classes: Dict[int, _Class], removed: set, seq_start: int):
+        self.classes: Dict[int, _Class] = {}
+        for priority, cls in classes.items():
+            copy = self.classes[priority] = _Class()
+            copy.vtime = cls.vtime
+            copy.heap = list(cls.heap)
+            for brand, owner in cls.brands.items():
+                owner_copy = copy.brands[brand] = _Brand()
+                owner_copy.vtime = owner.vtime
+                owner_copy.heap = list(owner.heap)
+                owner_copy.batches = {batch: deque(jobs) for batch, jobs in owner.batches.items()}
+        self.removed = set(removed)
+        self.seq = itertools.count(seq_start)
+        self.order: Dict[str, int] = {}  # job id -> index in dispatch order
+        self.head = 0  # Index of the next job the real queue will dispatch
+        self.count = 0
+        self.done = False
+
+    def advance(self) -> Optional[str]:
+        """Work out the next job in dispatch order, None once the snapshot is used up"""
+        if self.done:
+            return None
+        job_id = FairScheduler._pop(self.classes, self.removed, self.seq)
+        if job_id is None:
+            self.done = True
+            return None
+        self.order[job_id] = self.count
+        self.count += 1
+        return job_id
+
+    def dispatched(self, job_id: str) -> bool:
+        """
+        The real queue popped job_id; True if it was first in this order
+
+        The rest of the order then still holds, since popping the first job
+        is exactly what the simulation did to reach the second.
+        """
+        if self.head == self.count:
+            self.advance()
+        if self.order.get(job_id) != self.head:
+            return False
+        del self.order[job_id]
+        self.head += 1
+        return True
+
+
+class FairScheduler:
+    """
+    Queue of job ids ordered by priority class, then shared fairly by brand and batch
+
+    A lower priority number always goes first. Within a class, brands take
+    turns, and within a brand its batches take turns (start-time fair queuing
+    with unit cost per job). Jobs within a batch keep their submission order.
+    A brand or batch that becomes active starts at the current virtual time,
+    so idle time earns no credit.
+
+    push and pop are O(log n). remove is O(1): removed jobs are skipped
+    when they reach the front. Queue positions come from simulating the
+    schedule on a snapshot of the queue, only as far as the job asked about.
+    The snapshot is kept while jobs are dispatched from the front, and taken
+    again after a push or remove.
+    """
+
+    def __init__(self):
+        self._classes: Dict[int, _Class] = {}
+        self._where: Dict[str, Tuple[int, str, Optional[str]]] = {}
+        self._removed: set = set()
+        self._seq = itertools.count()
+        self._version = 0
+        self._simulation: Optional[_Simulation] = None
+        self._simulation_version = -1
+
+    def push(self, job_id: str, priority: int, brand: str = "", batch: Optional[str] = None):
+        cls = self._classes.get(priority)
+        if cls is None:
+            cls = self._classes[priority] = _Class()
+        owner = cls.brands.get(brand)
+        if owner is None:
+            owner = cls.brands[brand] = _Brand()
+            heapq.heappush(cls.heap, (cls.vtime, next(self._seq), brand))
+        jobs = owner.batches.get(batch)
+        if jobs is None:
+            jobs = owner.batches[batch] = deque()
+            heapq.heappush(owner.heap, (owner.vtime, next(self._seq), batch))
+        jobs.append(job_id)
+        self._where[job_id] = (priority, brand, batch)
+        self._version += 1
+
+    def pop(self) -> Optional[str]:
+        """Take the next job id to run, or None if the queue is empty"""
+        job_id = self._pop(self._classes, self._removed, self._seq)
+        if job_id is not None:
+            del self._where[job_id]
+            current = self._simulation is not None and self._simulation_version == self._version
+            self._version += 1
+            if current and self._simulation.dispatched(job_id):
+                self._simulation_version = self._version
+        return job_id
+
+    def remove(self, job_id: str) -> bool:
+        """Take a job out of the queue; False if it was not queued"""
+        if job_id not in self._where:
+            return False
+        del self._where[job_id]
+        self._removed.add(job_id)
+        self._version += 1
+        return True
+
+    @staticmethod
+    def _pop(classes: Dict[int, _Class], removed: set, seq: Iterator[int]) -> Optional[str]:
+        for priority in sorted(classes):
+            cls = classes[priority]
+            while cls.heap:
+                tag, _, brand = heapq.heappop(cls.heap)
+                owner = cls.brands[brand]
+                job_id = FairScheduler._pop_brand(owner, removed, seq)
+                if owner.batches:
+                    heapq.heappush(cls.heap, (tag + 1, next(seq), brand))
+                else:
+                    del cls.brands[brand]
+                if job_id is not None:
+                    cls.vtime = tag
+                    return job_id
+            del classes[priority]
+        return None
+
+    @staticmethod
+    def _pop_brand(owner: _Brand, removed: set, seq: Iterator[int]) -> Optional[str]:
+        while owner.heap:
+            tag, _, batch = heapq.heappop(owner.heap)
+            jobs = owner.batches[batch]
+            job_id = None
+            while jobs and job_id is None:
+                candidate = jobs.popleft()
+                if candidate in removed:
+                    removed.discard(candidate)
+                else:
+                    job_id = candidate
+            if jobs:
+                heapq.heappush(owner.heap, (tag + 1, next(seq), batch))
+            else:
+                del owner.batches[batch]
+            if job_id is not None:
+                owner.vtime = tag
+                return job_id
+        return None
+
+    def _simulate(self) -> _Simulation:
+        if self._simulation is None or self._simulation_version != self._version:
+            self._simulation = _Simulation(self._classes, self._removed, next(self._seq))
+            self._simulation_version = self._version
+        return self._simulation
+
+    def positions(self) -> Dict[str, int]:
+        """1-based position of every queued job"""
+        simulation = self._simulate()
+        while simulation.advance() is not None:
+            pass
+        return {job_id: index - simulation.head + 1 for job_id, index in simulation.order.items()}
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position of one queued job, simulating the schedule no further than it"""
+        if job_id not in self._where:
+            return None
+        simulation = self._simulate()
+        while job_id not in simulation.order and simulation.advance() is not None:
+            pass
+        index = simulation.order.get(job_id)
+        return None if index is None else index - simulation.head + 1
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._where
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __bool__(self) -> bool:
+        return bool(self._where)
+
+    def stats(self) -> Dict[str, int]:
+        """Queued jobs per priority class, for the metrics endpoint"""
+        counts: Dict[int, int] = {}
+        for priority, _, _ in self._where.values():
+            counts[priority] = counts.get(priority, 0) + 1
+        return {f"priority_{priority}": count for priority, count in sorted(counts.items())}
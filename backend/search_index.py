@@ -0,0 +1,216 @@
+"""
+Search Index Module
+Incremental in-memory inverted index with BM25 ranking over markdown documents
+"""
+import base64
+import gzip
+import heapq
+import json
+import math
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Very common English words that would otherwise dominate postings lists
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how in is it its of on or our so
+than that the their then there these this to was were what when where which who
+why will with you your
+""".split())
+
+SNIPPET_CHARS = 160
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into indexable terms"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class IndexedDocument:
+    """Per-document data kept by the index: term frequencies, length and compressed text for snippets"""
+
+    __slots__ = ("folder", "name", "title", "updated_at", "length", "term_counts", "compressed_text")
+
+    def __init__(self, folder: str, name: str, title: str, updated_at: Optional[float],
+                 term_counts: Dict[str, int], compressed_text: bytes):
+        self.folder = folder
+        self.name = name
+        self.title = title
+        self.updated_at = updated_at
+        self.term_counts = term_counts
+        self.length = sum(term_counts.values())
+        self.compressed_text = compressed_text
+
+    def text(self) -> str:
+        return zlib.decompress(self.compressed_text).decode('utf-8')
+
+
+class SearchIndex:
+    """
+    Inverted index supporting incremental add/remove and BM25-ranked queries
+
+    Queries only touch postings lists and the compressed text of the top hits,
+    so no document is read from storage at query time.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: Dict[str, IndexedDocument] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        # Set whenever the index changes, cleared once a snapshot is written
+        self.dirty = False
+
+    @staticmethod
+    def _key(folder: str, name: str) -> str:
+        return f"{folder}/{name}"
+
+    def add(self, folder: str, name: str, content: str, title: str, updated_at: Optional[float] = None):
+        """Index a document, replacing any previous version of it"""
+        term_counts = dict(Counter(tokenize(f"{title}\n{content}")))
+        self._insert(IndexedDocument(
+            folder, name, title, updated_at, term_counts,
+            zlib.compress(content.encode('utf-8'))
+        ))
+
+    def _insert(self, document: IndexedDocument):
+        key = self._key(document.folder, document.name)
+        self._remove_key(key)
+        self.documents[key] = document
+        self._total_length += document.length
+        for term, count in document.term_counts.items():
+            self.postings.setdefault(term, {})[key] = count
+        self.dirty = True
+
+    def remove(self, folder: str, name: str):
+        """Drop a document from the index"""
+        self._remove_key(self._key(folder, name))
+
+    def _remove_key(self, key: str):
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        self._total_length -= document.length
+        for term in document.term_counts:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self.postings[term]
+        self.dirty = True
+
+    def get(self, folder: str, name: str) -> Optional[IndexedDocument]:
+        return self.documents.get(self._key(folder, name))
+
+    def search(self, query: str, folders: Optional[Iterable[str]] = None, limit: int = 20) -> List[dict]:
+        """
+        Rank documents against a query with BM25
+
+        Args:
+            query: Free-text query
+            folders: Restrict hits to these folders
+            limit: Maximum number of hits
+
+        Returns:
+            Hits ordered by score, each with folder, name, title, score and snippet
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.documents:
+            return []
+
+        allowed = set(folders) if folders else None
+        doc_count = len(self.documents)
+        avg_length = self._total_length / doc_count if doc_count else 0
+        scores: Dict[str, float] = {}
+
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                document = self.documents[key]
+                if allowed is not None and document.folder not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * document.length / avg_length) if avg_length else self.k1
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        hits = []
+        for key, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            document = self.documents[key]
+            hits.append({
+                "folder": document.folder,
+                "name": document.name,
+                "title": document.title,
+                "score": round(score, 4),
+                "snippet": self._snippet(document.text(), terms),
+            })
+        return hits
+
+    def _snippet(self, text: str, terms: List[str]) -> str:
+        """Cut a window of text around the first query term it contains"""
+        match = re.search(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b", text, re.IGNORECASE)
+        start = max(0, match.start() - SNIPPET_CHARS // 3) if match else 0
+        snippet = re.sub(r"\s+", " ", text[start:start + SNIPPET_CHARS]).strip()
+        if start > 0:
+            snippet = "…" + snippet
+        if start + SNIPPET_CHARS < len(text):
+            snippet += "…"
+        return snippet
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the metrics endpoint"""
+        return {"documents": len(self.documents), "terms": len(self.postings)}
+
+    def to_snapshot(self) -> dict:
+        """Serializable copy of the index; call from the event loop, write it out elsewhere"""
+        return {
+            "documents": [
+                {
+                    "folder": d.folder,
+                    "name": d.name,
+                    "title": d.title,
+                    "updated_at": d.updated_at,
+                    "term_counts": d.term_counts,
+                    "text": base64.b64encode(d.compressed_text).decode('ascii'),
+                }
+                for d in self.documents.values()
+            ]
+        }
+
+    def load_snapshot(self, snapshot: dict):
+        """Replace the index contents with a snapshot produced by to_snapshot"""
+        self.documents.clear()
+        self.postings.clear()
+        self._total_length = 0
+        for d in snapshot.get("documents", []):
+            self._insert(IndexedDocument(
+                d["folder"], d["name"], d["title"], d.get("updated_at"),
+                d["term_counts"], base64.b64decode(d["text"])
+            ))
+        self.dirty = False
+
+
+def write_snapshot(path: Path, snapshot: dict):
+    """Write a snapshot atomically as gzipped JSON (blocking; run in a thread)"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    tmp_path.replace(path)
+
+
+def read_snapshot(path: Path) -> Optional[dict]:
+    """Read a snapshot written by write_snapshot, or None if missing or unreadable (blocking)"""
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable search index snapshot {path}: {e}")
+        return None
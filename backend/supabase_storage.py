@@ -5,14 +5,40 @@ Handles all file operations using Supabase Storage instead of local filesystem
 import os
 import json
 import re
-from typing import List, Optional
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Dict, List, Optional, Tuple
 from datetime import datetime
-from pathlib import Path
 
-from supabase import create_client, Client
+import httpx
 from fastapi import HTTPException, UploadFile
 
 
+# Per-folder index of file metadata and previews, stored alongside the files
+MANIFEST_FILENAME = ".manifest.json"
+
+# Bumped when entries gain fields, so older manifests are rebuilt on next use
+MANIFEST_VERSION = 2
+
+# Page size used when walking a folder listing
+LIST_PAGE_SIZE = 1000
+
+# Connection pool and request concurrency for the Storage API
+STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", "20"))
+STORAGE_MAX_CONCURRENCY = int(os.getenv("STORAGE_MAX_CONCURRENCY", "16"))
+STORAGE_TIMEOUT = float(os.getenv("STORAGE_TIMEOUT", "30"))
+
+
+class StorageNotFound(Exception):
+    """Raised when a requested storage object does not exist"""
+
+
+def extract_title(content: str, filename: str) -> str:
+    """Get a markdown document's title from its first H1, falling back to the filename"""
+    match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+    return match.group(1) if match else filename.replace("_", " ").replace(".md", "")
+
+
 class SupabaseStorageService:
     """Service class for managing files in Supabase Storage"""
 
@@ -24,28 +50,96 @@ class SupabaseStorageService:
         if not supabase_url or not supabase_key:
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in environment variables")
 
-        self.client: Client = create_client(supabase_url, supabase_key)
         self.bucket_name = "workflow-files"  # Main bucket for all files
 
-        # Ensure bucket exists
-        self._ensure_bucket_exists()
+        # One pooled keep-alive client shared by every request to the Storage API
+        self.client = httpx.AsyncClient(
+            base_url=f"{supabase_url.rstrip('/')}/storage/v1",
+            headers={
+                "apikey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}",
+            },
+            timeout=STORAGE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=STORAGE_MAX_CONNECTIONS,
+                max_keepalive_connections=STORAGE_MAX_CONNECTIONS,
+            ),
+        )
+
+        # Bounds in-flight storage requests so bursts queue here instead of at the pool
+        self._request_slots = asyncio.Semaphore(STORAGE_MAX_CONCURRENCY)
+
+        # Serializes read-modify-write cycles on each folder manifest
+        self._manifest_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # Manifests are read-modify-written under a lock that only holds within this process, so
+        # only one process may write them. Job workers turn this off; the API records their
+        # writes with record_external_write().
+        self.manage_manifests = True
+
+        # Last manifest seen per folder, with its etag for conditional downloads
+        self._manifests: Dict[str, Tuple[dict, Optional[str]]] = {}
+
+        # Sorted listing per (folder, extension) and the manifest it was built from, so paging
+        # through an unchanged folder doesn't rebuild and re-sort the listing for every page
+        self._listings: Dict[Tuple[str, str], Tuple[dict, List[dict]]] = {}
+
+    async def startup(self):
+        """Prepare the service for use once the event loop is running"""
+        await self._ensure_bucket_exists()
+
+    async def close(self):
+        """Close pooled connections"""
+        await self.client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to the Storage API
 
-    def _ensure_bucket_exists(self):
+        Raises:
+            StorageNotFound: If the object or bucket does not exist
+            httpx.HTTPStatusError: For any other error response
+        """
+        async with self._request_slots:
+            response = await self.client.request(method, url, **kwargs)
+
+        # 304 answers a conditional request and carries no body
+        if response.is_success or response.status_code == 304:
+            return response
+
+        # The Storage API reports missing objects as 400 with a 404 status code in the body;
+        # HEAD responses have no body, so a 400 there is the same condition
+        if response.status_code == 404 or (method == "HEAD" and response.status_code == 400):
+            raise StorageNotFound(url)
+        if method != "HEAD":
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            if str(body.get("statusCode")) == "404" or body.get("error") == "not_found":
+                raise StorageNotFound(url)
+        response.raise_for_status()
+        return response
+
+    def _object_url(self, folder: str, filename: str) -> str:
+        """Get the Storage API URL for an object"""
+        return f"/object/{self.bucket_name}/{self._get_file_path(folder, filename)}"
+
+    async def _ensure_bucket_exists(self):
         """Ensure the storage bucket exists, create if it doesn't"""
         try:
             # Try to get bucket info
-            self.client.storage.get_bucket(self.bucket_name)
+            await self._request("GET", f"/bucket/{self.bucket_name}")
         except Exception:
             # Bucket doesn't exist, create it
             try:
-                self.client.storage.create_bucket(
-                    self.bucket_name,
-                    options={
-                        "public": False,  # Private bucket
-                        "file_size_limit": 52428800,  # 50MB limit
-                        "allowed_mime_types": ["application/json", "text/markdown", "text/plain"]
-                    }
-                )
+                await self._request("POST", "/bucket", json={
+                    "id": self.bucket_name,
+                    "name": self.bucket_name,
+                    "public": False,  # Private bucket
+                    "file_size_limit": 52428800,  # 50MB limit
+                    "allowed_mime_types": ["application/json", "text/markdown", "text/plain"]
+                })
                 print(f"Created Supabase storage bucket: {self.bucket_name}")
             except Exception as e:
                 print(f"Bucket creation skipped or already exists: {e}")
@@ -54,42 +148,255 @@ class SupabaseStorageService:
         """Get the full storage path for a file"""
         return f"{folder}/{filename}"
 
-    def list_files(self, folder: str, extension: str) -> List[dict]:
+    async def list_files(self, folder: str, extension: str) -> List[dict]:
         """
         List all files in a specific folder with a specific extension
 
+        Metadata and previews come from the folder manifest, so a listing is a
+        single download regardless of how many files the folder holds. The
+        sorted listing is reused until the manifest changes; callers must not
+        modify it.
+
         Args:
             folder: The folder name (brand-data, brief-outputs, draft-outputs, etc.)
             extension: File extension to filter by (json, md, etc.)
 
         Returns:
-            List of file metadata dictionaries
+            List of file metadata dictionaries (name, size, created_at, updated_at,
+            preview, plus title/word_count and job metadata for documents)
         """
         try:
-            # List all files in the folder
-            files = self.client.storage.from_(self.bucket_name).list(folder)
+            manifest = await self._load_manifest(folder, copy=False)
+            cached = self._listings.get((folder, extension))
+            if cached is not None and cached[0] is manifest:
+                return cached[1]
 
             result = []
-            for file in files:
-                if file["name"].endswith(f".{extension}"):
-                    # Get file preview
-                    preview = self._get_file_preview(folder, file["name"], extension)
-
-                    result.append({
-                        "name": file["name"],
-                        "size": file.get("metadata", {}).get("size", 0),
-                        "created_at": self._parse_timestamp(file.get("created_at")),
-                        "preview": preview
-                    })
+            for name, entry in manifest["files"].items():
+                if name.endswith(f".{extension}"):
+                    result.append({"name": name, **entry})
 
             # Sort by creation time, newest first
             result.sort(key=lambda x: x["created_at"], reverse=True)
+            self._listings[(folder, extension)] = (manifest, result)
             return result
 
         except Exception as e:
             print(f"Error listing files in {folder}: {e}")
             return []
 
+    async def _list_objects(self, folder: str) -> List[dict]:
+        """List every object in a folder, following pagination past the API page limit"""
+        objects = []
+        offset = 0
+        while True:
+            response = await self._request("POST", f"/object/list/{self.bucket_name}", json={
+                "prefix": folder,
+                "limit": LIST_PAGE_SIZE,
+                "offset": offset,
+                "sortBy": {"column": "name", "order": "asc"},
+            })
+            page = response.json()
+            objects.extend(page)
+            if len(page) < LIST_PAGE_SIZE:
+                return objects
+            offset += LIST_PAGE_SIZE
+
+    async def _download_manifest(self, folder: str, copy: bool = True) -> Optional[dict]:
+        """
+        Download a folder manifest, returning None if it does not exist yet
+
+        The last copy seen is kept in memory and revalidated by etag, so an
+        unchanged manifest costs a 304 rather than a full download. With
+        copy=False that shared copy itself is returned, for callers that only
+        read it; it stays the same object until the manifest changes.
+        """
+        cached = self._manifests.get(folder)
+        headers = {"if-none-match": cached[1]} if cached and cached[1] else {}
+        try:
+            response = await self._request("GET", self._object_url(folder, MANIFEST_FILENAME), headers=headers)
+        except StorageNotFound:
+            self._manifests.pop(folder, None)
+            return None
+
+        if response.status_code == 304:
+            manifest = cached[0]
+        else:
+            try:
+                manifest = json.loads(response.content.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                print(f"Discarding corrupt manifest for {folder}: {e}")
+                return None
+            if not isinstance(manifest.get("files"), dict):
+                return None
+            self._manifests[folder] = (manifest, response.headers.get("etag"))
+
+        if not copy:
+            return manifest
+        # Callers may modify the file map, so hand out a copy
+        return {**manifest, "files": dict(manifest["files"])}
+
+    async def _upload_manifest(self, folder: str, manifest: dict):
+        """Upload a folder manifest, replacing any previous version"""
+        await self._request(
+            "POST",
+            self._object_url(folder, MANIFEST_FILENAME),
+            content=json.dumps(manifest, ensure_ascii=False).encode('utf-8'),
+            headers={"content-type": "application/json", "x-upsert": "true"}
+        )
+        # The upload response carries no etag, so the next read fetches the new version in full
+        self._manifests[folder] = (manifest, None)
+
+    async def _rebuild_manifest(self, folder: str, previous: Optional[dict] = None) -> dict:
+        """
+        Build a manifest from the objects currently in a folder
+
+        This downloads every file once to compute previews, so it only runs
+        when a folder has no manifest yet (e.g. data uploaded before manifests
+        existed) or its manifest predates MANIFEST_VERSION. Metadata recorded in
+        a previous manifest is carried over.
+        """
+        previous_files = previous["files"] if previous else {}
+        print(f"Building manifest for {folder}")
+        # Skip the manifest itself and storage placeholders
+        objects = [obj for obj in await self._list_objects(folder) if not obj["name"].startswith(".")]
+
+        async def build_entry(obj: dict) -> Optional[dict]:
+            try:
+                content = await self.read_file(folder, obj["name"])
+            except HTTPException as e:
+                print(f"Skipping {obj['name']} while building manifest: {e.detail}")
+                return None
+            return self._manifest_entry(
+                obj["name"],
+                content,
+                created_at=self._parse_timestamp(obj.get("created_at")),
+                updated_at=self._parse_timestamp(obj.get("updated_at") or obj.get("created_at")),
+                size=(obj.get("metadata") or {}).get("size", len(content.encode('utf-8'))),
+                previous=previous_files.get(obj["name"])
+            )
+
+        entries = await asyncio.gather(*(build_entry(obj) for obj in objects))
+        files = {obj["name"]: entry for obj, entry in zip(objects, entries) if entry is not None}
+
+        manifest = {"version": MANIFEST_VERSION, "files": files}
+        if self.manage_manifests:
+            await self._upload_manifest(folder, manifest)
+        return manifest
+
+    def _is_current(self, manifest: Optional[dict]) -> bool:
+        return manifest is not None and manifest.get("version") == MANIFEST_VERSION
+
+    async def _load_manifest(self, folder: str, copy: bool = True) -> dict:
+        """Fetch the manifest for a folder, building it on first use (see _download_manifest for copy)"""
+        manifest = await self._download_manifest(folder, copy)
+        if not self._is_current(manifest):
+            async with self._manifest_locks[folder]:
+                manifest = await self._download_manifest(folder)
+                if not self._is_current(manifest):
+                    manifest = await self._rebuild_manifest(folder, previous=manifest)
+        return manifest
+
+    async def get_entry(self, folder: str, filename: str) -> Optional[dict]:
+        """
+        Get the manifest record for a single file
+
+        Returns:
+            The file's metadata, or None if the manifest does not list it
+        """
+        manifest = await self._load_manifest(folder, copy=False)
+        entry = manifest["files"].get(filename)
+        return {"name": filename, **entry} if entry is not None else None
+
+    def _manifest_entry(self, filename: str, content: str, created_at: float,
+                        updated_at: Optional[float] = None, size: Optional[int] = None,
+                        previous: Optional[dict] = None, metadata: Optional[dict] = None) -> dict:
+        """
+        Build the manifest record for a file from its content
+
+        Fields that cannot be derived from content (such as the keyword and brand
+        a document was generated for) are kept from the previous record unless
+        new metadata replaces them.
+        """
+        extension = filename.rsplit(".", 1)[-1] if "." in filename else ""
+        entry = {
+            **(previous or {}),
+            "size": size if size is not None else len(content.encode('utf-8')),
+            "created_at": created_at,
+            "updated_at": updated_at if updated_at is not None else created_at,
+            "preview": self._build_preview(content, extension)
+        }
+        if extension == "md":
+            entry["title"] = extract_title(content, filename)
+            entry["word_count"] = len(content.split())
+        entry.update({key: value for key, value in (metadata or {}).items() if value is not None})
+        return entry
+
+    async def _record_write(self, folder: str, filename: str, content: str,
+                            write: Optional[Awaitable] = None, metadata: Optional[dict] = None):
+        """
+        Add or refresh a file's manifest entry after it has been written
+
+        If the write itself is passed in, it runs concurrently with the manifest
+        download so the two round trips overlap. Errors from the write propagate;
+        manifest errors are logged and ignored.
+        """
+        if not self.manage_manifests:
+            if write is not None:
+                await write
+            return
+
+        now = datetime.now().timestamp()
+        async with self._manifest_locks[folder]:
+            if write is not None:
+                write_result, manifest = await asyncio.gather(
+                    write, self._download_manifest(folder), return_exceptions=True
+                )
+                if isinstance(write_result, BaseException):
+                    raise write_result
+            else:
+                manifest = await self._download_manifest(folder)
+
+            try:
+                if isinstance(manifest, BaseException):
+                    raise manifest
+                if not self._is_current(manifest):
+                    # The rebuild picks up the file we just wrote
+                    manifest = await self._rebuild_manifest(folder, previous=manifest)
+                    if not metadata or filename not in manifest["files"]:
+                        return
+                previous = manifest["files"].get(filename, {})
+                manifest["files"][filename] = self._manifest_entry(
+                    filename,
+                    content,
+                    created_at=previous.get("created_at", now),
+                    updated_at=now,
+                    previous=previous,
+                    metadata=metadata
+                )
+                await self._upload_manifest(folder, manifest)
+            except Exception as e:
+                print(f"Error updating manifest for {folder}/{filename}: {e}")
+
+    async def record_external_write(self, folder: str, filename: str, content: str,
+                                    metadata: Optional[dict] = None):
+        """Add or refresh the manifest entry of a file written by a process that doesn't manage manifests"""
+        await self._record_write(folder, filename, content, metadata=metadata)
+
+    async def _record_delete(self, folder: str, filename: str):
+        """Drop a file's manifest entry after it has been deleted"""
+        if not self.manage_manifests:
+            return
+        try:
+            async with self._manifest_locks[folder]:
+                manifest = await self._download_manifest(folder)
+                if not self._is_current(manifest) or filename not in manifest["files"]:
+                    return
+                del manifest["files"][filename]
+                await self._upload_manifest(folder, manifest)
+        except Exception as e:
+            print(f"Error updating manifest for {folder}/{filename}: {e}")
+
     def _parse_timestamp(self, timestamp_str: Optional[str]) -> float:
         """Parse ISO timestamp string to Unix timestamp"""
         if not timestamp_str:
@@ -100,11 +407,9 @@ class SupabaseStorageService:
         except Exception:
             return datetime.now().timestamp()
 
-    def _get_file_preview(self, folder: str, filename: str, extension: str, chars: int = 200) -> str:
-        """Get a preview of the file content"""
+    def _build_preview(self, content: str, extension: str, chars: int = 200) -> str:
+        """Build a short preview of file content"""
         try:
-            content = self.read_file(folder, filename)
-
             if extension == "json":
                 data = json.loads(content)
                 if "brandInfo" in data and isinstance(data["brandInfo"], dict):
@@ -117,11 +422,11 @@ class SupabaseStorageService:
                 preview = re.sub(r'[#*`\[\]()]', '', content)
                 return preview[:chars]
         except Exception as e:
-            print(f"Error getting preview for {filename}: {e}")
+            print(f"Error building preview: {e}")
             return ""
         return ""
 
-    def read_file(self, folder: str, filename: str) -> str:
+    async def read_file(self, folder: str, filename: str) -> str:
         """
         Read a file from Supabase Storage
 
@@ -132,75 +437,93 @@ class SupabaseStorageService:
         Returns:
             File content as string
         """
+        content, _ = await self.read_file_if_changed(folder, filename)
+        return content
+
+    async def read_file_if_changed(self, folder: str, filename: str,
+                                   etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Read a file unless it still matches a known etag
+
+        Args:
+            folder: The folder name
+            filename: The filename
+            etag: Etag of a previously downloaded copy, if any
+
+        Returns:
+            (content, etag) - content is None when the stored object still matches etag
+        """
         try:
-            file_path = self._get_file_path(folder, filename)
+            headers = {"if-none-match": etag} if etag else {}
 
             # Download file content
-            response = self.client.storage.from_(self.bucket_name).download(file_path)
-
-            if response is None:
-                raise HTTPException(status_code=404, detail="File not found")
+            response = await self._request("GET", self._object_url(folder, filename), headers=headers)
+            if response.status_code == 304:
+                return None, etag
 
             # Convert bytes to string
-            content = response.decode('utf-8')
-            return content
+            content = response.content.decode('utf-8')
+            return content, response.headers.get("etag")
 
+        except StorageNotFound:
+            raise HTTPException(status_code=404, detail="File not found")
         except Exception as e:
-            if "not found" in str(e).lower():
-                raise HTTPException(status_code=404, detail="File not found")
             print(f"Error reading file {filename}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to read file: {str(e)}")
 
-    def write_file(self, folder: str, filename: str, content: str) -> bool:
+    async def write_file(self, folder: str, filename: str, content: str,
+                         metadata: Optional[dict] = None) -> bool:
         """
         Write or update a file in Supabase Storage
 
+        Uses a single upsert request, so the existing object is never downloaded.
+
         Args:
             folder: The folder name
             filename: The filename
             content: Content to write (as string)
+            metadata: Extra fields to record in the folder manifest (e.g. primary_keyword)
 
         Returns:
             True if successful
         """
         try:
-            file_path = self._get_file_path(folder, filename)
-
             # Determine content type
             content_type = "application/json" if filename.endswith(".json") else "text/markdown"
 
-            # Check if file exists
-            try:
-                existing = self.client.storage.from_(self.bucket_name).download(file_path)
-                file_exists = existing is not None
-            except Exception:
-                file_exists = False
-
-            # Upload or update file
-            content_bytes = content.encode('utf-8')
-
-            if file_exists:
-                # Update existing file
-                self.client.storage.from_(self.bucket_name).update(
-                    file_path,
-                    content_bytes,
-                    {"content-type": content_type}
-                )
-            else:
-                # Upload new file
-                self.client.storage.from_(self.bucket_name).upload(
-                    file_path,
-                    content_bytes,
-                    {"content-type": content_type}
-                )
+            # Create or replace the object in one request
+            upsert = self._request(
+                "POST",
+                self._object_url(folder, filename),
+                content=content.encode('utf-8'),
+                headers={"content-type": content_type, "x-upsert": "true"}
+            )
 
+            await self._record_write(folder, filename, content, write=upsert, metadata=metadata)
             return True
 
         except Exception as e:
             print(f"Error writing file {filename}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to write file: {str(e)}")
 
-    def delete_file(self, folder: str, filename: str) -> bool:
+    async def file_exists(self, folder: str, filename: str) -> bool:
+        """
+        Check whether a file exists without downloading it
+
+        Args:
+            folder: The folder name
+            filename: The filename
+
+        Returns:
+            True if the object exists
+        """
+        try:
+            await self._request("HEAD", self._object_url(folder, filename))
+            return True
+        except StorageNotFound:
+            return False
+
+    async def delete_file(self, folder: str, filename: str) -> bool:
         """
         Delete a file from Supabase Storage
 
@@ -215,7 +538,8 @@ class SupabaseStorageService:
             file_path = self._get_file_path(folder, filename)
 
             # Delete the file
-            self.client.storage.from_(self.bucket_name).remove([file_path])
+            await self._request("DELETE", f"/object/{self.bucket_name}", json={"prefixes": [file_path]})
+            await self._record_delete(folder, filename)
             return True
 
         except Exception as e:
@@ -234,8 +558,6 @@ class SupabaseStorageService:
             The filename
         """
         try:
-            file_path = self._get_file_path(folder, file.filename)
-
             # Read file content
             content = await file.read()
 
@@ -248,19 +570,21 @@ class SupabaseStorageService:
                 content_type = file.content_type or "text/plain"
 
             # Upload to Supabase Storage
-            self.client.storage.from_(self.bucket_name).upload(
-                file_path,
-                content,
-                {"content-type": content_type, "upsert": "true"}
+            upload = self._request(
+                "POST",
+                self._object_url(folder, file.filename),
+                content=content,
+                headers={"content-type": content_type, "x-upsert": "true"}
             )
 
+            await self._record_write(folder, file.filename, content.decode('utf-8', errors='replace'), write=upload)
             return file.filename
 
         except Exception as e:
             print(f"Error uploading file {file.filename}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
-    def save_file(self, folder: str, filename: str, content: str) -> bool:
+    async def save_file(self, folder: str, filename: str, content: str) -> bool:
         """
         Save/update a file in Supabase Storage
 
@@ -272,11 +596,13 @@ class SupabaseStorageService:
         Returns:
             True if successful
         """
-        # Check if file exists first
+        # Check if file exists first (metadata only, no body transfer)
         try:
-            file_path = self._get_file_path(folder, filename)
-            self.client.storage.from_(self.bucket_name).download(file_path)
-        except Exception:
+            exists = await self.file_exists(folder, filename)
+        except Exception as e:
+            print(f"Error checking file {filename}: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+        if not exists:
             raise HTTPException(status_code=404, detail="File not found")
 
-        return self.write_file(folder, filename, content)
+        return await self.write_file(folder, filename, content)
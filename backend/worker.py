@@ -0,0 +1,155 @@
+"""
+Job Worker
+Runs Claude jobs leased from the shared job store, for deployments where the API runs
+with JOB_EXECUTION=remote and only enqueues jobs.
+
+Usage: python worker.py
+
+Every worker must share the API's job store (JOB_STORE_PATH), logs directory and
+storage backend. Start as many as needed; each leases up to WORKER_CONCURRENCY jobs
+at a time (adapted at runtime like the API's job slots) and renews its leases while they run. Jobs held by a worker that stops
+renewing are reclaimed by another worker once the lease expires. Workers write job
+outputs to storage but leave folder manifests to the API, which records the outputs of
+jobs it sees finish.
+"""
+import asyncio
+import os
+import signal
+import socket
+from pathlib import Path
+
+from app import (
+    CONCURRENCY_SAMPLE_INTERVAL, JOB_MAX_ATTEMPTS, LOGS_DIR, MAX_CONCURRENT_JOBS,
+    create_concurrency_limiter, file_manager, job_manager
+)
+from process_pool import kill_process_group
+
+WORKER_ID = os.getenv("WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", str(MAX_CONCURRENT_JOBS)))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+
+class Worker:
+    def __init__(self):
+        self.store = job_manager.jobs.store
+        self.running: dict = {}  # job id -> task
+        self.stopping = asyncio.Event()
+        self.limiter = job_manager.limiter = create_concurrency_limiter(WORKER_CONCURRENCY)
+        self.throttle = job_manager.throttle
+        # Jobs requeued here, e.g. after a rate limit, go back to the store for any worker
+        job_manager.execution = "remote"
+        if file_manager.use_supabase:
+            file_manager.storage.manage_manifests = False
+        self.sampled_at = 0.0
+
+    async def run(self):
+        print(f"Worker {WORKER_ID} started (concurrency {WORKER_CONCURRENCY})", flush=True)
+        loop = asyncio.get_running_loop()
+        while not self.stopping.is_set():
+            if loop.time() - self.sampled_at >= CONCURRENCY_SAMPLE_INTERVAL:
+                self.sampled_at = loop.time()
+                self.limiter.sample_host()
+            if len(self.running) >= self.limiter.limit:
+                await self._wait(WORKER_POLL_INTERVAL)
+                continue
+            wait = self.throttle.delay()
+            if wait > 0:
+                await self._wait(min(wait, WORKER_POLL_INTERVAL))
+                continue
+            try:
+                record = await asyncio.to_thread(self.store.lease, WORKER_ID, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS)
+            except Exception as e:
+                print(f"Error leasing a job: {e}", flush=True)
+                record = None
+            if record is None:
+                await self._wait(WORKER_POLL_INTERVAL)
+                continue
+            self.throttle.take()
+            task = asyncio.create_task(self.execute(record))
+            self.running[record["id"]] = task
+            task.add_done_callback(lambda _, job_id=record["id"]: self.running.pop(job_id, None))
+        await self.shutdown()
+
+    async def _wait(self, seconds: float):
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def execute(self, record: dict):
+        """Run one leased job, renewing its lease until it finishes"""
+        job_id = record["id"]
+        record["process"] = None
+        record["queue_position"] = None
+        job_manager.jobs.add(record, persist=False)
+        print(f"[Job {job_id}] Leased by {WORKER_ID}", flush=True)
+
+        heartbeat = asyncio.create_task(self.keep_lease(job_id))
+        try:
+            # The record's log path is the API's; the file itself lives in the shared logs directory
+            await job_manager.execute_job(job_id, record["type"], record["params"], LOGS_DIR / Path(record["log_file"]).name)
+        finally:
+            heartbeat.cancel()
+            job_manager.jobs.remove(job_id, persist=False)
+
+    async def keep_lease(self, job_id: str):
+        """Renew a job's lease; if another worker has taken it over, stop running it here"""
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                held = await asyncio.to_thread(self.store.renew, job_id, WORKER_ID, JOB_LEASE_SECONDS)
+            except Exception as e:
+                print(f"[Job {job_id}] Error renewing lease: {e}", flush=True)
+                continue
+            if not held:
+                # Cancelled, or taken over by another worker: either way the run ends here without
+                # counting as a failure, and the store ignores what this worker reports for it
+                print(f"[Job {job_id}] Lease lost, stopping", flush=True)
+                job = job_manager.jobs.get(job_id)
+                if job:
+                    if job["status"] in ("queued", "running"):
+                        job_manager.jobs.set_status(job_id, "cancelled")
+                    if job.get("process") and job["process"].returncode is None:
+                        kill_process_group(job["process"])
+                return
+
+    async def shutdown(self):
+        """Stop running jobs and hand them back to the queue for other workers"""
+        job_ids = list(self.running)
+        processes = [job_manager.jobs[job_id].get("process") for job_id in job_ids if job_id in job_manager.jobs]
+        for task in self.running.values():
+            task.cancel()
+        await asyncio.gather(*self.running.values(), return_exceptions=True)
+        for process in processes:
+            if process is not None:
+                kill_process_group(process)
+        await asyncio.to_thread(self.store.flush)
+        for job_id in job_ids:
+            await asyncio.to_thread(self.store.release, job_id, WORKER_ID)
+        if job_ids:
+            print(f"Worker {WORKER_ID} released {len(job_ids)} job(s)", flush=True)
+
+
+async def main():
+    if file_manager.use_supabase:
+        await file_manager.storage.startup()
+    job_manager.jobs.store.start()
+
+    worker = Worker()
+    job_manager.process_pool.start()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stopping.set)
+
+    try:
+        await worker.run()
+    finally:
+        await job_manager.process_pool.close()
+        await asyncio.to_thread(job_manager.jobs.store.close)
+        if file_manager.use_supabase:
+            await file_manager.storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,4 @@
-import type { FileListResponse, BrandDataResponse, JobResponse, BatchJobResponse, BrandDataFormData, BriefFormData, DraftFormData } from './types';
+import type { DocumentChange, FileInfo, FileListResponse, BrandDataResponse, Job, JobResponse, JobSummary, JobUpdate, BatchJobResponse, BatchStatusResponse, LogPageResponse, BrandDataFormData, BriefFormData, DraftFormData } from './types';
 
 // Use environment variable for API URL, with fallback to localhost for development
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
@@ -228,17 +228,28 @@ export const jobsAPI = {
     return response.json();
   },
 
+  getLogs: async (jobId: string, options: { offset?: number; limit?: number } = {}): Promise<LogPageResponse> => {
+    const params = new URLSearchParams({ limit: String(options.limit ?? 200) });
+    if (options.offset !== undefined) params.set('offset', String(options.offset));
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/logs?${params}`);
+    if (!response.ok) throw new Error(`Failed to load logs: ${response.status}`);
+    return response.json();
+  },
+
   streamLogs: (
     jobId: string,
-    onLog: (message: string) => void,
+    after: number | null,
+    onLog: (message: string, offset: number) => void,
     onComplete: (data: any) => void,
     onError: (error: Event) => void
   ): EventSource => {
-    const eventSource = new EventSource(`${API_BASE_URL}/jobs/${jobId}/logs`);
+    // Start after lines already loaded; on reconnect the browser resumes from the last event id
+    const query = after !== null ? `?last_event_id=${after}` : '';
+    const eventSource = new EventSource(`${API_BASE_URL}/jobs/${jobId}/logs${query}`);
 
     eventSource.addEventListener('log', (event: MessageEvent) => {
       const data = JSON.parse(event.data);
-      onLog(data.message);
+      onLog(data.message, Number(event.lastEventId));
     });
 
     eventSource.addEventListener('complete', (event: MessageEvent) => {
@@ -248,10 +259,149 @@ export const jobsAPI = {
     });
 
     eventSource.addEventListener('error', (event: Event) => {
-      onError(event);
-      eventSource.close();
+      // A dropped connection is retried by the browser; give up on server errors or once it stops retrying
+      if (event instanceof MessageEvent || eventSource.readyState === EventSource.CLOSED) {
+        onError(event);
+        eventSource.close();
+      }
+    });
+
+    return eventSource;
+  },
+};
+
+// Batches API
+export const batchesAPI = {
+  get: async (batchId: string): Promise<BatchStatusResponse> => {
+    const response = await fetch(`${API_BASE_URL}/batches/${batchId}`);
+    return response.json();
+  },
+};
+
+// Job events: one shared /api/events connection for every job and batch the page watches
+type JobListener = (update: JobUpdate) => void;
+
+const jobListeners = new Map<string, Set<JobListener>>();
+const batchListeners = new Map<string, Set<JobListener>>();
+// Batch of each job seen on the stream, to route queue position updates to batch listeners
+const jobBatches = new Map<string, string>();
+let eventSource: EventSource | null = null;
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+
+const dispatchJobUpdate = (update: JobUpdate) => {
+  if (update.batch_id) {
+    jobBatches.set(update.id, update.batch_id);
+  }
+  const batchId = update.batch_id ?? jobBatches.get(update.id);
+  jobListeners.get(update.id)?.forEach((listener) => listener(update));
+  if (batchId) {
+    batchListeners.get(batchId)?.forEach((listener) => listener(update));
+  }
+};
+
+const connectJobEvents = () => {
+  reconnectTimer = null;
+  eventSource?.close();
+  eventSource = null;
+  if (jobListeners.size === 0 && batchListeners.size === 0) {
+    return;
+  }
+
+  const params = new URLSearchParams();
+  if (jobListeners.size > 0) params.set('job_ids', [...jobListeners.keys()].join(','));
+  if (batchListeners.size > 0) params.set('batch_ids', [...batchListeners.keys()].join(','));
+  eventSource = new EventSource(`${API_BASE_URL}/events?${params}`);
+
+  // Sent on every (re)connect, so nothing missed while disconnected is lost
+  eventSource.addEventListener('snapshot', (event: MessageEvent) => {
+    const { jobs } = JSON.parse(event.data) as { jobs: JobSummary[] };
+    jobs.forEach(dispatchJobUpdate);
+  });
+
+  eventSource.addEventListener('job', (event: MessageEvent) => {
+    dispatchJobUpdate(JSON.parse(event.data));
+  });
+
+  eventSource.addEventListener('queue', (event: MessageEvent) => {
+    const { positions } = JSON.parse(event.data) as { positions: Record<string, number | null> };
+    Object.entries(positions).forEach(([id, queue_position]) => dispatchJobUpdate({ id, queue_position }));
+  });
+};
+
+// Reconnect once after a burst of new subscriptions, with filters covering all of them
+const scheduleReconnect = () => {
+  if (reconnectTimer === null) {
+    reconnectTimer = setTimeout(connectJobEvents, 0);
+  }
+};
+
+const watch = (listeners: Map<string, Set<JobListener>>, key: string, listener: JobListener): (() => void) => {
+  let keyListeners = listeners.get(key);
+  if (!keyListeners) {
+    keyListeners = new Set();
+    listeners.set(key, keyListeners);
+    scheduleReconnect();
+  }
+  keyListeners.add(listener);
+
+  return () => {
+    keyListeners!.delete(listener);
+    if (keyListeners!.size === 0 && listeners.get(key) === keyListeners) {
+      listeners.delete(key);
+      // A stale filter costs nothing, so only disconnect once nothing is watched
+      if (jobListeners.size === 0 && batchListeners.size === 0) {
+        scheduleReconnect();
+      }
+    }
+  };
+};
+
+export const jobEventsAPI = {
+  // Calls listener with the job's current state, then on every change; returns a function to stop
+  watchJob: (jobId: string, listener: JobListener) => watch(jobListeners, jobId, listener),
+
+  watchBatch: (batchId: string, listener: JobListener) => watch(batchListeners, batchId, listener),
+};
+
+// The fields of a job event that update a Job in the jobs list
+export const jobFieldsFromUpdate = (update: JobUpdate): Partial<Job> => {
+  const fields: Partial<Job> = {};
+  if (update.status !== undefined) fields.status = update.status;
+  if (update.queue_position !== undefined) fields.queue_position = update.queue_position ?? undefined;
+  return fields;
+};
+
+// Document change feed: deltas for brief and draft listings instead of refetching them
+export const documentEventsAPI = {
+  // onResync fires on every (re)connect and when changes were dropped: reload the listing then
+  watch: (
+    folders: string[],
+    onResync: () => void,
+    onChange: (change: DocumentChange) => void
+  ): EventSource => {
+    const eventSource = new EventSource(`${API_BASE_URL}/documents/events?folders=${folders.join(',')}`);
+
+    eventSource.addEventListener('resync', () => onResync());
+
+    (['created', 'updated', 'deleted'] as const).forEach((event) => {
+      eventSource.addEventListener(event, (message: MessageEvent) => {
+        onChange({ event, ...JSON.parse(message.data) });
+      });
     });
 
     return eventSource;
   },
 };
+
+// Apply a document change to a listing: new documents go first, as in the default newest-first order
+export const applyDocumentChange = (files: FileInfo[], change: DocumentChange): FileInfo[] => {
+  if (change.event === 'deleted' || !change.document) {
+    return files.filter((file) => file.name !== change.name);
+  }
+  const document = change.document;
+  const index = files.findIndex((file) => file.name === change.name);
+  if (index === -1) {
+    return [{ ...document, created_at: document.created_at ?? Date.now() / 1000 }, ...files];
+  }
+  return files.map((file, i) => (i === index ? { ...file, ...document } : file));
+};
@@ -1,6 +1,6 @@
 import { Loader2, CheckCircle, XCircle, Briefcase, X } from 'lucide-react';
 import { useEffect } from 'react';
-import { jobsAPI } from '../api';
+import { jobEventsAPI } from '../api';
 import { Card, CardHeader, CardTitle, CardContent } from './ui/card';
 import { Badge } from './ui/badge';
 import { Button } from './ui/button';
@@ -98,21 +98,20 @@ interface JobCardProps {
 
 function JobCard({ job, updateJob, isSelected, onSelect }: JobCardProps) {
   useEffect(() => {
-    // Poll for job status updates
-    const interval = setInterval(async () => {
-      try {
-        const data = await jobsAPI.get(job.id);
-        if (data.status !== 'running') {
-          updateJob(job.id, { status: data.status });
-          clearInterval(interval);
-        }
-      } catch (error) {
-        console.error('Error fetching job status:', error);
+    // Batch jobs are kept up to date by the tab that watches their batch
+    if (job.batch_id) {
+      return;
+    }
+
+    const stopWatching = jobEventsAPI.watchJob(job.id, (update) => {
+      if (update.status && update.status !== 'running') {
+        updateJob(job.id, { status: update.status });
+        stopWatching();
       }
-    }, 2000);
+    });
 
-    return () => clearInterval(interval);
-  }, [job.id, updateJob]);
+    return stopWatching;
+  }, [job.id, job.batch_id, updateJob]);
 
   const getJobTypeLabel = () => {
     switch (job.type) {
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Upload, Trash2, Eye, Loader2, Database, Sparkles, Edit2, Save, X } from 'lucide-react';
-import { brandDataAPI, jobsAPI } from '../api';
+import { brandDataAPI, jobEventsAPI } from '../api';
 import { Card, CardHeader, CardTitle, CardDescription, CardContent } from './ui/card';
 import { Button } from './ui/button';
 import { Input } from './ui/input';
@@ -62,17 +62,16 @@ export default function BrandDataTab({ addJob, updateJob }: BrandDataTabProps) {
       });
 
       // Monitor job completion
-      const interval = setInterval(async () => {
-        const jobData = await jobsAPI.get(job_id);
-        if (jobData.status !== 'running') {
-          clearInterval(interval);
+      const stopWatching = jobEventsAPI.watchJob(job_id, (update) => {
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          stopWatching();
           setGenerating(false);
           setUrls('');
           setBrandName('');
           loadFiles();
-          updateJob(job_id, { status: jobData.status });
+          updateJob(job_id, { status: update.status });
         }
-      }, 2000);
+      });
     } catch (error) {
       console.error('Error generating brand data:', error);
       setGenerating(false);
@@ -1,6 +1,6 @@
 import { Download, Eye, FileText, Loader2, Sparkles, Trash2, Upload, Plus, X, Layers, Edit2, Save, Wand2 } from 'lucide-react';
 import { useEffect, useState } from 'react';
-import { brandDataAPI, briefsAPI, jobsAPI } from '../api';
+import { applyDocumentChange, batchesAPI, documentEventsAPI, jobEventsAPI, jobFieldsFromUpdate, brandDataAPI, briefsAPI } from '../api';
 import type { BriefFormData, FileInfo, Job } from '../types';
 import MarkdownViewer from './MarkdownViewer';
 import MarkdownEditor from './MarkdownEditor';
@@ -52,8 +52,16 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
   ]);
 
   useEffect(() => {
-    loadFiles();
     loadBrandFiles();
+
+    // The change feed asks for a full listing on connect, then sends changes to apply to it
+    const eventSource = documentEventsAPI.watch(
+      ['brief-outputs'],
+      loadFiles,
+      (change) => setFiles((prev) => applyDocumentChange(prev, change))
+    );
+
+    return () => eventSource.close();
   }, []);
 
   const loadFiles = async () => {
@@ -94,10 +102,9 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
         params: formData,
       });
 
-      const interval = setInterval(async () => {
-        const jobData = await jobsAPI.get(job_id);
-        if (jobData.status !== 'running' && jobData.status !== 'queued') {
-          clearInterval(interval);
+      const stopWatching = jobEventsAPI.watchJob(job_id, (update) => {
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          stopWatching();
           setGenerating(false);
           setFormData({
             title: '',
@@ -105,10 +112,9 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
             secondary_keywords: '',
             brand_data: '',
           });
-          loadFiles();
-          updateJob(job_id, { status: jobData.status });
+          updateJob(job_id, { status: update.status });
         }
-      }, 2000);
+      });
     } catch (error) {
       console.error('Error generating brief:', error);
       setGenerating(false);
@@ -137,54 +143,48 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
     try {
       const { batch_id, job_ids } = await briefsAPI.generateBatch(validForms);
 
-      // Fetch all job data concurrently
-      const jobDataPromises = job_ids.map((id) => jobsAPI.get(id));
-      const jobDataArray = await Promise.all(jobDataPromises);
+      if (job_ids.length === 0) {
+        setGenerating(false);
+        return;
+      }
+
+      // One request covers every job in the batch
+      const batch = await batchesAPI.get(batch_id);
 
       // Add all jobs
-      jobDataArray.forEach((jobData, i) => {
+      batch.jobs.forEach((jobData) => {
+        const i = job_ids.indexOf(jobData.id);
         addJob({
-          id: job_ids[i],
+          id: jobData.id,
           type: 'brief',
           status: jobData.status,
           params: validForms[i],
           batch_id: batch_id,
-          queue_position: jobData.queue_position,
+          queue_position: jobData.queue_position ?? undefined,
         });
       });
 
-      // Monitor all jobs
-      const intervals = job_ids.map((job_id) =>
-        setInterval(async () => {
-          const jobData = await jobsAPI.get(job_id);
-          if (jobData.status !== 'running' && jobData.status !== 'queued') {
-            clearInterval(intervals[job_ids.indexOf(job_id)]);
-            updateJob(job_id, { status: jobData.status, queue_position: jobData.queue_position });
-
-            // Check if all jobs are done
-            const allDone = job_ids.every(async (id) => {
-              const data = await jobsAPI.get(id);
-              return data.status !== 'running' && data.status !== 'queued';
-            });
-
-            if (allDone) {
-              setGenerating(false);
-              setBatchForms([
-                {
-                  title: '',
-                  primary_keyword: '',
-                  secondary_keywords: '',
-                  brand_data: '',
-                },
-              ]);
-              loadFiles();
-            }
-          } else {
-            // Update queue position
-            updateJob(job_id, { queue_position: jobData.queue_position });
-          }
-        }, 2000)
-      );
+      // Monitor the batch as a whole over the shared event stream
+      const finished = new Set<string>();
+      const stopWatching = jobEventsAPI.watchBatch(batch_id, (update) => {
+        updateJob(update.id, jobFieldsFromUpdate(update));
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          finished.add(update.id);
+        }
+
+        if (finished.size === batch.total) {
+          stopWatching();
+          setGenerating(false);
+          setBatchForms([
+            {
+              title: '',
+              primary_keyword: '',
+              secondary_keywords: '',
+              brand_data: '',
+            },
+          ]);
+        }
+      });
     } catch (error) {
       console.error('Error generating batch:', error);
       setGenerating(false);
@@ -223,7 +223,6 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
 
     try {
       await briefsAPI.upload(file);
-      loadFiles();
     } catch (error) {
       console.error('Error uploading file:', error);
     }
@@ -234,7 +233,6 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
 
     try {
       await briefsAPI.delete(filename);
-      loadFiles();
     } catch (error) {
       console.error('Error deleting file:', error);
     }
@@ -269,7 +267,6 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
       await briefsAPI.save(viewingFile.filename, editedContent);
       setViewingFile({ ...viewingFile, content: editedContent });
       setIsEditing(false);
-      loadFiles(); // Reload to update preview
       alert('Brief saved successfully!');
     } catch (error) {
       console.error('Error saving file:', error);
@@ -307,15 +304,14 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
         params: { filename: viewingFile.filename, edit_prompt: aiEditPrompt, diff_id },
       });
 
-      // Poll for job completion
-      const interval = setInterval(async () => {
-        const jobData = await jobsAPI.get(job_id);
-        if (jobData.status !== 'running' && jobData.status !== 'queued') {
-          clearInterval(interval);
+      // Wait for job completion
+      const stopWatching = jobEventsAPI.watchJob(job_id, (update) => {
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          stopWatching();
           setAiEditing(false);
-          updateJob(job_id, { status: jobData.status });
+          updateJob(job_id, { status: update.status });
 
-          if (jobData.status === 'completed') {
+          if (update.status === 'completed') {
             // Show diff view instead of automatically applying changes
             setCurrentDiffId(diff_id);
             setShowDiffView(true);
@@ -325,7 +321,7 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
             alert('AI edit failed. Please check the job logs for details.');
           }
         }
-      }, 2000);
+      });
     } catch (error) {
       console.error('Error starting AI edit:', error);
       setAiEditing(false);
@@ -350,8 +346,6 @@ export default function BriefTab({ addJob, updateJob }: BriefTabProps) {
         alert('Changes were saved, but failed to reload. Please close and reopen the file.');
       }
     }
-
-    loadFiles(); // Refresh file list
   };
 
   const handleDiffReject = () => {
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Trash2, Eye, Loader2, Download, FileEdit, Sparkles, AlertTriangle, CheckCircle2, Plus, X, Layers, Edit2, Save, Wand2 } from 'lucide-react';
-import { draftsAPI, briefsAPI, brandDataAPI, jobsAPI } from '../api';
+import { applyDocumentChange, batchesAPI, documentEventsAPI, jobEventsAPI, jobFieldsFromUpdate, draftsAPI, briefsAPI, brandDataAPI } from '../api';
 import { Card, CardHeader, CardTitle, CardDescription, CardContent } from './ui/card';
 import { Button } from './ui/button';
 import { Label } from './ui/label';
@@ -51,9 +51,25 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
   ]);
 
   useEffect(() => {
-    loadFiles();
-    loadBriefFiles();
     loadBrandFiles();
+
+    // Drafts and the briefs to write them from are kept current by the change feed
+    const eventSource = documentEventsAPI.watch(
+      ['draft-outputs', 'brief-outputs'],
+      () => {
+        loadFiles();
+        loadBriefFiles();
+      },
+      (change) => {
+        if (change.folder === 'draft-outputs') {
+          setFiles((prev) => applyDocumentChange(prev, change));
+        } else {
+          setBriefFiles((prev) => applyDocumentChange(prev, change));
+        }
+      }
+    );
+
+    return () => eventSource.close();
   }, []);
 
   const loadFiles = async () => {
@@ -103,20 +119,18 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
         params: formData,
       });
 
-      const interval = setInterval(async () => {
-        const jobData = await jobsAPI.get(job_id);
-        if (jobData.status !== 'running' && jobData.status !== 'queued') {
-          clearInterval(interval);
+      const stopWatching = jobEventsAPI.watchJob(job_id, (update) => {
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          stopWatching();
           setGenerating(false);
           setFormData({
             brief_filename: '',
             brand_data_filename: '',
             target_word_count: 2000,
           });
-          loadFiles();
-          updateJob(job_id, { status: jobData.status });
+          updateJob(job_id, { status: update.status });
         }
-      }, 2000);
+      });
     } catch (error) {
       console.error('Error generating draft:', error);
       setGenerating(false);
@@ -145,53 +159,47 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
     try {
       const { batch_id, job_ids } = await draftsAPI.generateBatch(validForms);
 
-      // Fetch all job data concurrently
-      const jobDataPromises = job_ids.map((id) => jobsAPI.get(id));
-      const jobDataArray = await Promise.all(jobDataPromises);
+      if (job_ids.length === 0) {
+        setGenerating(false);
+        return;
+      }
+
+      // One request covers every job in the batch
+      const batch = await batchesAPI.get(batch_id);
 
       // Add all jobs
-      jobDataArray.forEach((jobData, i) => {
+      batch.jobs.forEach((jobData) => {
+        const i = job_ids.indexOf(jobData.id);
         addJob({
-          id: job_ids[i],
+          id: jobData.id,
           type: 'draft',
           status: jobData.status,
           params: validForms[i],
           batch_id: batch_id,
-          queue_position: jobData.queue_position,
+          queue_position: jobData.queue_position ?? undefined,
         });
       });
 
-      // Monitor all jobs
-      const intervals = job_ids.map((job_id) =>
-        setInterval(async () => {
-          const jobData = await jobsAPI.get(job_id);
-          if (jobData.status !== 'running' && jobData.status !== 'queued') {
-            clearInterval(intervals[job_ids.indexOf(job_id)]);
-            updateJob(job_id, { status: jobData.status, queue_position: jobData.queue_position });
-
-            // Check if all jobs are done
-            const allDone = job_ids.every(async (id) => {
-              const data = await jobsAPI.get(id);
-              return data.status !== 'running' && data.status !== 'queued';
-            });
-
-            if (allDone) {
-              setGenerating(false);
-              setBatchForms([
-                {
-                  brief_filename: '',
-                  brand_data_filename: '',
-                  target_word_count: 2000,
-                },
-              ]);
-              loadFiles();
-            }
-          } else {
-            // Update queue position
-            updateJob(job_id, { queue_position: jobData.queue_position });
-          }
-        }, 2000)
-      );
+      // Monitor the batch as a whole over the shared event stream
+      const finished = new Set<string>();
+      const stopWatching = jobEventsAPI.watchBatch(batch_id, (update) => {
+        updateJob(update.id, jobFieldsFromUpdate(update));
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          finished.add(update.id);
+        }
+
+        if (finished.size === batch.total) {
+          stopWatching();
+          setGenerating(false);
+          setBatchForms([
+            {
+              brief_filename: '',
+              brand_data_filename: '',
+              target_word_count: 2000,
+            },
+          ]);
+        }
+      });
     } catch (error) {
       console.error('Error generating batch:', error);
       setGenerating(false);
@@ -228,7 +236,6 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
 
     try {
       await draftsAPI.delete(filename);
-      loadFiles();
     } catch (error) {
       console.error('Error deleting file:', error);
     }
@@ -263,7 +270,6 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
       await draftsAPI.save(viewingFile.filename, editedContent);
       setViewingFile({ ...viewingFile, content: editedContent });
       setIsEditing(false);
-      loadFiles(); // Reload to update preview
       alert('Draft saved successfully!');
     } catch (error) {
       console.error('Error saving file:', error);
@@ -301,15 +307,14 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
         params: { filename: viewingFile.filename, edit_prompt: aiEditPrompt, diff_id },
       });
 
-      // Poll for job completion
-      const interval = setInterval(async () => {
-        const jobData = await jobsAPI.get(job_id);
-        if (jobData.status !== 'running' && jobData.status !== 'queued') {
-          clearInterval(interval);
+      // Wait for job completion
+      const stopWatching = jobEventsAPI.watchJob(job_id, (update) => {
+        if (update.status && update.status !== 'running' && update.status !== 'queued') {
+          stopWatching();
           setAiEditing(false);
-          updateJob(job_id, { status: jobData.status });
+          updateJob(job_id, { status: update.status });
 
-          if (jobData.status === 'completed') {
+          if (update.status === 'completed') {
             // Show diff view instead of automatically applying changes
             setCurrentDiffId(diff_id);
             setShowDiffView(true);
@@ -319,7 +324,7 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
             alert('AI edit failed. Please check the job logs for details.');
           }
         }
-      }, 2000);
+      });
     } catch (error) {
       console.error('Error starting AI edit:', error);
       setAiEditing(false);
@@ -337,7 +342,6 @@ export default function DraftTab({ addJob, updateJob }: DraftTabProps) {
     }
     setShowDiffView(false);
     setCurrentDiffId(null);
-    loadFiles(); // Refresh file list
   };
 
   const handleDiffReject = () => {
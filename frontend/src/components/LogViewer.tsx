@@ -10,20 +10,61 @@ interface LogViewerProps {
   onClose?: () => void;
 }
 
+// Lines of history loaded at a time
+const HISTORY_PAGE_SIZE = 200;
+
 export default function LogViewer({ jobId, onClose }: LogViewerProps) {
   const [logs, setLogs] = useState<string[]>([]);
   const [isPaused, setIsPaused] = useState(false);
   const [isComplete, setIsComplete] = useState(false);
+  const [historyLoaded, setHistoryLoaded] = useState(false);
+  // Byte offset of the oldest loaded line; earlier history exists while it is above 0
+  const [historyStart, setHistoryStart] = useState(0);
+  const [isLoadingEarlier, setIsLoadingEarlier] = useState(false);
+  // Byte offset after the newest line received, where the stream resumes after a pause
+  const offsetRef = useRef<number | null>(null);
+  // Set while prepending history, which shouldn't scroll to the newest line
+  const prependingRef = useRef(false);
   const logsEndRef = useRef<HTMLDivElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
+    let cancelled = false;
+    setLogs([]);
+    setIsComplete(false);
+    setHistoryLoaded(false);
+    setHistoryStart(0);
+    offsetRef.current = null;
+
+    jobsAPI.getLogs(jobId, { limit: HISTORY_PAGE_SIZE })
+      .then((page) => {
+        if (cancelled) return;
+        setLogs(page.lines);
+        setHistoryStart(page.start);
+        offsetRef.current = page.end;
+      })
+      .catch((error) => {
+        // Stream the whole log instead
+        console.error('Error loading log history:', error);
+      })
+      .finally(() => {
+        if (!cancelled) setHistoryLoaded(true);
+      });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [jobId]);
+
+  useEffect(() => {
+    if (!historyLoaded || isPaused || isComplete) return;
+
     const eventSource = jobsAPI.streamLogs(
       jobId,
-      (message: string) => {
-        if (!isPaused) {
-          setLogs((prev) => [...prev, message]);
-        }
+      offsetRef.current,
+      (message: string, offset: number) => {
+        offsetRef.current = offset;
+        setLogs((prev) => [...prev, message]);
       },
       () => {
         setIsComplete(true);
@@ -37,9 +78,27 @@ export default function LogViewer({ jobId, onClose }: LogViewerProps) {
     return () => {
       eventSource.close();
     };
-  }, [jobId, isPaused]);
+  }, [jobId, historyLoaded, isPaused, isComplete]);
+
+  const loadEarlier = async () => {
+    setIsLoadingEarlier(true);
+    try {
+      const page = await jobsAPI.getLogs(jobId, { offset: historyStart, limit: HISTORY_PAGE_SIZE });
+      prependingRef.current = true;
+      setLogs((prev) => [...page.lines, ...prev]);
+      setHistoryStart(page.start);
+    } catch (error) {
+      console.error('Error loading log history:', error);
+    } finally {
+      setIsLoadingEarlier(false);
+    }
+  };
 
   useEffect(() => {
+    if (prependingRef.current) {
+      prependingRef.current = false;
+      return;
+    }
     if (!isPaused && logsEndRef.current) {
       logsEndRef.current.scrollIntoView({ behavior: 'smooth' });
     }
@@ -121,10 +180,19 @@ export default function LogViewer({ jobId, onClose }: LogViewerProps) {
             </div>
           ) : (
             <>
+              {historyStart > 0 && (
+                <button
+                  onClick={loadEarlier}
+                  disabled={isLoadingEarlier}
+                  className="text-gray-400 hover:text-gray-200 mb-2 px-2 -mx-2"
+                >
+                  {isLoadingEarlier ? 'Loading earlier lines...' : 'Load earlier lines'}
+                </button>
+              )}
               {logs.map((log, index) => (
                 <div key={index} className="py-0.5 hover:bg-gray-800/50 px-2 -mx-2 rounded">
                   <span className="text-gray-600 select-none mr-2">{index + 1}</span>
-                  <span>{log}</span>
+                  <span className="whitespace-pre-wrap">{log}</span>
                 </div>
               ))}
               <div ref={logsEndRef} />
@@ -1,6 +1,6 @@
 // Job types
 export type JobType = 'brand_data' | 'brief' | 'draft';
-export type JobStatus = 'running' | 'completed' | 'failed' | 'queued';
+export type JobStatus = 'running' | 'completed' | 'failed' | 'timed_out' | 'cancelled' | 'queued';
 
 export interface Job {
   id: string;
@@ -19,6 +19,14 @@ export interface FileInfo {
   preview?: string;
 }
 
+// A change from /api/documents/events; document is set for created and updated documents
+export interface DocumentChange {
+  event: 'created' | 'updated' | 'deleted';
+  folder: string;
+  name: string;
+  document?: FileInfo;
+}
+
 // API Response types
 export interface FileListResponse {
   files: FileInfo[];
@@ -43,6 +51,35 @@ export interface BatchJobResponse {
   message: string;
 }
 
+export interface BatchStatusResponse {
+  batch_id: string;
+  total: number;
+  finished: number;
+  counts: Partial<Record<JobStatus, number>>;
+  eta_seconds: number | null;
+  jobs: JobSummary[];
+}
+
+// Compact job state, from batch progress and /api/events
+export interface JobSummary {
+  id: string;
+  type: JobType;
+  status: JobStatus;
+  batch_id: string | null;
+  queue_position: number | null;
+  output_files: string[];
+}
+
+// A job event: a full summary, or only the queue position when that alone changed
+export type JobUpdate = Pick<JobSummary, 'id'> & Partial<JobSummary>;
+
+export interface LogPageResponse {
+  job_id: string;
+  lines: string[];
+  start: number;  // Byte offset of the first line; pass as offset to load the page before
+  end: number;    // Byte offset after the last line; the live stream resumes from here
+}
+
 export interface JobDetailResponse {
   id: string;
   type: JobType;